@@ -1,21 +1,97 @@
 #!/usr/bin/env python3
 from email.utils import formatdate
+import gzip
+import hashlib
+import html
+import json
 import os
+import re
 import smtplib
 import sys
 import argparse
-import subprocess
+import functools
+import threading
+import yaml
 import time
+import requests
+import urllib3
 
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from smtplib import SMTP
-from datetime import date
+from datetime import date, datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Dict, List
+from typing import (
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from requests.adapters import HTTPAdapter
+
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+from daily_tests.report_state import (  # noqa: E402
+    COMPRESSED_SUFFIXES,
+    LOG_SUFFIXES,
+    STATE_FILE,
+    STATE_VERSION,
+    UPSTREAM_STATE_FILE,
+    container_name,
+    load_state,
+    split_test_case,
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+try:
+    from pbincli.format import Paste
+except ImportError:
+    Paste = None
 
 SCLORG_MAILS = {}
-SEND_PASTE_BIN = "/root/ci-scripts/send_to_paste_bin.sh"
+# Environment variables with comma separated mails of container owners
+MAIL_VARIABLES = {
+    "DB_MAILS": ("mariadb-container", "mysql-container", "postgresql-container"),
+    "RUBY_MAILS": ("s2i-ruby-container",),
+    "PYTHON_MAILS": ("s2i-python-container",),
+    "NODEJS_MAILS": ("s2i-nodejs-container",),
+    "PERL_MAILS": ("s2i-perl-container",),
+    "UPSTREAM_MAILS": ("upstream-tests",),
+}
+PASTEBIN_SERVER = "https://privatebin.corp.redhat.com/"
+PASTEBIN_EXPIRE = "1month"
+PASTEBIN_WORKERS = 8
+PASTEBIN_ATTEMPTS = 2
+PASTEBIN_TIMEOUT = 60
+# Lifetime of pastes in seconds for PrivateBin expire values
+PASTEBIN_LIFETIME = {
+    "5min": 5 * 60,
+    "10min": 10 * 60,
+    "1hour": 60 * 60,
+    "1day": 24 * 60 * 60,
+    "1week": 7 * 24 * 60 * 60,
+    "1month": 30 * 24 * 60 * 60,
+    "1year": 365 * 24 * 60 * 60,
+}
+# Cached paste is reused only if it stays available at least this long,
+# so links in the report do not expire right after it is sent
+PASTEBIN_MIN_VALIDITY = 7 * 24 * 60 * 60
 
 TEST_CASES = {
     # Format is test for OS and king of test, what TMT Plan is used and MSG to mail
@@ -55,48 +131,655 @@ TEST_UPSTREAM_CASES = {
     ("rhel10-test-upstream", "nightly-rhel10", "RHEL-10 Upstream test results:"),
 }
 
+REPORT_FOOTER = (
+    "<br>In case the information is wrong, please reach out "
+    "phracek@redhat.com, pkubat@redhat.com or hhorak@redhat.com.\n"
+    "Or file an issue here: https://github.com/sclorg/ci-scripts/issues"
+)
+
 # The default directory used for nightly build
 RESULTS_DIR = Path("/var/ci-scripts/daily_reports_dir")
+PASTEBIN_CACHE = RESULTS_DIR / "pastebin_cache.json"
+# Files created in test case directory by daily_scl_tests.sh
+# logs_downloaded is created by run_nightly_tests.sh and run_nightly_helm_charts.sh
+# once logs are downloaded
+TMT_MARKERS = ("tmt_running", "tmt_failed", "tmt_success", "logs_downloaded")
+WATCH_INTERVAL = 60
+WATCH_TIMEOUT = 12 * 60 * 60
+TMT_LOG = "tmt-verbose-log"
+# Interrupted downloads of download_logs.py, e.g. tmt-verbose-log.part
+# and tmt-verbose-log.part.validator, are not logs
+PART_SUFFIX = ".part"
+# Requests with more plans store TMT log of each plan,
+# e.g. tmt-verbose-log-nightly-c9s.gz
+TMT_LOG_RE = re.compile(
+    "^%s(?!.*%s)(-.+?)?(%s)?$"
+    % (
+        re.escape(TMT_LOG),
+        re.escape(PART_SUFFIX),
+        "|".join(re.escape(x) for x in COMPRESSED_SUFFIXES),
+    )
+)
+# Lines of failed container logs which are shown in the email body
+FAILURE_SIGNATURES = re.compile(
+    rb"|".join(
+        [
+            # pytest failed test summary, assertion details and section headers
+            rb"^FAILED ",
+            rb"^E {2,}",
+            rb"^=+ (FAILURES|ERRORS) =+",
+            rb"Traceback \(most recent call last\)",
+            # container test suites from container-common-scripts
+            rb"\[FAILED\]",
+            rb"(?i:\btime(d)? ?out\b)",
+        ]
+    )
+)
+EXCERPT_LINES_BEFORE = 5
+EXCERPT_LINES_AFTER = 10
+EXCERPT_MAX_BLOCKS = 5
+EXCERPT_MAX_BLOCK_LINES = 40
+EXCERPT_MAX_LINE_LENGTH = 500
+
+
+class ReportMetrics(object):
+    """
+    Timing spans and counters of one report run.
+    Spans are recorded with offset from start of the run and duration
+    in seconds, counters sum e.g. uploaded bytes or processed logs.
+    """
+
+    def __init__(self):
+        self.started = datetime.now()
+        self.start_time = time.monotonic()
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[None]:
+        """
+        Measure duration of the code block.
+        :param name: Name of the phase
+        :param attributes: Additional data stored with the span, e.g. log name
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            span = {
+                "name": name,
+                "offset": round(start - self.start_time, 6),
+                "duration": round(time.monotonic() - start, 6),
+            }
+            span.update(attributes)
+            with self.lock:
+                self.spans.append(span)
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Return number of calls, total and maximal duration of each span name.
+        """
+        summary: Dict[str, Dict] = {}
+        with self.lock:
+            for span in self.spans:
+                item = summary.setdefault(
+                    span["name"], {"calls": 0, "total": 0.0, "max": 0.0}
+                )
+                item["calls"] += 1
+                item["total"] = round(item["total"] + span["duration"], 6)
+                item["max"] = max(item["max"], span["duration"])
+        return summary
+
+    def write(self, report_file: Path):
+        """
+        Atomically write timing report of the run as JSON.
+        """
+        report = {
+            "started": self.started.isoformat(timespec="seconds"),
+            "duration": round(time.monotonic() - self.start_time, 6),
+            "summary": self.summary(),
+            "counters": dict(sorted(self.counters.items())),
+            "spans": self.spans,
+        }
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = report_file.with_name(f"{report_file.name}.tmp")
+        tmp_file.write_text(json.dumps(report, indent=2))
+        os.replace(tmp_file, report_file)
+        print(f"Timing report stored in {report_file}")
+
+
+def timed(name: str):
+    """
+    Record duration of the decorated method as span in self.metrics.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class MailRoutes(object):
+    """
+    Routing table of container owners.
+    Routes are keyed by (container, OS, test type), OS and test type
+    are None for routes which match all of them.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, Optional[str], Optional[str]], Set[str]] = {}
+
+    def add(
+        self,
+        container: str,
+        mails: List[str],
+        os_name: Optional[str] = None,
+        test_type: Optional[str] = None,
+    ):
+        mails = {x.strip() for x in mails if x.strip()}
+        if mails:
+            key = (container, os_name, test_type)
+            self.routes.setdefault(key, set()).update(mails)
+
+    def resolve(self, container: str, os_name: str, test_type: str) -> Set[str]:
+        """
+        Return recipients of failures of the container in given OS and test type.
+        """
+        recipients: Set[str] = set()
+        for key in (
+            (container, None, None),
+            (container, os_name, None),
+            (container, None, test_type),
+            (container, os_name, test_type),
+        ):
+            recipients |= self.routes.get(key, set())
+        return recipients
+
+    def load_file(self, routes_file: Path):
+        """
+        Add routes from YAML file with list of routes like
+            - container: s2i-ruby-container
+              os: rhel9  # optional
+              test_type: test-pytest  # optional
+              mails: [owner@example.com]
+        Raises ValueError if the file does not have this format.
+        """
+        routes = yaml.safe_load(routes_file.read_text()) or []
+        if not isinstance(routes, list):
+            raise ValueError(f"{routes_file} has to contain list of routes")
+        for route in routes:
+            if not isinstance(route, dict) or not {"container", "mails"} <= set(route):
+                raise ValueError(f"Route {route} in {routes_file} is not valid")
+            mails = route["mails"]
+            if isinstance(mails, str):
+                mails = mails.split(",")
+            self.add(route["container"], mails, route.get("os"), route.get("test_type"))
+
+    @classmethod
+    def from_container_mails(cls, container_mails: Dict[str, List[str]]):
+        """
+        Create routing table from dictionary mapping container to mails.
+        """
+        mail_routes = cls()
+        for container, mails in container_mails.items():
+            mail_routes.add(container, mails)
+        return mail_routes
+
+
+def iter_truncated_lines(f: BinaryIO, max_length: int) -> Iterator[bytes]:
+    """
+    Yield lines of the file truncated to max_length bytes.
+    Rest of an over-long line is read in bounded chunks and dropped,
+    so it neither has to fit in memory nor shows up as further lines.
+    :param f: File opened in binary mode
+    :param max_length: Maximal length of yielded line
+    """
+    for line in iter(lambda: f.readline(max_length), b""):
+        rest = line
+        while len(rest) == max_length and not rest.endswith(b"\n"):
+            rest = f.readline(max_length)
+        yield line
+
+
+def extract_failure_excerpt(
+    log_path: Path,
+    lines_before: int = EXCERPT_LINES_BEFORE,
+    lines_after: int = EXCERPT_LINES_AFTER,
+    max_blocks: int = EXCERPT_MAX_BLOCKS,
+) -> str:
+    """
+    Stream the log line by line and return lines matching FAILURE_SIGNATURES
+    with a few lines of context around them.
+    Only the context window and at most max_blocks of bounded blocks
+    are kept in memory, so big logs are read with constant memory.
+    :param log_path: Path to plain or compressed log
+    :return: excerpt with blocks separated by '...' or empty string
+    """
+    blocks: List[List[bytes]] = []
+    context: deque = deque(maxlen=lines_before)
+    block: Optional[List[bytes]] = None
+    remaining = 0
+    with open_log(log_path) as f:
+        for line in iter_truncated_lines(f, EXCERPT_MAX_LINE_LENGTH):
+            line = line.rstrip(b"\r\n")
+            if FAILURE_SIGNATURES.search(line):
+                if block is None:
+                    if len(blocks) == max_blocks:
+                        break
+                    block = list(context)
+                    blocks.append(block)
+                    context.clear()
+                block.append(line)
+                remaining = lines_after
+            elif block is not None:
+                block.append(line)
+                remaining -= 1
+            else:
+                context.append(line)
+            if block is not None and (
+                remaining == 0 or len(block) >= EXCERPT_MAX_BLOCK_LINES
+            ):
+                block = None
+    return "\n...\n".join(
+        b"\n".join(x).decode("utf-8", errors="replace") for x in blocks
+    )
+
+
+class CaseIndex(object):
+    """
+    Files of one test case found in the daily reports directory.
+    Logs under 'results' directory belong to failed containers.
+    """
+
+    def __init__(self, name: str, path: Path):
+        self.name: str = name
+        self.path: Path = path
+        self.markers: Set[str] = set()
+        self.tmt_logs: List[Path] = []
+        self.success_logs: List[Path] = []
+        self.failed_logs: List[Path] = []
+
+    @property
+    def tmt_log(self) -> Optional[Path]:
+        return self.tmt_logs[0] if self.tmt_logs else None
+
+    @property
+    def logs(self) -> List[Path]:
+        return sorted(self.success_logs + self.failed_logs)
+
+    @property
+    def status(self) -> str:
+        for marker in ("tmt_running", "tmt_failed"):
+            if marker in self.markers:
+                return marker
+        return "failed" if self.failed_logs else "success"
+
+    @classmethod
+    def from_state(cls, name: str, case_state: Dict) -> "CaseIndex":
+        """
+        Create CaseIndex from test case stored in report state.
+        """
+        case = cls(name, Path(case_state["path"]))
+        case.markers = set(case_state["markers"])
+        case.tmt_logs = [Path(x["path"]) for x in tmt_logs_state(case_state)]
+        case.success_logs = [Path(x["path"]) for x in case_state["success_logs"]]
+        case.failed_logs = [Path(x["path"]) for x in case_state["failed_logs"]]
+        return case
+
+
+def tmt_logs_state(case_state: Dict) -> List[Dict]:
+    """
+    Return TMT logs of test case stored in report state.
+    States written before plans had their own TMT logs store only tmt_log.
+    """
+    if "tmt_logs" in case_state:
+        return case_state["tmt_logs"]
+    return [case_state["tmt_log"]] if case_state["tmt_log"] else []
+
+
+def scan_test_case(name: str, path: Path) -> CaseIndex:
+    """
+    Walk test case directory once and sort its files into CaseIndex.
+    """
+    case = CaseIndex(name, path)
+    directories = [(path, False)]
+    while directories:
+        directory, in_results = directories.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    is_results = directory == path and entry.name == "results"
+                    directories.append((Path(entry.path), in_results or is_results))
+                    continue
+                if directory == path and entry.name in TMT_MARKERS:
+                    case.markers.add(entry.name)
+                elif directory == path and TMT_LOG_RE.match(entry.name):
+                    case.tmt_logs.append(Path(entry.path))
+                elif entry.name.endswith(LOG_SUFFIXES):
+                    if in_results:
+                        case.failed_logs.append(Path(entry.path))
+                    else:
+                        case.success_logs.append(Path(entry.path))
+    case.tmt_logs.sort()
+    case.success_logs.sort()
+    case.failed_logs.sort()
+    return case
 
 
-def run_command(
-    cmd,
-    return_output: bool = True,
-    ignore_error: bool = False,
-    shell: bool = True,
-    **kwargs,
-):
+def scan_reports_dir(reports_dir: Path) -> Dict[str, CaseIndex]:
     """
-    Run provided command on host system using the same user as invoked this code.
-    Raises subprocess.CalledProcessError if it fails.
-    :param cmd: list or str
-    :param return_output: bool, return output of the command
-    :param ignore_error: bool, do not fail in case nonzero return code
-    :param shell: bool, run command in shell
-    :param debug: bool, print command in shell, default is suppressed
-    :return: None or str
+    Index all test cases in daily reports directory by single scandir walk.
+    :param reports_dir: Directory with reports for one day
+    :return: dictionary mapping test case name to its CaseIndex
     """
-    print(f"command: {cmd}")
     try:
-        if return_output:
-            return subprocess.check_output(
-                cmd,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                shell=shell,
-                **kwargs,
+        with os.scandir(reports_dir) as entries:
+            test_cases = [(e.name, Path(e.path)) for e in entries if e.is_dir()]
+    except FileNotFoundError:
+        return {}
+    return {name: scan_test_case(name, path) for name, path in sorted(test_cases)}
+
+
+def is_resolved(case: CaseIndex) -> bool:
+    """
+    Return True when tmt finished for the test case and its logs are downloaded.
+    Test case which is still marked as running is not resolved.
+    """
+    if "tmt_running" in case.markers:
+        return False
+    finished = {"tmt_success", "tmt_failed"} & case.markers
+    return bool(finished) and "logs_downloaded" in case.markers
+
+
+class ReportsWatcher(object):
+    """
+    Wait for changes of test cases in the daily reports directory.
+    inotify is used when inotify_simple module is available,
+    the directory is polled otherwise.
+    """
+
+    def __init__(self, reports_dir: Path, interval: int = WATCH_INTERVAL):
+        self.reports_dir = reports_dir
+        self.interval = interval
+        # Watch descriptor -> (watched directory, test case or None for reports_dir)
+        self.watches: Dict[int, Tuple[Path, Optional[str]]] = {}
+        self.inotify = None
+        if INotify is None:
+            print("inotify_simple is not available, polling the reports directory")
+            return
+        try:
+            self.inotify = INotify()
+            self.add_watches(reports_dir, None)
+        except OSError as e:
+            print(f"inotify is not usable ({e}), polling the reports directory")
+            self.close()
+
+    def add_watches(self, directory: Path, test_case: Optional[str]):
+        """
+        Watch directory and all its subdirectories.
+        """
+        mask = flags.CREATE | flags.MOVED_TO | flags.CLOSE_WRITE | flags.DELETE
+        wd = self.inotify.add_watch(str(directory), mask)
+        self.watches[wd] = (directory, test_case)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    self.add_watches(Path(entry.path), test_case or entry.name)
+
+    def wait(self) -> Optional[Set[str]]:
+        """
+        Wait for changes in the reports directory.
+        :return: names of changed test cases or None if all test cases
+                 have to be checked, e.g. in polling mode or when nothing
+                 happened during the interval, as inotify misses changes
+                 made on other NFS clients.
+        """
+        if self.inotify is None:
+            time.sleep(self.interval)
+            return None
+        events = self.inotify.read(timeout=self.interval * 1000)
+        if not events:
+            return None
+        changed = set()
+        for event in events:
+            if event.wd not in self.watches:
+                continue
+            directory, test_case = self.watches[event.wd]
+            test_case = test_case or event.name
+            if event.mask & flags.ISDIR and event.mask & (
+                flags.CREATE | flags.MOVED_TO
+            ):
+                try:
+                    self.add_watches(directory / event.name, test_case)
+                except OSError as e:
+                    print(f"Watching {directory / event.name} failed: {e}")
+            changed.add(test_case)
+        return changed
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+
+def stored_log_path(path: Path) -> Path:
+    """
+    Return path of the log as stored on disk, either plain or compressed.
+    """
+    for suffix in ("",) + COMPRESSED_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def open_log(path: Path) -> BinaryIO:
+    """
+    Open plain, gzip or zstd compressed log for reading in binary mode.
+    """
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the zstandard module")
+        return zstandard.open(path, "rb")
+    return path.open("rb")
+
+
+class PasteBinCache(object):
+    """
+    Cache of pastes shared by report runs.
+    Entries are keyed by sha256 of the log content and store URL
+    of the paste and time when the paste expires.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file: Path = cache_file
+        self.entries: Dict[str, Dict] = {}
+        # Set once a paste is added, the cache file is not written otherwise
+        self.modified = False
+        self.lock = threading.Lock()
+        if self.cache_file.exists():
+            try:
+                self.entries = json.loads(self.cache_file.read_text())
+            except ValueError as e:
+                print(f"Ignoring corrupted pastebin cache {self.cache_file}: {e}")
+
+    def get(self, digest: str) -> str:
+        """
+        Return URL of the paste with the same content which
+        does not expire soon or empty string.
+        """
+        with self.lock:
+            entry = self.entries.get(digest)
+        if not entry:
+            return ""
+        expires = entry["expires"]
+        if expires is not None and expires < time.time() + PASTEBIN_MIN_VALIDITY:
+            return ""
+        return entry["url"]
+
+    def update(self, digest: str, url: str, lifetime: Optional[int]):
+        """
+        Store URL of the paste and its expiration time.
+        """
+        expires = None if lifetime is None else int(time.time()) + lifetime
+        with self.lock:
+            self.entries[digest] = {"url": url, "expires": expires}
+            self.modified = True
+
+    def save(self):
+        """
+        Drop expired pastes and atomically write the cache file.
+        """
+        now = time.time()
+        with self.lock:
+            self.entries = {
+                digest: entry
+                for digest, entry in self.entries.items()
+                if entry["expires"] is None or entry["expires"] > now
+            }
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.tmp")
+            tmp_file.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+            os.replace(tmp_file, self.cache_file)
+            self.modified = False
+
+
+class PasteBinUploader(object):
+    """
+    Upload logs to PrivateBin in-process.
+
+    One HTTP session is shared by all uploads, so the TLS connection
+    to the server is reused, and logs are uploaded by a bounded thread pool.
+    """
+
+    def __init__(
+        self,
+        server: str = PASTEBIN_SERVER,
+        expire: str = PASTEBIN_EXPIRE,
+        workers: int = PASTEBIN_WORKERS,
+        attempts: int = PASTEBIN_ATTEMPTS,
+        cache: Optional[PasteBinCache] = None,
+        metrics: Optional[ReportMetrics] = None,
+    ):
+        self.server = server if server.endswith("/") else f"{server}/"
+        self.expire = expire
+        self.cache = cache
+        self.metrics = metrics or ReportMetrics()
+        self.workers = workers
+        self.attempts = attempts
+        self.session = requests.Session()
+        # The corporate PrivateBin uses certificate signed by internal CA
+        self.session.verify = False
+        urllib3.disable_warnings()
+        self.session.headers.update({"X-Requested-With": "JSONHttpRequest"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def encrypt(self, text: str) -> Tuple[str, str]:
+        """
+        Encrypt text the same way as 'pbincli send --format plaintext'.
+        :param text: Content of the paste
+        :return: tuple with JSON request body and passphrase of the paste
+        """
+        if Paste is None:
+            raise RuntimeError("Sending logs to pastebin requires the pbincli module")
+        paste = Paste()
+        paste.setVersion(2)
+        paste.setCompression("zlib")
+        paste.setText(text)
+        paste.encrypt(
+            formatter="plaintext",
+            burnafterreading=False,
+            discussion=False,
+            expiration=self.expire,
+        )
+        return paste.getJSON(), paste.getHash()
+
+    def upload(self, log_path: Path) -> str:
+        """
+        Upload one log, plain or compressed, to pastebin.
+        :param log_path: Path to log file to send
+        :return: URL of the paste or empty string if upload failed
+        """
+        with open_log(log_path) as f:
+            content = f.read()
+        return self.upload_content(content, str(log_path))
+
+    @timed("pastebin_upload")
+    def upload_content(self, content: bytes, log_path: str) -> str:
+        """
+        Upload content of a log to pastebin.
+        :param content: Content to send
+        :param log_path: Name of the log used in messages
+        :return: URL of the paste or empty string if upload failed
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        if self.cache:
+            url = self.cache.get(digest)
+            if url:
+                print(f"Log {log_path} is already in pastebin: {url}")
+                self.metrics.count("pastebin_cache_hits")
+                return url
+        request, passphrase = self.encrypt(content.decode("utf-8", errors="replace"))
+        for attempt in range(1, self.attempts + 1):
+            try:
+                response = self.session.post(
+                    self.server, data=request, timeout=PASTEBIN_TIMEOUT
+                )
+                result = response.json()
+            except (requests.RequestException, ValueError) as e:
+                print(f"ERROR: Sending {log_path} to pastebin failed: {e}")
+                continue
+            if result.get("status") == 0:
+                url = f"{self.server}?{result['id']}#{passphrase}"
+                print(f"Log {log_path} sent to pastebin: {url}")
+                self.metrics.count("logs_uploaded")
+                self.metrics.count("bytes_uploaded", len(content))
+                if self.cache:
+                    self.cache.update(digest, url, PASTEBIN_LIFETIME.get(self.expire))
+                return url
+            print(
+                f"ERROR: Pastebin refused {log_path} "
+                f"(attempt {attempt}/{self.attempts}): {result.get('message')}"
             )
-        else:
-            return subprocess.check_call(cmd, shell=shell, **kwargs)
-    except subprocess.CalledProcessError as cpe:
-        if ignore_error:
-            if return_output:
-                return cpe.output
-            else:
-                return cpe.returncode
-        else:
-            print(f"failed with code {cpe.returncode} and output:\n{cpe.output}")
-            raise cpe
+        self.metrics.count("pastebin_failures")
+        return ""
+
+    def upload_many(
+        self, log_paths: List[Path], contents: Optional[Dict[Path, bytes]] = None
+    ) -> Dict[Path, str]:
+        """
+        Upload logs in parallel.
+        :param log_paths: List of logs to send
+        :param contents: Content to send instead of the whole log, e.g. excerpt
+        :return: dictionary mapping log path to URL of the paste
+        """
+        log_paths = list(dict.fromkeys(log_paths))
+        contents = contents or {}
+
+        def upload(log_path: Path) -> str:
+            if log_path in contents:
+                return self.upload_content(contents[log_path], f"excerpt of {log_path}")
+            return self.upload(log_path)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            urls = dict(zip(log_paths, executor.map(upload, log_paths)))
+        if self.cache and self.cache.modified:
+            self.cache.save()
+        return urls
 
 
 class NightlyTestsReport(object):
@@ -114,13 +797,24 @@ class NightlyTestsReport(object):
         self.log_dir = os.getcwd()
         self.mime_msg = MIMEMultipart()
         self.body = ""
-        self.date = date.today().strftime("%Y-%m-%d")
+        self.date = self.args.date or date.today().strftime("%Y-%m-%d")
         self.nightly_builds_url = ""
         self.reports_dir = RESULTS_DIR / self.date
         self.full_success = False
         self.smtp_port = 25
         self.smtp_server = "smtp.redhat.com"
         self.default_mails: List[str] = []
+        self.core_mails: List[str] = []
+        self.mail_routes: Optional[MailRoutes] = None
+        self.metrics = ReportMetrics()
+        self.pastebin = PasteBinUploader(
+            cache=PasteBinCache(self.args.pastebin_cache), metrics=self.metrics
+        )
+        self.pastebin_urls: Dict[Path, str] = {}
+        self.index: Dict[str, CaseIndex] = {}
+        self.excerpts: Dict[Path, str] = {}
+        # Data restored from report state are rendered without touching logs
+        self.restored_from_state = False
         if self.args.upstream_tests:
             self.available_test_case = TEST_UPSTREAM_CASES
         else:
@@ -149,6 +843,76 @@ class NightlyTestsReport(object):
         parser.add_argument(
             "--log-dir", help="The logs are stored in user defined directory"
         )
+        parser.add_argument(
+            "--pastebin-cache",
+            type=Path,
+            help="File with URLs of logs already sent to pastebin.",
+            default=PASTEBIN_CACHE,
+        )
+        parser.add_argument(
+            "--date",
+            help="Report tests of the day in YYYY-MM-DD format instead of today.",
+        )
+        parser.add_argument(
+            "--mail-routes",
+            type=Path,
+            help="YAML file routing failures of containers to their owners. "
+            "MAIL_ROUTES environment variable is used by default.",
+            default=os.getenv("MAIL_ROUTES"),
+        )
+        parser.add_argument(
+            "--timing-report",
+            type=Path,
+            help="JSON file for timing of report phases, "
+            "report-timing-<time>.json in reports directory by default.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Report each test case as soon as it finishes "
+            "and send the report when all test cases finished.",
+            default=False,
+        )
+        parser.add_argument(
+            "--watch-interval",
+            type=int,
+            help="Seconds between checks of the reports directory in watch mode.",
+            default=WATCH_INTERVAL,
+        )
+        parser.add_argument(
+            "--watch-timeout",
+            type=int,
+            help="Seconds to wait for all test cases in watch mode.",
+            default=WATCH_TIMEOUT,
+        )
+        parser.add_argument(
+            "--owner-digests",
+            action="store_true",
+            help="Send the full report only to default mails and a digest "
+            "with their failed containers to each group of container owners.",
+            default=False,
+        )
+        parser.add_argument(
+            "--upload-excerpts",
+            action="store_true",
+            help="Send only failure excerpts of failed container logs to pastebin.",
+            default=False,
+        )
+        state_group = parser.add_mutually_exclusive_group()
+        state_group.add_argument(
+            "--from-state",
+            action="store_true",
+            help="Render the report from the stored state "
+            "without scanning logs and sending them to pastebin.",
+            default=False,
+        )
+        state_group.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Scan logs again, but reuse pastebin URLs from the stored state "
+            "for logs which did not change.",
+            default=False,
+        )
 
         return parser.parse_args()
 
@@ -160,6 +924,17 @@ class NightlyTestsReport(object):
             [x[1] for x in self.available_test_case if item.startswith(x[0])]
         )
 
+    def test_case_plan(self, name: str) -> str:
+        """
+        Return the plan of the test case with exactly the given name.
+        :param name: Name of the test case, e.g. 'rhel9-test-pytest'
+        :return: Plan name or empty string for unknown test case
+        """
+        for test_case, plan, _ in self.available_test_case:
+            if test_case == name:
+                return plan
+        return ""
+
     def _get_env_variable(self, var_name: str, default_value: str = "") -> str:
         """
         Get environment variable value or return default value if not set.
@@ -177,73 +952,89 @@ class NightlyTestsReport(object):
         """
         Load email addresses from environment variables.
         """
-        print(os.environ)
-        SCLORG_MAILS["mariadb-container"] = self._get_env_variable("DB_MAILS").split(
-            ","
-        )
-        SCLORG_MAILS["mysql-container"] = self._get_env_variable("DB_MAILS").split(",")
-        SCLORG_MAILS["postgresql-container"] = self._get_env_variable("DB_MAILS").split(
-            ","
-        )
-        SCLORG_MAILS["s2i-ruby-container"] = self._get_env_variable("RUBY_MAILS").split(
-            ","
-        )
-        SCLORG_MAILS["s2i-python-container"] = self._get_env_variable(
-            "PYTHON_MAILS"
-        ).split(",")
-        SCLORG_MAILS["s2i-nodejs-container"] = self._get_env_variable(
-            "NODEJS_MAILS"
-        ).split(",")
-        SCLORG_MAILS["s2i-perl-container"] = self._get_env_variable("PERL_MAILS").split(
-            ","
-        )
-        SCLORG_MAILS["upstream-tests"] = self._get_env_variable("UPSTREAM_MAILS").split(
-            ","
-        )
+        for variable, containers in MAIL_VARIABLES.items():
+            mails = self._get_env_variable(variable).split(",")
+            for container in containers:
+                SCLORG_MAILS[container] = mails
+        self.mail_routes = MailRoutes.from_container_mails(SCLORG_MAILS)
+        if self.args.mail_routes:
+            self.mail_routes.load_file(self.args.mail_routes)
         self.smtp_server = self._get_env_variable("SMTP_SERVER", "smtp.redhat.com")
         self.smtp_port = int(self._get_env_variable("SMTP_PORT", "25"))
         self.default_mails = os.getenv("DEFAULT_MAILS").split(",")
+        self.core_mails = list(self.default_mails)
         self.nightly_builds_url = os.getenv("NIGHTLY_BUILDS_URL", "")
         self.send_email = bool(os.getenv("SEND_EMAIL", "False"))
 
-        print(f"Loaded mails from environment: '{SCLORG_MAILS}'")
+        print(f"Loaded mail routes: '{self.mail_routes.routes}'")
         print(f"Default mails: '{self.default_mails}'")
         print(f"Send email: '{self.send_email}'")
 
-    def send_file_to_pastebin(self, log_path, log_name: Path):
+    def write_timing_report(self):
+        """
+        Write timing spans and counters of this run.
         """
-        Send file to pastebin using send_to_paste_bin.sh script.
-        It is used for sending logs from TMT command in case of TMT failures.
+        report_file = self.args.timing_report or (
+            self.reports_dir
+            / f"report-timing-{self.metrics.started.strftime('%H%M%S')}.json"
+        )
+        self.metrics.write(report_file)
 
-        :param log_path: Path to log file to send
-        :param log_name: Path to file where pastebin link will be stored"""
-        if not os.path.exists(log_path):
-            return
-        cmd = f'{SEND_PASTE_BIN} "{log_path}" "{str(log_name)}"'
-        print(f"sending logs to pastebin: {cmd}")
-        for _ in range(2):
-            try:
-                run_command(cmd)
-                break
-            except subprocess.CalledProcessError:
-                print(f"ERROR: Sending to pastebin by command {cmd} failed")
-                pass
-            time.sleep(1)
-
-    def get_pastebin_url(self, log_name: str) -> str:
-        """
-        Get pastebin URL from file where send_to_paste_bin.sh
-        script stored it after sending logs to pastebin.
-        :param log_name: Path to file where pastebin link is stored
-        :return: URL as string or empty string if URL is not found in file"""
-        with open(log_name, "r") as f:
-            lines = f.read()
-
-        for line in lines.split("\n"):
-            if not line.startswith("Link:"):
+    @timed("upload_logs")
+    def upload_logs(self, log_paths: List[Path]):
+        """
+        Send logs to pastebin in parallel and remember their URLs.
+        :param log_paths: List of logs referenced by the email body
+        """
+        stored_logs = {}
+        for log_path in log_paths:
+            if self.pastebin_urls.get(Path(log_path)):
                 continue
-            return line.replace("Link:", "").strip()
-        return ""
+            stored_log = stored_log_path(Path(log_path))
+            if not stored_log.exists():
+                print(f"Log {stored_log} does not exist, nothing to send to pastebin")
+                continue
+            stored_logs[Path(log_path)] = stored_log
+        contents = {}
+        if self.args.upload_excerpts:
+            for log_path, stored_log in stored_logs.items():
+                if self.excerpts.get(log_path):
+                    contents[stored_log] = self.excerpts[log_path].encode()
+        print(f"Sending {len(stored_logs)} logs to pastebin")
+        urls = self.pastebin.upload_many(list(stored_logs.values()), contents)
+        for log_path, stored_log in stored_logs.items():
+            self.pastebin_urls[log_path] = urls[stored_log]
+
+    @timed("extract_excerpts")
+    def extract_excerpts(self):
+        """
+        Extract failure excerpts from failed container logs.
+        """
+        for test_case, plan, msg in self.available_test_case:
+            for full_log_name, _ in self.data_dict.get(test_case, []):
+                log_path = Path(full_log_name)
+                if log_path in self.excerpts:
+                    continue
+                stored_log = stored_log_path(log_path)
+                if stored_log.exists():
+                    self.excerpts[log_path] = extract_failure_excerpt(stored_log)
+                    self.metrics.count("logs_excerpted")
+
+    def logs_to_upload(self) -> List[Path]:
+        """
+        Return logs which are linked from the email body.
+        """
+        log_paths = [log_path for _, log_path in self.data_dict["tmt"]["logs"]]
+        for test_case, plan, msg in self.available_test_case:
+            log_paths.extend(
+                Path(full_log_name)
+                for full_log_name, _ in self.data_dict.get(test_case, [])
+            )
+        if self.args.upstream_tests:
+            log_paths.extend(
+                Path(cont_path) for _, cont_path, _ in self.data_dict["SUCCESS_DATA"]
+            )
+        return log_paths
 
     def store_tmt_logs_to_dict(
         self,
@@ -261,9 +1052,8 @@ class NightlyTestsReport(object):
         :param not_exists: Flag indicating if the data directory does not exist
         :param is_failed: Flag indicating if the test has failed
         """
-        log_path = self.reports_dir / test_case / "tmt-verbose-log"
-        log_name = path_dir / "tmt-verbose-log.txt"
-        self.send_file_to_pastebin(log_path=log_path, log_name=log_name)
+        case = self.index.get(test_case)
+        log_paths = case.tmt_logs if case and case.tmt_logs else [path_dir / TMT_LOG]
 
         if not (is_running or is_failed or not_exists):
             return
@@ -287,17 +1077,27 @@ class NightlyTestsReport(object):
             dictionary_key = "tmt_running"
         if is_failed:
             dictionary_key = "tmt_failed"
-        if log_name.exists():
-            with open(log_name) as f:
-                print(f.readlines())
         self.data_dict["tmt"][dictionary_key].append(test_case)
-        self.data_dict["tmt"]["logs"].append((test_case, log_path, log_name))
+        self.data_dict["tmt"]["logs"].extend(
+            (test_case, log_path) for log_path in log_paths
+        )
 
+    @timed("collect_data")
     def collect_data(self):
         # Collect data to class dictionary
         # self.data_dict['tmt'] item is used for Testing Farm errors per each OS and test case
         # self.data_dict[test_case] contains failed logs for given test case. E.g. 'fedora-test'
         print("=======Collecting data for all test cases=====")
+        self.index = scan_reports_dir(self.reports_dir)
+        self.restored_from_state = False
+        if not self.index:
+            print(f"The reports directory {self.reports_dir} is empty or missing.")
+        self.collect_data_from_index()
+
+    def collect_data_from_index(self):
+        """
+        Fill self.data_dict from index of the reports directory.
+        """
         self.data_dict["tmt"] = {
             "logs": [],
             "msg": [],
@@ -307,62 +1107,218 @@ class NightlyTestsReport(object):
         self.data_dict["SUCCESS"] = []
         self.data_dict["SUCCESS_DATA"] = []
         failed_tests = False
+        for case in self.index.values():
+            self.metrics.count("logs_indexed", len(case.logs))
         for test_case, plan, _ in self.available_test_case:
-            path_dir = self.reports_dir / test_case
-            if not self.reports_dir.is_dir():
-                print(
-                    f"The reports directory {self.reports_dir} does not exist, skipping it."
-                )
-                continue
-            if not path_dir.is_dir():
-                print(f"The test case {path_dir} does not exist that is weird")
+            case = self.index.get(test_case)
+            if case is None:
+                print(f"The test case {test_case} does not exist that is weird")
                 continue
+            path_dir = case.path
             print(f"Path for test case '{test_case}' is: '{path_dir}'")
             # It looks like TMT is still running for long time
-            if (path_dir / "tmt_running").exists():
+            if "tmt_running" in case.markers:
                 print(f"tmt tests for case {test_case} is still running.")
                 self.store_tmt_logs_to_dict(path_dir, test_case, is_running=True)
                 failed_tests = True
                 continue
             # TMT command failed for some reason. Look at logs for given namespace
             # /var/tmp/daily_scl_tests/<test_case>/log.txt file
-            if (path_dir / "tmt_failed").exists():
+            if "tmt_failed" in case.markers:
                 print(f"tmt command has failed for test case {test_case}.")
                 self.store_tmt_logs_to_dict(path_dir, test_case, is_failed=True)
                 failed_tests = True
                 continue
-            data_dir = path_dir / "results"
-            print("Results dir is for failed_container: ", data_dir)
-            success_containers = list(path_dir.rglob("*.log"))
-            print("Success containers are: ", success_containers)
-            failed_containers = list(data_dir.rglob("*.log"))
-            print("Failed containers are: ", failed_containers)
-            if not failed_containers:
+            print("Success containers are: ", case.success_logs)
+            print("Failed containers are: ", case.failed_logs)
+            if not case.failed_logs:
                 self.data_dict["SUCCESS"].append(test_case)
                 if self.args.upstream_tests:
-                    success_logs = list((path_dir).rglob("*.log"))
-                    print(success_logs)
-                    for suc in success_logs:
-                        self.store_tmt_logs_to_dict(
-                            path_dir=path_dir, test_case=test_case, is_failed=False
-                        )
                     self.data_dict["SUCCESS_DATA"].extend(
-                        [(test_case, str(f), str(f.name)) for f in success_logs]
+                        [(test_case, str(f), str(f.name)) for f in case.logs]
                     )
                 continue
-            print(f"Failed containers are for {test_case} are: {failed_containers}")
             failed_tests = True
 
             self.data_dict[test_case] = [
-                (str(f), str(f.name)) for f in failed_containers
+                (str(f), str(f.name)) for f in case.failed_logs
             ]
         if not failed_tests:
             self.full_success = True
-        print("collected data are:")
-        import pprint
+        print(
+            f"collected data are: successful test cases {self.data_dict['SUCCESS']}, "
+            f"tmt failures {self.data_dict['tmt']['msg']}"
+        )
+        for test_case, plan, _ in self.available_test_case:
+            if test_case in self.data_dict:
+                print(f"failed logs for {test_case}: {self.data_dict[test_case]}")
 
-        pprint.pprint(self.data_dict)
+    def report_test_case(self, case: CaseIndex):
+        """
+        Report finished test case right away, extract failure excerpts
+        and send its failed logs to pastebin.
+        """
+        print(f"Test case {case.name} finished with status {case.status}")
+        logs = list(case.failed_logs)
+        if case.status == "tmt_failed":
+            logs.extend(case.tmt_logs or [case.path / TMT_LOG])
+        for log_path in case.failed_logs:
+            self.excerpts[log_path] = extract_failure_excerpt(log_path)
+            self.metrics.count("logs_excerpted")
+        self.upload_logs(logs)
+        for log_path in logs:
+            print(
+                f"{case.name}: {log_path.name} {self.pastebin_urls.get(log_path, '')}"
+            )
 
+    @timed("watch")
+    def watch(self, timeout: int = WATCH_TIMEOUT):
+        """
+        Watch reports directory until all test cases are resolved or timeout
+        expires. Only changed test cases are scanned again and each of them
+        is reported as soon as it is resolved.
+        Data are collected from the index afterwards, like in collect_data.
+        """
+        print(f"=======Watching test cases in {self.reports_dir}=====")
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        watcher = ReportsWatcher(self.reports_dir, self.args.watch_interval)
+        pending = {test_case for test_case, _, _ in self.available_test_case}
+        signatures: Dict[str, Tuple] = {}
+        deadline = time.monotonic() + timeout
+        changed: Optional[Set[str]] = None
+        try:
+            while True:
+                for test_case in sorted(pending if changed is None else changed):
+                    path = self.reports_dir / test_case
+                    if test_case not in pending or not path.is_dir():
+                        continue
+                    case = scan_test_case(test_case, path)
+                    signature = (
+                        frozenset(case.markers),
+                        tuple(case.tmt_logs),
+                        tuple(case.logs),
+                    )
+                    if signatures.get(test_case) == signature:
+                        continue
+                    signatures[test_case] = signature
+                    self.index[test_case] = case
+                    if is_resolved(case):
+                        pending.discard(test_case)
+                        self.report_test_case(case)
+                        self.save_state()
+                if not pending:
+                    break
+                if time.monotonic() >= deadline:
+                    print(f"Test cases {sorted(pending)} did not finish in time.")
+                    break
+                changed = watcher.wait()
+        finally:
+            watcher.close()
+        self.collect_data_from_index()
+
+    @property
+    def state_file(self) -> Path:
+        name = UPSTREAM_STATE_FILE if self.args.upstream_tests else STATE_FILE
+        return self.reports_dir / name
+
+    def log_state(self, log_path: Path) -> Dict:
+        """
+        Return path, size, pastebin URL and failure excerpt of the log
+        for report state. Excerpt is None for logs which were not read.
+        """
+        try:
+            size = log_path.stat().st_size
+        except FileNotFoundError:
+            size = None
+        return {
+            "path": str(log_path),
+            "size": size,
+            "url": self.pastebin_urls.get(log_path, ""),
+            "excerpt": self.excerpts.get(log_path),
+        }
+
+    @timed("save_state")
+    def save_state(self):
+        """
+        Atomically write collected data and pastebin URLs of the day
+        as versioned JSON document, so the report can be rendered again
+        by --from-state without scanning logs and show_logs.py can read it.
+        """
+        test_cases = {}
+        for name, case in self.index.items():
+            test_cases[name] = {
+                "status": case.status,
+                "plan": self.test_case_plan(name),
+                "path": str(case.path),
+                "markers": sorted(case.markers),
+                "tmt_log": self.log_state(case.tmt_log) if case.tmt_log else None,
+                "tmt_logs": [self.log_state(x) for x in case.tmt_logs],
+                "success_logs": [self.log_state(x) for x in case.success_logs],
+                "failed_logs": [self.log_state(x) for x in case.failed_logs],
+            }
+        state = {
+            "version": STATE_VERSION,
+            "date": self.date,
+            "upstream_tests": self.args.upstream_tests,
+            "full_success": self.full_success,
+            "test_cases": test_cases,
+        }
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.tmp")
+        tmp_file.write_text(json.dumps(state, indent=2, sort_keys=True))
+        os.replace(tmp_file, self.state_file)
+        print(f"Report state stored in {self.state_file}")
+
+    def load_state(self) -> Optional[Dict]:
+        """
+        Load report state of the day.
+        :return: state dictionary or None if the state is missing or unusable
+        """
+        return load_state(self.state_file)
+
+    def restore_pastebin_urls(self, state: Dict, check_size: bool = False):
+        """
+        Take pastebin URLs of logs from report state.
+        :param state: Report state loaded by load_state
+        :param check_size: Take URL only if size of the log did not change
+        """
+        for case_state in state["test_cases"].values():
+            logs = (
+                case_state["success_logs"]
+                + case_state["failed_logs"]
+                + tmt_logs_state(case_state)
+            )
+            for log in logs:
+                log_path = Path(log["path"])
+                if check_size and self.log_state(log_path)["size"] != log["size"]:
+                    continue
+                if log["url"]:
+                    self.pastebin_urls[log_path] = log["url"]
+                # Empty excerpt means the log was read and has no failure
+                if log.get("excerpt") is not None:
+                    self.excerpts[log_path] = log["excerpt"]
+
+    @timed("collect_data_from_state")
+    def collect_data_from_state(self):
+        """
+        Collect data from report state instead of scanning the reports directory.
+        Scan it in case the state is not available.
+        """
+        state = self.load_state()
+        if state is None:
+            print("Collecting data from the reports directory instead.")
+            self.collect_data()
+            return
+        print(f"=======Collecting data from report state {self.state_file}=====")
+        self.index = {
+            name: CaseIndex.from_state(name, case_state)
+            for name, case_state in state["test_cases"].items()
+        }
+        self.restore_pastebin_urls(state)
+        self.restored_from_state = True
+        self.collect_data_from_index()
+
+    @timed("generate_email_body")
     def generate_email_body(self):
         """
         Generate email body based on collected data.
@@ -378,6 +1334,9 @@ class NightlyTestsReport(object):
             body_failure = "<b>Nightly builds Testing Farm failures:</b><br>"
             body_success = "<b>These nightly builds were completely successful:</b><br>"
         # Function for generation mail body
+        if not self.restored_from_state:
+            self.extract_excerpts()
+            self.upload_logs(self.logs_to_upload())
         if self.data_dict["tmt"]["msg"]:
             self.body += (
                 f"{body_failure}\n"
@@ -392,13 +1351,7 @@ class NightlyTestsReport(object):
                 self.generate_success_containers()
 
         self.generate_failed_containers()
-        self.body += (
-            "<br>In case the information is wrong, please reach out "
-            "phracek@redhat.com, pkubat@redhat.com or hhorak@redhat.com.\n"
-        )
-        self.body += (
-            "Or file an issue here: https://github.com/sclorg/ci-scripts/issues"
-        )
+        self.body += REPORT_FOOTER
         print(f"Body to email: {self.body}")
 
     def generate_failed_containers(self):
@@ -406,22 +1359,31 @@ class NightlyTestsReport(object):
         Generate email body for failed containers.
         """
         print("GENERATE FAILED CONTAINERS")
+        self.body += self.failed_containers_body()
+
+    def failed_containers_body(self, selected_logs: Optional[Set[str]] = None) -> str:
+        """
+        Return HTML with links and failure excerpts of failed containers.
+        :param selected_logs: Include only these logs, all failed logs by default
+        """
+        body = ""
         for test_case, plan, msg in self.available_test_case:
-            if test_case not in self.data_dict:
+            logs = [
+                (full_log_name, name)
+                for full_log_name, name in self.data_dict.get(test_case, [])
+                if selected_logs is None or full_log_name in selected_logs
+            ]
+            if not logs:
                 continue
-            print(
-                f"generate_email_body_for_failed_containers: {self.data_dict[test_case]}"
-            )
-            self.body += f"<br><b>{msg}</b><br>List of failed containers:<br>"
-            for full_log_name, name in self.data_dict[test_case]:
-                paste_bin_file = f"{full_log_name}.txt"
-                self.send_file_to_pastebin(
-                    log_path=full_log_name, log_name=paste_bin_file
-                )
-                self.body += (
-                    f"<a href='{self.get_pastebin_url(log_name=paste_bin_file)}'>{name}</a>"
-                    f"<br>"
-                )
+            print(f"generate_email_body_for_failed_containers: {logs}")
+            body += f"<br><b>{msg}</b><br>List of failed containers:<br>"
+            for full_log_name, name in logs:
+                url = self.pastebin_urls.get(Path(full_log_name), "")
+                body += f"<a href='{url}'>{name}</a><br>"
+                excerpt = self.excerpts.get(Path(full_log_name))
+                if excerpt:
+                    body += f"<pre>{html.escape(excerpt)}</pre>"
+        return body
 
     def generate_success_containers(self):
         """
@@ -429,24 +1391,24 @@ class NightlyTestsReport(object):
         """
         print("GENERATE SUCCESS CONTAINERS")
         for test_case, cont_path, log_name in self.data_dict["SUCCESS_DATA"]:
-            if os.path.exists(log_name):
-                self.body += (
-                    f" <a href='{self.get_pastebin_url(log_name=log_name)}'>See logs</a>"
-                    f"<br>"
-                )
+            url = self.pastebin_urls.get(Path(cont_path))
+            if url:
+                self.body += f" <a href='{url}'>See logs</a><br>"
 
     def generate_tmt_logs_containers(self):
         """
         Generate email body for TMT logs.
         """
-        for test_case, cont_path, log_name in self.data_dict["tmt"]["logs"]:
-            print(f"generate_tmt_logs_containers: {test_case}, {cont_path}, {log_name}")
-            if os.path.exists(log_name):
-                self.body += (
-                    f"<b>{test_case}</b> <a href='{self.get_pastebin_url(log_name=log_name)}'>"
-                    f"See logs</a>"
-                    f"<br>"
-                )
+        for test_case, log_path in self.data_dict["tmt"]["logs"]:
+            print(f"generate_tmt_logs_containers: {test_case}, {log_path}")
+            url = self.pastebin_urls.get(Path(log_path))
+            # Name the plan if the request has TMT log for each plan
+            plan = TMT_LOG_RE.match(Path(log_path).name)
+            label = "See logs"
+            if plan and plan.group(1):
+                label += f" ({plan.group(1)[1:]})"
+            if url:
+                self.body += f"<b>{test_case}</b> <a href='{url}'>{label}</a><br>"
             else:
                 self.body += (
                     f"<b>{test_case}</b> No logs available. "
@@ -454,28 +1416,62 @@ class NightlyTestsReport(object):
                 )
         self.body += "<br>"
 
+    def log_recipients(self, test_case: str, log_name: str) -> Set[str]:
+        """
+        Return owners of the container whose log failed in the test case.
+        """
+        if self.mail_routes is None:
+            self.mail_routes = MailRoutes.from_container_mails(SCLORG_MAILS)
+        os_name, test_type = split_test_case(test_case)
+        return self.mail_routes.resolve(container_name(log_name), os_name, test_type)
+
     def generate_emails(self):
         """
         Generate email list based on collected data and predefined email lists for each container.
         """
-        print("GENERATE_MAILS: ", self.data_dict)
-        print("GENERATE_MAILS: Available test cases: ", self.available_test_case)
+        recipients: Set[str] = set()
         for test_case, plan, _ in self.available_test_case:
-            if test_case not in self.data_dict:
-                continue
-            for _, name in self.data_dict[test_case]:
-                for cont, mails in SCLORG_MAILS.items():
-                    print(
-                        f"generate_emails: Checking if container name '{name}' starts with '{cont}'"
-                    )
-                    if str(Path(name).with_suffix("")) != cont:
-                        continue
-                    for ml in mails:
-                        if ml in self.default_mails:
-                            continue
-                        self.default_mails.append(ml)
+            for _, name in self.data_dict.get(test_case, []):
+                recipients |= self.log_recipients(test_case, name)
+        self.default_mails.extend(sorted(recipients.difference(self.default_mails)))
         print(f"GENERATE_MAILS: Additional emails: {self.default_mails}")
 
+    def generate_owner_digests(self) -> List[Tuple[List[str], str]]:
+        """
+        Generate digests of failed containers for each group of container owners.
+        Owners which get the full report are left out.
+        :return: list of recipients and email body of each digest
+        """
+        groups: Dict[FrozenSet[str], Set[str]] = {}
+        for test_case, plan, _ in self.available_test_case:
+            for full_log_name, name in self.data_dict.get(test_case, []):
+                owners = self.log_recipients(test_case, name).difference(
+                    self.core_mails
+                )
+                if owners:
+                    groups.setdefault(frozenset(owners), set()).add(full_log_name)
+        digests = []
+        for owners, logs in sorted(groups.items(), key=lambda x: sorted(x[0])):
+            body = "<b>Nightly builds failures of your containers:</b><br>"
+            body += self.failed_containers_body(logs) + REPORT_FOOTER
+            digests.append((sorted(owners), body))
+        return digests
+
+    def create_message(
+        self, send_from: str, send_to: List[str], subject: str, body: str
+    ) -> MIMEMultipart:
+        """
+        Create HTML email message.
+        """
+        mime_msg = MIMEMultipart()
+        mime_msg["From"] = send_from
+        mime_msg["To"] = ", ".join(send_to)
+        mime_msg["Subject"] = subject
+        mime_msg["Date"] = formatdate(localtime=True)
+        mime_msg.attach(MIMEText(body, "html"))
+        return mime_msg
+
+    @timed("send_emails")
     def send_emails(self):
         """
         Send emails with the test results.
@@ -497,35 +1493,69 @@ class NightlyTestsReport(object):
         send_from = "phracek@redhat.com"
         if self.args.upstream_tests:
             send_to = SCLORG_MAILS.get("upstream-tests", [])
+        elif self.args.owner_digests:
+            send_to = self.core_mails
         else:
             send_to = self.default_mails
 
-        self.mime_msg["From"] = send_from
-        self.mime_msg["To"] = ", ".join(send_to)
-        self.mime_msg["Subject"] = subject_msg
-        self.mime_msg["Date"] = formatdate(localtime=True)
+        self.mime_msg = self.create_message(send_from, send_to, subject_msg, self.body)
         print(f"Sending email with subject: '{subject_msg}' to: '{send_to}'")
         print(f"Email body: {self.body}")
-        print(f"Message: {self.mime_msg}")
-        self.mime_msg.attach(MIMEText(self.body, "html"))
+        messages = [(send_to, self.mime_msg)]
+        if self.args.owner_digests and not self.args.upstream_tests:
+            for owners, body in self.generate_owner_digests():
+                print(f"Sending digest of failed containers to: '{owners}'")
+                digest_msg = self.create_message(
+                    send_from, owners, f"{subject_msg} in your containers", body
+                )
+                messages.append((owners, digest_msg))
+        self.send_messages(send_from, messages)
+        print("Sending email finished")
+
+    def send_messages(
+        self, send_from: str, messages: List[Tuple[List[str], MIMEMultipart]]
+    ):
+        """
+        Send all messages over one SMTP connection.
+        Refused recipients of one message do not stop sending the others.
+        """
+        smtp = None
         try:
             smtp = SMTP(self.smtp_server, int(self.smtp_port))
             smtp.set_debuglevel(5)
-            smtp.sendmail(send_from, send_to, self.mime_msg.as_string())
-        except smtplib.SMTPRecipientsRefused as e:
-            print(f"Error sending email(SMTPRecipientsRefused): {e.strerror}")
-        except smtplib.SMTPException as e:
+            for send_to, mime_msg in messages:
+                try:
+                    smtp.sendmail(send_from, send_to, mime_msg.as_string())
+                    self.metrics.count("emails_sent")
+                except smtplib.SMTPRecipientsRefused as e:
+                    print(f"Error sending email(SMTPRecipientsRefused): {e.recipients}")
+            smtp.quit()
+        except (smtplib.SMTPException, OSError) as e:
             print(f"Error sending email(SMTPException): {e}")
         finally:
-            smtp.close()
-        print("Sending email finished")
+            if smtp:
+                smtp.close()
 
 
 if __name__ == "__main__":
     ntr = NightlyTestsReport()
-    ntr.load_mails_from_environment()
-    ntr.collect_data()
-    ntr.generate_email_body()
-    ntr.generate_emails()
-    ntr.send_emails()
+    try:
+        ntr.load_mails_from_environment()
+        if ntr.args.watch:
+            ntr.watch(ntr.args.watch_timeout)
+        elif ntr.args.from_state:
+            ntr.collect_data_from_state()
+        else:
+            ntr.collect_data()
+            state = ntr.load_state() if ntr.args.refresh else None
+            if state:
+                ntr.restore_pastebin_urls(state, check_size=True)
+        ntr.generate_email_body()
+        # State restored by --from-state is left as it is
+        if not ntr.restored_from_state:
+            ntr.save_state()
+        ntr.generate_emails()
+        ntr.send_emails()
+    finally:
+        ntr.write_timing_report()
     sys.exit(0)
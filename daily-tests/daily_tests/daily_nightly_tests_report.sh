@@ -12,5 +12,7 @@ if [ -n "$1" ]; then
 else
     python3 ./daily_nightly_tests_report.py
 fi
+# Record results of the day to the history of nightly tests
+python3 ./nightly_history.py ingest "${CUR_DATE}"
 # Sleep 10 seconds in case we need to send a bigger mail.
 sleep 10
@@ -4,36 +4,336 @@ import time
 import sys
 import re
 import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mmap
+import random
+import shutil
+import threading
 import requests
-import xmltodict
+import urllib.parse
 import urllib3
+import xml.etree.ElementTree as ET
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 
-urllib3.disable_warnings()
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
+urllib3.disable_warnings()
 
-CONTAINERS = [
-    "httpd-container",
-    "mariadb-container",
-    "mysql-container",
-    "nginx-container",
-    "postgresql-container",
-    "redis-container",
-    "s2i-base-container",
-    "s2i-nodejs-container",
-    "s2i-perl-container",
-    "s2i-php-container",
-    "s2i-python-container",
-    "s2i-ruby-container",
-    "valkey-container",
-    "varnish-container",
-]
 
+API_URL = "https://api.dev.testing-farm.io/v0.1"
 REPORTS_PUBLIC_URL = "https://artifacts.dev.testing-farm.io"
 REPORTS_PRIVATE_URL = "https://artifacts.osci.redhat.com/testing-farm"
 LOG_DIR = os.getenv("SHARED_DIR")
+# Maximum number of container logs downloaded in parallel
+DEFAULT_WORKERS = 8
+# Artifacts are spread over public and private Testing Farm hosts
+ARTIFACT_HOSTS = 2
+# Size of chunks written to disk while streaming artifacts
+CHUNK_SIZE = 1024 * 1024
+# Interrupted downloads are kept in '<log>.part' together with validator
+# of the artifact in '<log>.part.validator' and resumed on the next attempt
+PART_SUFFIX = ".part"
+VALIDATOR_SUFFIX = ".validator"
+# Start of the range sent in 206 response, e.g. 'bytes 100-199/200'
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-")
+# Links to container logs in the HTML directory index of data/ and data/results
+LOG_HREF_RE = re.compile(r'<a href="([^"/?]+\.log)"')
+# Default timeouts and time budget (in seconds) of the HTTP requests
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+DEFAULT_DEADLINE = 1800
+# Polling of the Testing Farm request state (in seconds)
+POLL_INTERVAL = 10
+MAX_POLL_INTERVAL = 120
+DEFAULT_WAIT_TIMEOUT = 3600
+# Request states after which Testing Farm does not produce any new results
+FINAL_STATES = ("complete", "error", "canceled")
+# Directory under SHARED_DIR with one artifact cache file per request ID
+ARTIFACT_CACHE_DIR = "artifact_cache"
+# Testing Farm CLI prints API URL of each request it submits
+REQUEST_API_RE = re.compile(
+    rb"api https://api\.dev\.testing-farm\.io/v0\.1/requests/([0-9A-Za-z-]+)"
+)
+# Testing Farm request IDs given instead of a Testing Farm CLI log
+REQUEST_ID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+)
+# Suffixes of logs stored compressed by --compress
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+# Compact summary of results.xml stored next to the downloaded logs
+RESULTS_SUMMARY = "results-summary.json"
+
+
+def file_sha256(path: Path) -> str:
+    """
+    Return sha256 hex digest of the file, read in chunks.
+    """
+    sha = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def compress_file(path: Path, codec: str) -> Path:
+    """
+    Compress the file with gzip or zstd and remove the original.
+    Return path of the compressed file.
+    """
+    compressed_path = path.with_name(path.name + COMPRESSED_SUFFIXES[codec])
+    tmp_path = compressed_path.with_name(compressed_path.name + ".tmp")
+    with path.open("rb") as src:
+        if codec == "zstd":
+            with tmp_path.open("wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            with gzip.open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    os.replace(tmp_path, compressed_path)
+    path.unlink()
+    return compressed_path
+
+
+def find_request_ids(log_file: Path) -> List[str]:
+    """
+    Return all Testing Farm request IDs found in the log, in order.
+    The log is memory-mapped and scanned as bytes, so even large logs
+    are not read into Python strings.
+    """
+    request_ids: List[str] = []
+    with log_file.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return request_ids
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in REQUEST_API_RE.finditer(mm):
+                request_id = match.group(1).decode()
+                if request_id not in request_ids:
+                    request_ids.append(request_id)
+    return request_ids
+
+
+def parse_results_xml(xml_path: Path) -> Dict:
+    """
+    Incrementally parse Testing Farm results.xml.
+    Return summary with name, result and logs of each testsuite and
+    name, result and duration of each of its testcases.
+    Parsed elements are cleared right away, so memory stays bounded
+    even for large suites.
+    """
+    summary: Dict = {"testsuites": []}
+    suite: Optional[Dict] = None
+    tags: List[str] = []
+    for event, elem in ET.iterparse(str(xml_path), events=("start", "end")):
+        if event == "start":
+            tags.append(elem.tag)
+            if elem.tag == "testsuite":
+                suite = {
+                    "name": elem.get("name"),
+                    "result": elem.get("result"),
+                    "logs": [],
+                    "testcases": [],
+                }
+            continue
+        tags.pop()
+        if (
+            elem.tag == "log"
+            and suite is not None
+            and tags[-2:] == ["testsuite", "logs"]
+        ):
+            suite["logs"].append({"name": elem.get("name"), "href": elem.get("href")})
+        elif elem.tag == "testcase" and suite is not None:
+            duration = elem.get("time")
+            suite["testcases"].append(
+                {
+                    "name": elem.get("name"),
+                    "result": elem.get("result"),
+                    "duration": float(duration) if duration else None,
+                }
+            )
+            elem.clear()
+        elif elem.tag == "testsuite":
+            summary["testsuites"].append(suite)
+            suite = None
+            elem.clear()
+    return summary
+
+
+class RetryPolicy:
+    """
+    Retry policy shared by all HTTP requests of one downloader run.
+    Every request gets connect and read timeouts, failed requests are
+    retried with exponential backoff and jitter, client errors (4xx)
+    are never retried and nothing is started after the deadline.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: float = 2.0,
+        max_backoff: float = 30.0,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        deadline: Optional[float] = DEFAULT_DEADLINE,
+    ):
+        self.max_attempts: int = max(1, max_attempts)
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.deadline: Optional[float] = deadline
+        self.deadline_at: Optional[float] = None
+        self.start()
+
+    def start(self):
+        """
+        Start counting the time budget from now.
+        """
+        self.deadline_at = time.monotonic() + self.deadline if self.deadline else None
+
+    def remaining(self) -> Optional[float]:
+        """
+        Return seconds left until the deadline or None without deadline.
+        """
+        if self.deadline_at is None:
+            return None
+        return max(0.0, self.deadline_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def timeout(self) -> Tuple[float, float]:
+        """
+        Return (connect, read) timeout which does not exceed the deadline.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        return (
+            max(0.1, min(self.connect_timeout, remaining)),
+            max(0.1, min(self.read_timeout, remaining)),
+        )
+
+    def is_retryable(self, status_code: int) -> bool:
+        return not 400 <= status_code < 500
+
+    def sleep(self, attempt: int) -> bool:
+        """
+        Sleep before the next attempt.
+        Return False if there is no attempt or time left for a retry.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return False
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        delay = random.uniform(delay / 2, delay)
+        remaining = self.remaining()
+        if remaining is not None and remaining <= delay:
+            return False
+        time.sleep(delay)
+        return True
+
+
+class ArtifactCache:
+    """
+    Cache of artifacts downloaded for one Testing Farm request.
+    Entries are keyed by artifact URL and store ETag, Last-Modified,
+    size and sha256 of the local file, so later runs can send
+    conditional requests and skip unchanged artifacts.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file: Path = cache_file
+        self.entries: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        if self.cache_file.exists():
+            try:
+                self.entries = json.loads(self.cache_file.read_text())
+            except ValueError as e:
+                print(f"Ignoring corrupted artifact cache {self.cache_file}: {e}")
+
+    def conditional_headers(self, url: str, path: Path) -> Dict[str, str]:
+        """
+        Return If-None-Match/If-Modified-Since headers for url
+        in case the local copy in path is still the cached one.
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+        if not entry or entry["path"] != str(path) or not path.exists():
+            return {}
+        if path.stat().st_size != entry["size"] or file_sha256(path) != entry["sha256"]:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url: str, path: Path, response: requests.Response):
+        """
+        Store validators of the response and checksum of the downloaded file.
+        """
+        entry = {
+            "path": str(path),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": path.stat().st_size,
+            "sha256": file_sha256(path),
+        }
+        with self.lock:
+            self.entries[url] = entry
+            self.save()
+
+    def save(self):
+        """
+        Atomically write the cache file.
+        """
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.tmp")
+        tmp_file.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+        os.replace(tmp_file, self.cache_file)
+
+
+def resume_validator(response: requests.Response) -> str:
+    """
+    Return validator of the artifact usable in If-Range header.
+    Weak ETags cannot be used to resume a download.
+    """
+    etag = response.headers.get("ETag") or ""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified") or ""
+
+
+def drop_partial_download(part_path: Path):
+    """
+    Remove partial file of the download and validator of its artifact.
+    """
+    for path in (part_path, part_path.with_name(part_path.name + VALIDATOR_SUFFIX)):
+        if path.exists():
+            path.unlink()
+
+
+def mount_pool(session: requests.Session, workers: int):
+    """
+    Mount connection pools holding a connection for each of the workers
+    downloading from one host, so no connection is discarded.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=max(ARTIFACT_HOSTS, workers), pool_maxsize=workers
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
 
 
 class TestingFarmLogDownloader:
@@ -41,17 +341,43 @@ class TestingFarmLogDownloader:
     Download logs from Testing Farm and store them in the log directory.
     """
 
-    def __init__(self, log_file: str, target: str, test: str):
+    def __init__(
+        self,
+        log_file: str,
+        target: str,
+        test: str,
+        workers: int = DEFAULT_WORKERS,
+        force: bool = False,
+        retry: RetryPolicy = None,
+        session: requests.Session = None,
+        report_date: str = None,
+        compress: str = None,
+    ):
         """
         Initialize the TestingFarmLogDownloader class.
+        The session and the retry policy can be shared by several downloaders.
+        With compress set to 'gzip' or 'zstd' the logs are stored compressed.
         """
+        if compress and compress not in COMPRESSED_SUFFIXES:
+            raise ValueError(f"Unsupported compression '{compress}'")
+        if compress == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard module")
         self.log_file: Path = Path(log_file)
         self.target: str = target
         self.test: str = test
+        self.workers: int = max(1, workers)
+        self.force: bool = force
+        self.compress: Optional[str] = compress
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self.failed_downloads: List[str] = []
+        self.session: requests.Session = session or self.create_session()
         self.request_id: str = None
-        self.xml_dict: dict = None
-        self.date = date.today().strftime("%Y-%m-%d")
-        self.data_dir_url_link: str = None
+        self.request_ids: List[str] = []
+        self.cache: Optional[ArtifactCache] = None
+        self.results_summary: Optional[Dict] = None
+        self.date = report_date or date.today().strftime("%Y-%m-%d")
+        # One data directory per plan of the request
+        self.data_dir_url_links: List[str] = []
         self.log_dir: Path = (
             Path(LOG_DIR)
             / "daily_reports_dir"
@@ -59,142 +385,649 @@ class TestingFarmLogDownloader:
             / f"{self.target}-{self.test}"
         )
 
-    def get_request_id(self) -> bool:
+    def create_session(self) -> requests.Session:
         """
-        Get the request ID from the log file.
+        Create HTTP session with connection pool sized for all workers.
         """
-        with self.log_file.open() as f:
-            lines = f.readlines()
+        session = requests.Session()
+        session.verify = False
+        mount_pool(session, self.workers)
+        return session
 
-        for line in lines:
-            if "api https://api.dev.testing-farm.io/v0.1/requests/" in line:
-                self.request_id = (
-                    line.replace("api https://api.dev.testing-farm.io/v0.1/", "")
-                    .split("/")[1]
-                    .strip()
-                )
+    def get_with_retry(self, url: str) -> Optional[requests.Response]:
+        """
+        GET url according to the retry policy.
+        Return the last response or None if no response was received.
+        """
+        response = None
+        for attempt in range(self.retry.max_attempts):
+            if self.retry.expired():
+                print(f"Deadline reached, not requesting {url}.")
+                break
+            try:
+                response = self.session.get(url, timeout=self.retry.timeout())
+            except requests.exceptions.RequestException as e:
+                print(f"Request {url} failed: {e}")
+                response = None
+            if response is not None:
+                if response.status_code == 200:
+                    return response
+                if not self.retry.is_retryable(response.status_code):
+                    break
+            if not self.retry.sleep(attempt):
                 break
+        if response is None or response.status_code != 200:
+            self.failed_downloads.append(url)
+        return response
 
-        if not self.request_id:
+    def get_request_id(self, index: int = -1) -> bool:
+        """
+        Get the request ID from the log file.
+        In case the request was retried and the log contains more request IDs,
+        index selects one of them. The latest one is used by default.
+        """
+        self.request_ids = find_request_ids(self.log_file)
+        if not self.request_ids:
             print("Request ID not found in the log.")
             return False
+        if len(self.request_ids) > 1:
+            print(f"Request IDs found in the log: {self.request_ids}")
+        try:
+            request_id = self.request_ids[index]
+        except IndexError:
+            print(f"Request ID with index {index} not found in the log.")
+            return False
 
-        print(f"Request ID: {self.request_id}")
+        self.set_request_id(request_id)
         return True
 
+    def set_request_id(self, request_id: str):
+        """
+        Set the request ID and load the artifact cache of the request.
+        """
+        self.request_id = request_id
+        print(f"Request ID: {self.request_id}")
+        self.cache = ArtifactCache(
+            Path(LOG_DIR) / ARTIFACT_CACHE_DIR / f"{self.request_id}.json"
+        )
+
     def download_log(
-        self, log_name_url: str, log_name: str = None, is_failed: bool = False
+        self,
+        log_name_url: str,
+        log_name: str = None,
+        is_failed: bool = False,
+        compressible: bool = True,
     ) -> bool:
         """
         Download a log from the Testing Farm.
+        The log is streamed in chunks into a '.part' file which is renamed
+        once the download is complete. An interrupted download is resumed
+        by an HTTP Range request on the next attempt.
+        Logs which did not change since the previous run are not
+        downloaded again, unless force is set.
+        Compressible logs are compressed once downloaded, if requested.
         """
-        for _ in range(2):
-            logfile_dir = self.log_dir / "results" if is_failed else self.log_dir
+        logfile_dir = self.log_dir / "results" if is_failed else self.log_dir
+        logfile_dir.mkdir(parents=True, exist_ok=True)
+        log_path = logfile_dir / log_name
+        part_path = logfile_dir / f"{log_name}{PART_SUFFIX}"
+        stored_path = log_path
+        if self.compress and compressible:
+            stored_path = log_path.with_name(
+                log_name + COMPRESSED_SUFFIXES[self.compress]
+            )
+        for attempt in range(self.retry.max_attempts):
+            if self.retry.expired():
+                print(f"Deadline reached, not downloading log {log_name_url}.")
+                break
+            headers = {}
+            if self.cache and not self.force and not part_path.exists():
+                headers = self.cache.conditional_headers(log_name_url, stored_path)
             print(f"Downloading log '{log_name_url}' to '{logfile_dir}'")
-            response = requests.get(log_name_url, verify=False)
-            if response.status_code == 200:
-                with (logfile_dir / log_name).open("wb") as f:
-                    f.write(response.content)
+            try:
+                response = self.stream_to_file(log_name_url, part_path, headers)
+            except requests.exceptions.RequestException as e:
+                print(f"Downloading log {log_name_url} was interrupted: {e}")
+                response = None
+            if response is not None and response.status_code == 304:
+                print(f"Log '{log_name}' is not modified, skipping download.")
                 return True
-            else:
-                time.sleep(2)  # Wait before retrying
+            if response is not None and response.status_code in (200, 206):
+                os.replace(part_path, log_path)
+                if stored_path != log_path:
+                    compress_file(log_path, self.compress)
+                if self.cache:
+                    self.cache.update(log_name_url, stored_path, response)
+                return True
+            if response is not None and not self.retry.is_retryable(
+                response.status_code
+            ):
+                print(f"Log {log_name_url} returned {response.status_code}.")
+                break
+            if not self.retry.sleep(attempt):
+                break
+        print(f"Failed to download log {log_name_url} after multiple attempts.")
+        self.failed_downloads.append(log_name_url)
+        return False
+
+    def stream_to_file(
+        self, url: str, part_path: Path, headers: Dict[str, str] = None
+    ) -> Optional[requests.Response]:
+        """
+        Stream the content of url into part_path.
+        If part_path already contains data from an interrupted download,
+        only the missing bytes are requested. The If-Range validator makes
+        the server send the whole artifact again in case it has changed.
+        Return the closed response or None if the partial file was dropped
+        or the deadline was reached, leaving the partial file to be resumed.
+        """
+        headers = dict(headers or {})
+        validator_path = part_path.with_name(part_path.name + VALIDATOR_SUFFIX)
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        validator = validator_path.read_text() if validator_path.exists() else ""
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
         else:
-            print(f"Failed to download log {log_name_url} after multiple attempts.")
+            # Partial file which cannot be validated is downloaded again
+            offset = 0
+        response = self.session.get(
+            url, headers=headers, stream=True, timeout=self.retry.timeout()
+        )
+        try:
+            if response.status_code == 416:
+                # The partial file does not match the artifact, start from scratch
+                drop_partial_download(part_path)
+                return None
+            if response.status_code not in (200, 206):
+                return response
+            if response.status_code == 206:
+                match = CONTENT_RANGE_RE.match(
+                    response.headers.get("Content-Range", "")
+                )
+                if not match or int(match.group(1)) != offset:
+                    print(f"Unexpected range of {url}, downloading it again.")
+                    drop_partial_download(part_path)
+                    return None
+                mode = "ab"
+            else:
+                # Server ignored the Range header or the artifact has changed
+                mode = "wb"
+                validator = resume_validator(response)
+                if validator:
+                    validator_path.write_text(validator)
+                elif validator_path.exists():
+                    validator_path.unlink()
+            with part_path.open(mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    # Read timeout restarts with every chunk of a slow server
+                    if self.retry.expired():
+                        print(f"Deadline reached while downloading {url}.")
+                        return None
+            if validator_path.exists():
+                validator_path.unlink()
+            return response
+        finally:
+            response.close()
+
+    def get_request_state(self) -> Optional[str]:
+        """
+        Return state of the request from the Testing Farm API
+        or None if it is not available.
+        """
+        state_url = f"{API_URL}/requests/{self.request_id}"
+        try:
+            response = self.session.get(
+                state_url, timeout=(self.retry.connect_timeout, self.retry.read_timeout)
+            )
+            if response.status_code != 200:
+                print(f"Request state is not available: {response.status_code}")
+                return None
+            return response.json().get("state")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Failed to get request state from {state_url}: {e}")
+            return None
+
+    def is_xml_report_available(self) -> bool:
+        """
+        Return True if the XML report can already be downloaded.
+        """
+        try:
+            response = self.session.head(
+                self.get_xml_report_url(),
+                allow_redirects=True,
+                timeout=(self.retry.connect_timeout, self.retry.read_timeout),
+            )
+        except requests.exceptions.RequestException:
             return False
+        return response.status_code == 200
+
+    def wait_for_results(
+        self,
+        timeout: float = DEFAULT_WAIT_TIMEOUT,
+        interval: float = POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+    ) -> bool:
+        """
+        Poll the Testing Farm request state until the XML report is available.
+        The polling interval doubles while the state does not change
+        and starts again from interval once it changes.
+        Return False if the report is not available until timeout
+        or the request finished without it.
+        """
+        deadline_at = time.monotonic() + timeout
+        delay = interval
+        last_state = None
+        while True:
+            state = self.get_request_state()
+            print(f"Request {self.request_id} state: {state}")
+            if state != last_state:
+                delay = interval
+                last_state = state
+            if state not in ("new", "queued") and self.is_xml_report_available():
+                print("XML report is available.")
+                return True
+            if state in FINAL_STATES:
+                print(f"Request finished in state '{state}' without XML report.")
+                return False
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                print(f"XML report is not available after {timeout} seconds.")
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_interval)
+
+    def get_tmt_logs(self) -> List[Tuple[str, str]]:
+        """
+        Return (url, log name) of TMT logs from the results summary
+        and remember URLs of data directories of all plans.
+        """
+        tmt_logs = []
+        list_logs_to_download = ["tmt-verbose-log", "tmt-log"]
+        testsuites = self.results_summary["testsuites"]
+        for testsuite in testsuites:
+            for log in testsuite["logs"]:
+                if log["name"] in list_logs_to_download:
+                    log_name = log["name"]
+                    if len(testsuites) > 1:
+                        # Keep TMT logs of all plans, e.g. 'tmt-log-nightly-c9s'
+                        log_name += "-" + testsuite["name"].rstrip("/").split("/")[-1]
+                    tmt_logs.append((log["href"], log_name))
+                    continue
+                if log["name"] == "data" and log["href"] not in self.data_dir_url_links:
+                    self.data_dir_url_links.append(log["href"])
+        return tmt_logs
 
     def download_tmt_logs(self):
         """
         Download TMT logs from the Testing Farm.
         """
-        if not self.xml_dict:
+        if not self.results_summary:
             print("XML report not found.")
             return False
-        list_logs_to_download = ["tmt-verbose-log", "tmt-log"]
-        for log in self.xml_dict["testsuites"]["testsuite"]["logs"]["log"]:
-            if log["@name"] in list_logs_to_download:
-                self.download_log(log["@href"], log["@name"])
-                continue
-            if log["@name"] == "data":
-                self.data_dir_url_link = log["@href"]
+        for log_url, log_name in self.get_tmt_logs():
+            self.download_log(log_url, log_name)
 
     def get_list_of_containers_logs(self, html_content: str):
         """
-        Get the list of failed containers from the HTML content.
+        Get the list of container log files from the HTML directory index.
         """
         try:
-            list_of_failed_containers = []
-            for line in html_content.split("\n"):
-                if re.search(r"<a href=\"[a-zA-Z0-9.-]+\">", line):
-                    list_of_failed_containers.append(
-                        re.search(r"<a href=\"[a-zA-Z0-9.-]+\">", line).group(0)
-                    )
-            return list_of_failed_containers
+            list_of_containers_logs = []
+            for href in LOG_HREF_RE.findall(html_content):
+                log_name = urllib.parse.unquote(href)
+                if log_name not in list_of_containers_logs:
+                    list_of_containers_logs.append(log_name)
+            return list_of_containers_logs
         except Exception as e:
             print(f"Failed to get list of failed containers: {e}")
             return False
 
-    def download_container_logs(self, is_failed: bool = False) -> bool:
+    def get_container_logs(
+        self, is_failed: bool = False
+    ) -> Optional[List[Tuple[str, str]]]:
         """
-        Download the failed container logs from the Testing Farm.
+        Return (url, log name) of container logs listed in the data
+        or data/results directory indexes of all plans or None if none
+        of them is available.
         """
-        if not self.data_dir_url_link:
+        if not self.data_dir_url_links:
             print("Data directory URL link not found.")
-            return False
-        url_link = self.data_dir_url_link
-        if is_failed:
-            url_link += "/results"
-
-        print(f"Data directory URL link: {url_link}")
-        response = requests.get(url_link, verify=False)
-        if response.status_code == 200:
-            print(response.text)
-        else:
-            print(f"Failed to download data/results directory: {response.status_code}")
-            return False
-        for cont in CONTAINERS:
-            self.download_log(
-                f"{url_link}/{cont}.log", f"{cont}.log", is_failed=is_failed
+            return None
+        containers_logs = None
+        for data_dir_url_link in self.data_dir_url_links:
+            url_link = data_dir_url_link
+            if is_failed:
+                url_link += "/results"
+            print(f"Data directory URL link: {url_link}")
+            response = self.get_with_retry(url_link)
+            if response is None or response.status_code != 200:
+                status = response.status_code if response is not None else "no response"
+                print(f"Failed to download data/results directory: {status}")
+                continue
+            containers_logs = containers_logs or []
+            log_names = self.get_list_of_containers_logs(response.text)
+            if not log_names:
+                print(f"No container logs found in {url_link}")
+                continue
+            print(f"Container logs to download: {log_names}")
+            containers_logs.extend(
+                (f"{url_link}/{urllib.parse.quote(log_name)}", log_name)
+                for log_name in log_names
             )
+        return containers_logs
+
+    def download_container_logs(self, is_failed: bool = False) -> bool:
+        """
+        Download the container logs listed in the data or data/results
+        directory index from the Testing Farm.
+        """
+        containers_logs = self.get_container_logs(is_failed=is_failed)
+        if containers_logs is None:
+            return False
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(
+                    self.download_log, log_url, log_name, is_failed=is_failed
+                )
+                for log_url, log_name in containers_logs
+            ]
+        for future in futures:
+            future.result()
         return True
 
+    def get_xml_report_url(self) -> str:
+        """
+        Return URL of the XML report, public targets use public artifacts.
+        """
+        if self.target in ["fedora", "c9s", "c10s"]:
+            return f"{REPORTS_PUBLIC_URL}/{self.request_id}/results.xml"
+        return f"{REPORTS_PRIVATE_URL}/{self.request_id}/results.xml"
+
     def get_xml_report(self) -> bool:
         """
         Get the XML report from the Testing Farm.
         """
-        if self.target in ["fedora", "c9s", "c10s"]:
-            xml_report_url = f"{REPORTS_PUBLIC_URL}/{self.request_id}/results.xml"
-        else:
-            xml_report_url = f"{REPORTS_PRIVATE_URL}/{self.request_id}/results.xml"
+        xml_report_url = self.get_xml_report_url()
         print(f"XML Report URL: {xml_report_url}")
-        for _ in range(2):
-            response = requests.get(xml_report_url, verify=False)
-            if response.status_code == 200:
-                self.xml_dict = xmltodict.parse(response.content)
-                break
-            else:
-                time.sleep(2)  # Wait before retrying
-        else:
+        if not self.download_log(xml_report_url, "results.xml", compressible=False):
             print("Failed to download XML report after multiple attempts.")
             return False
+        try:
+            self.results_summary = parse_results_xml(self.log_dir / "results.xml")
+        except ET.ParseError as e:
+            print(f"Failed to parse XML report: {e}")
+            return False
+        summary_file = self.log_dir / RESULTS_SUMMARY
+        summary_file.write_text(json.dumps(self.results_summary, separators=(",", ":")))
+        print(f"Results summary stored in {summary_file}")
         return True
 
 
+class BatchLogDownloader:
+    """
+    Download artifacts of many Testing Farm requests in one asyncio event loop.
+    Requests to one host are limited by a per-host semaphore, all downloaders
+    share a single HTTP session.
+    """
+
+    def __init__(
+        self,
+        downloaders: List[TestingFarmLogDownloader],
+        per_host: int = DEFAULT_WORKERS,
+    ):
+        self.downloaders: List[TestingFarmLogDownloader] = downloaders
+        self.per_host: int = max(1, per_host)
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.per_host * ARTIFACT_HOSTS)
+        # At most per_host requests run against one host at a time,
+        # the connection pool of each host has to hold all of them
+        for session in {id(d.session): d.session for d in downloaders}.values():
+            mount_pool(session, self.per_host)
+
+    async def fetch(self, url: str, func, *args, **kwargs):
+        """
+        Run blocking func in a worker thread once url's host has a free slot.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        semaphore = self.semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, lambda: func(*args, **kwargs)
+            )
+
+    async def download_request(self, downloader: TestingFarmLogDownloader) -> bool:
+        """
+        Download the XML report, TMT logs and container logs of one request.
+        """
+        xml_report_url = downloader.get_xml_report_url()
+        if not await self.fetch(xml_report_url, downloader.get_xml_report):
+            print(f"Failed to download XML report for {downloader.log_dir.name}.")
+            return False
+        tmt_logs = downloader.get_tmt_logs()
+        downloads = [
+            self.fetch(log_url, downloader.download_log, log_url, log_name)
+            for log_url, log_name in tmt_logs
+        ]
+        if downloader.data_dir_url_links:
+            listings = await asyncio.gather(
+                *[
+                    self.fetch(
+                        downloader.data_dir_url_links[0],
+                        downloader.get_container_logs,
+                        is_failed=is_failed,
+                    )
+                    for is_failed in (False, True)
+                ]
+            )
+            for is_failed, containers_logs in zip((False, True), listings):
+                downloads.extend(
+                    self.fetch(
+                        log_url,
+                        downloader.download_log,
+                        log_url,
+                        log_name,
+                        is_failed=is_failed,
+                    )
+                    for log_url, log_name in containers_logs or []
+                )
+        await asyncio.gather(*downloads)
+        return True
+
+    async def run(self) -> List[bool]:
+        return await asyncio.gather(
+            *[self.download_request(downloader) for downloader in self.downloaders]
+        )
+
+    def download_all(self) -> bool:
+        """
+        Download artifacts of all requests.
+        Return True if the XML reports of all requests were downloaded.
+        """
+        try:
+            results = asyncio.run(self.run())
+        finally:
+            self.executor.shutdown()
+        return all(results)
+
+    @property
+    def failed_downloads(self) -> List[str]:
+        return [url for d in self.downloaders for url in d.failed_downloads]
+
+
+def create_batch_downloader(
+    entries: List[str],
+    workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+    retry: RetryPolicy = None,
+    report_date: str = None,
+    compress: str = None,
+) -> BatchLogDownloader:
+    """
+    Create BatchLogDownloader from entries in the format
+    '<target>:<test>:<Testing Farm log file or request ID>'.
+    """
+    retry = retry or RetryPolicy()
+    session = None
+    downloaders = []
+    for entry in entries:
+        try:
+            target, test, source = entry.split(":", 2)
+        except ValueError:
+            raise ValueError(f"Invalid batch entry '{entry}'")
+        downloader = TestingFarmLogDownloader(
+            source,
+            target,
+            test,
+            workers=workers,
+            force=force,
+            retry=retry,
+            session=session,
+            report_date=report_date,
+            compress=compress,
+        )
+        session = downloader.session
+        if Path(source).is_file():
+            if not downloader.get_request_id():
+                raise ValueError(f"Request ID not found in '{source}'")
+        elif REQUEST_ID_RE.match(source):
+            downloader.set_request_id(source)
+        else:
+            raise ValueError(f"'{source}' is neither a log file nor a request ID")
+        downloaders.append(downloader)
+    return BatchLogDownloader(downloaders, per_host=workers)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Download logs from Testing Farm.")
-    parser.add_argument("log_file", type=str, help="Path to the log file")
-    parser.add_argument("target", type=str, help="Target environment")
-    parser.add_argument("test", type=str, help="Test name")
+    parser.add_argument("log_file", type=str, nargs="?", help="Path to the log file")
+    parser.add_argument("target", type=str, nargs="?", help="Target environment")
+    parser.add_argument("test", type=str, nargs="?", help="Test name")
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="TARGET:TEST:LOG_FILE_OR_REQUEST_ID",
+        help="Download artifacts of several Testing Farm requests at once",
+    )
+    parser.add_argument(
+        "--date",
+        help="Date of the daily reports directory, today by default",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of logs downloaded in parallel (per host in batch mode)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=int,
+        default=DEFAULT_DEADLINE,
+        help="Time budget in seconds for all downloads, 0 means no deadline",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=CONNECT_TIMEOUT,
+        help="Connect timeout in seconds of each HTTP request",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=READ_TIMEOUT,
+        help="Read timeout in seconds of each HTTP request",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSED_SUFFIXES),
+        help="Store downloaded logs compressed (.gz or .zst)",
+    )
+    parser.add_argument(
+        "--request-index",
+        type=int,
+        default=-1,
+        help="Request ID to use if the log contains more of them, "
+        "-1 (default) is the latest one",
+    )
+    parser.add_argument(
+        "--wait-for-results",
+        action="store_true",
+        default=False,
+        help="Poll the Testing Farm request state and start downloading "
+        "as soon as the XML report is available",
+    )
+    parser.add_argument(
+        "--wait-timeout",
+        type=int,
+        default=DEFAULT_WAIT_TIMEOUT,
+        help="Maximum time in seconds to wait for the XML report",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=False,
+        help="Download all artifacts again, ignoring the artifact cache",
+    )
 
     args = parser.parse_args()
+    if not args.batch and not (args.log_file and args.target and args.test):
+        parser.error("log_file, target and test are required without --batch")
 
-    downloader = TestingFarmLogDownloader(args.log_file, args.target, args.test)
-    downloader.get_request_id()
+    retry_policy = RetryPolicy(
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        deadline=args.deadline,
+    )
+    if args.batch:
+        try:
+            batch_downloader = create_batch_downloader(
+                args.batch,
+                workers=args.workers,
+                force=args.force,
+                retry=retry_policy,
+                report_date=args.date,
+                compress=args.compress,
+            )
+        except ValueError as e:
+            print(f"Cannot start batch download: {e}")
+            sys.exit(1)
+        batch_ok = batch_downloader.download_all()
+        if batch_downloader.failed_downloads:
+            print("These artifacts could not be downloaded:")
+            print("\n".join(batch_downloader.failed_downloads))
+        sys.exit(0 if batch_ok else 1)
+
+    try:
+        downloader = TestingFarmLogDownloader(
+            args.log_file,
+            args.target,
+            args.test,
+            workers=args.workers,
+            force=args.force,
+            retry=retry_policy,
+            report_date=args.date,
+            compress=args.compress,
+        )
+    except ValueError as e:
+        print(f"Cannot download logs: {e}")
+        sys.exit(1)
+    downloader.get_request_id(index=args.request_index)
     if not downloader.request_id:
         print("Cannot download logs without a valid request ID.")
         sys.exit(1)
+    if args.wait_for_results:
+        if not downloader.wait_for_results(timeout=args.wait_timeout):
+            print("XML report is not available, trying to download it anyway.")
+        # Time spent by waiting does not count to the download time budget
+        retry_policy.start()
     if not downloader.get_xml_report():
         print("Failed to download XML report.")
         sys.exit(1)
     downloader.download_tmt_logs()
     downloader.download_container_logs()
     downloader.download_container_logs(is_failed=True)
+    if downloader.failed_downloads:
+        print("These artifacts could not be downloaded:")
+        print("\n".join(downloader.failed_downloads))
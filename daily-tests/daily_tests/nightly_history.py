@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+import argparse
+import sqlite3
+import sys
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+from daily_tests.report_state import (  # noqa: E402
+    STATE_FILES,
+    container_name,
+    load_state,
+    split_test_case,
+)
+
+# The default directory used for nightly build
+RESULTS_DIR = Path("/var/ci-scripts/daily_reports_dir")
+HISTORY_DB = RESULTS_DIR / "nightly_history.sqlite3"
+# Container of the row which stores result of the whole test case
+TEST_CASE_ROW = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    date TEXT NOT NULL,
+    test_case TEXT NOT NULL,
+    os TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    container TEXT NOT NULL,
+    status TEXT NOT NULL,
+    log_size INTEGER,
+    tmt_state TEXT NOT NULL,
+    PRIMARY KEY (date, test_case, container)
+);
+CREATE INDEX IF NOT EXISTS results_by_container
+    ON results (container, os, test_type, date);
+CREATE INDEX IF NOT EXISTS results_by_status ON results (status, date);
+"""
+
+
+def state_rows(state: Dict) -> List[Tuple]:
+    """
+    Convert report state of one day to rows of results table.
+    Every test case has one row for the whole test case
+    and one row per each container with a log.
+    """
+    rows = []
+    for test_case, case in state["test_cases"].items():
+        os_name, test_type = split_test_case(test_case)
+        markers = case.get("markers", [])
+        tmt_state = next((x for x in markers if x.startswith("tmt_")), "")
+        common = (state["date"], test_case, os_name, test_type, case.get("plan", ""))
+        rows.append(common + (TEST_CASE_ROW, case["status"], None, tmt_state))
+        containers = {}
+        for status, logs in (
+            ("success", case["success_logs"]),
+            ("failed", case["failed_logs"]),
+        ):
+            for log in logs:
+                # Failed log wins over success log of the same container
+                name = container_name(Path(log["path"]).name)
+                containers[name] = (status, log["size"])
+        for name, (status, size) in sorted(containers.items()):
+            rows.append(common + (name, status, size, tmt_state))
+    return rows
+
+
+class NightlyHistory(object):
+    """
+    History of nightly test results stored in SQLite database.
+    """
+
+    def __init__(self, database: Path):
+        self.database = database
+        self.connection = sqlite3.connect(str(database))
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def ingest_state(self, state: Dict) -> int:
+        """
+        Store report state of one day. Results of already ingested
+        test cases of the same day are replaced.
+        :return: number of stored rows
+        """
+        rows = state_rows(state)
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM results WHERE date = ? AND test_case = ?",
+                [(state["date"], test_case) for test_case in state["test_cases"]],
+            )
+            self.connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def ingest_reports_dir(self, reports_dir: Path, dates: Iterable[str]) -> int:
+        """
+        Store report states found in reports directory for given days.
+        :return: number of stored rows
+        """
+        count = 0
+        for day in dates:
+            for name in STATE_FILES:
+                state = load_state(reports_dir / day / name)
+                if state:
+                    count += self.ingest_state(state)
+        return count
+
+    def filters(
+        self,
+        container: Optional[str] = None,
+        os_name: Optional[str] = None,
+        test_type: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> Tuple[str, List[str]]:
+        """
+        Return WHERE clause of container rows and its parameters.
+        """
+        clauses = ["container != ?"]
+        params = [TEST_CASE_ROW]
+        for clause, value in (
+            ("container = ?", container),
+            ("os = ?", os_name),
+            ("test_type = ?", test_type),
+            ("date >= ?", since),
+        ):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def failure_rates(self, **filters) -> List[Tuple]:
+        """
+        Return (container, os, test_type, runs, failures, first_date, last_date)
+        sorted by number of failures.
+        """
+        where, params = self.filters(**filters)
+        return self.connection.execute(
+            "SELECT container, os, test_type, COUNT(*), "
+            "SUM(status = 'failed'), MIN(date), MAX(date) "
+            f"FROM results WHERE {where} "
+            "GROUP BY container, os, test_type "
+            "ORDER BY SUM(status = 'failed') DESC, container, os, test_type",
+            params,
+        ).fetchall()
+
+    def streaks(self, **filters) -> List[Tuple]:
+        """
+        Return (container, test_case, failed_days, first_failure) for containers
+        failing in their latest run, first_failure is date when the streak started.
+        """
+        where, params = self.filters(**filters)
+        rows = self.connection.execute(
+            "SELECT container, test_case, date, status "
+            f"FROM results WHERE {where} "
+            "ORDER BY container, test_case, date DESC",
+            params,
+        )
+        streaks = {}
+        for container, test_case, day, status in rows:
+            key = (container, test_case)
+            if key not in streaks:
+                streaks[key] = [0, None, status == "failed"]
+            streak = streaks[key]
+            if not streak[2]:
+                continue
+            if status == "failed":
+                streak[0] += 1
+                streak[1] = day
+            else:
+                streak[2] = False
+        return sorted(
+            (
+                key + (streak[0], streak[1])
+                for key, streak in streaks.items()
+                if streak[0]
+            ),
+            key=lambda x: (-x[2], x[0], x[1]),
+        )
+
+    def first_failures(self, **filters) -> List[Tuple]:
+        """
+        Return (container, test_case, first_failure, last_failure) of failed containers.
+        """
+        where, params = self.filters(**filters)
+        return self.connection.execute(
+            "SELECT container, test_case, MIN(date), MAX(date) "
+            f"FROM results WHERE {where} AND status = 'failed' "
+            "GROUP BY container, test_case "
+            "ORDER BY MIN(date), container, test_case",
+            params,
+        ).fetchall()
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Store nightly test results to SQLite history and query it."
+    )
+    parser.add_argument(
+        "--database",
+        type=Path,
+        help="SQLite database with history of nightly results.",
+        default=HISTORY_DB,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser(
+        "ingest", help="Store report states of given days to the history."
+    )
+    ingest.add_argument(
+        "--reports-dir",
+        type=Path,
+        help="Directory with reports of all days.",
+        default=RESULTS_DIR,
+    )
+    ingest.add_argument(
+        "dates",
+        nargs="*",
+        help="Days in YYYY-MM-DD format, all days in reports directory by default.",
+    )
+    for command, help_msg in (
+        ("failure-rate", "Show how often containers failed."),
+        ("streaks", "Show containers failing in their latest runs."),
+        ("first-failure", "Show when containers failed for the first time."),
+    ):
+        query = subparsers.add_parser(command, help=help_msg)
+        query.add_argument("--container", help="Container, e.g. s2i-ruby-container")
+        query.add_argument("--os", dest="os_name", help="OS, e.g. rhel9")
+        query.add_argument("--test-type", help="Test type, e.g. test-pytest")
+        query.add_argument("--since", help="Only days since YYYY-MM-DD")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    history = NightlyHistory(args.database)
+    try:
+        if args.command == "ingest":
+            dates = args.dates or sorted(
+                x.name for x in args.reports_dir.iterdir() if x.is_dir()
+            )
+            count = history.ingest_reports_dir(args.reports_dir, dates)
+            print(f"Stored {count} results of {len(dates)} days to {args.database}")
+            return 0
+        filters = {
+            "container": args.container,
+            "os_name": args.os_name,
+            "test_type": args.test_type,
+            "since": args.since,
+        }
+        if args.command == "failure-rate":
+            for (
+                container,
+                os_name,
+                test_type,
+                runs,
+                failures,
+                first,
+                last,
+            ) in history.failure_rates(**filters):
+                print(
+                    f"{container} {os_name} {test_type}: failed {failures}/{runs} "
+                    f"({100 * failures // runs}%) between {first} and {last}"
+                )
+        elif args.command == "streaks":
+            for container, test_case, days, first in history.streaks(**filters):
+                print(f"{container} {test_case}: failing {days} runs since {first}")
+        else:
+            for container, test_case, first, last in history.first_failures(**filters):
+                print(f"{container} {test_case}: first failed {first}, last {last}")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
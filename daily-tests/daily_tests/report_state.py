@@ -0,0 +1,52 @@
+import json
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Logs can be stored compressed by 'download_logs.py --compress'
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+LOG_SUFFIXES = (".log",) + tuple(f".log{suffix}" for suffix in COMPRESSED_SUFFIXES)
+# Report state written by 'daily_nightly_tests_report.py'
+# into reports directory of each day
+STATE_VERSION = 1
+STATE_FILE = "report-state.json"
+UPSTREAM_STATE_FILE = "report-state-upstream.json"
+STATE_FILES = (STATE_FILE, UPSTREAM_STATE_FILE)
+
+
+def container_name(log_name: str) -> str:
+    """
+    Return container name for log name like 'httpd-container.log.gz'.
+    """
+    for suffix in sorted(LOG_SUFFIXES, key=len, reverse=True):
+        if log_name.endswith(suffix):
+            return log_name[: -len(suffix)]
+    return log_name
+
+
+def split_test_case(test_case: str) -> Tuple[str, str]:
+    """
+    Split test case like 'rhel9-test-pytest' to OS 'rhel9' and test type 'test-pytest'.
+    """
+    os_name, _, test_type = test_case.partition("-")
+    return os_name, test_type
+
+
+def load_state(state_file: Path) -> Optional[Dict]:
+    """
+    Load report state written by daily_nightly_tests_report.py.
+    :param state_file: Path to the report state
+    :return: state dictionary or None if the state is missing or unusable
+    """
+    try:
+        state = json.loads(state_file.read_text())
+    except FileNotFoundError:
+        print(f"Report state {state_file} does not exist.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring corrupted report state {state_file}: {e}")
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        print(f"Ignoring report state {state_file} with unknown version.")
+        return None
+    return state
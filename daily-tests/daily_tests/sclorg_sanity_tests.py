@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import hashlib
+import json
 import os
 import sys
 import requests
@@ -6,16 +8,25 @@ import yaml
 import urllib3
 import smtplib
 import argparse
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from tempfile import TemporaryDirectory
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 from shutil import rmtree
-from git import Repo
-from git.exc import GitCommandError
+from git import Git, Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+try:
+    # libyaml parser is much faster than the pure Python one
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 SCLORG_REPOS = {
     # Format is 'repo_name' and 'package_name'
@@ -42,6 +53,177 @@ DEVEL_REPO_URL = "https://url.corp.redhat.com/devel-images"
 
 SANITY_LOG = "sanity_log.txt"
 
+# Downloaded lifecycle file, revalidated by conditional requests
+LIFECYCLE_CACHE = Path("/var/ci-scripts/application-streams.yaml")
+LIFECYCLE_TIMEOUT = 60
+
+SCLORG_REPO_URL = "https://github.com/sclorg/{repo_name}"
+
+CLONE_MODES = ["mirror", "sparse", "full"]
+# Only the last commit without file contents, blobs are fetched on checkout
+SPARSE_CLONE_OPTIONS = ["--depth=1", "--filter=blob:none", "--sparse"]
+# Makefile and top level files of version directories, e.g. 3.12/Dockerfile.rhel9
+SPARSE_PATTERNS = ["/Makefile", "/*/*", "!/*/*/"]
+CLONE_WORKERS = 6
+
+# Bare mirrors kept between runs and updated by 'git fetch'.
+# Trees are enough for the checks, only blob of Makefile is fetched on demand.
+MIRROR_DIR = Path("/var/ci-scripts/sanity_mirrors")
+MIRROR_CLONE_OPTIONS = ["--filter=blob:none"]
+MIRROR_REFSPEC = "+refs/heads/*:refs/heads/*"
+
+# Collected files and verdicts of checks valid for HEAD of each repository
+# and EOL dates valid for the lifecycle file, kept between runs.
+RESULT_CACHE = Path("/var/ci-scripts/sanity_result_cache.json")
+RESULT_CACHE_VERSION = 1
+
+
+def build_lifecycle_index(app_stream: Dict) -> Dict[Tuple[str, str, str], date]:
+    """
+    Index EOL dates of application streams.
+    :param app_stream: Loaded lifecycle file
+    :return: dictionary mapping (name, stream, major RHEL version) to EOL date,
+             the first entry wins like in the lifecycle file order
+    """
+    index: Dict[Tuple[str, str, str], date] = {}
+    for pkg in app_stream.get("lifecycles", []):
+        if "enddate" not in pkg:
+            continue
+        rhel_major = str(pkg["initial_product_version"]).split(".")[0]
+        key = (pkg["name"], str(pkg["stream"]), rhel_major)
+        if key not in index:
+            index[key] = datetime.strptime(str(pkg["enddate"]), "%Y%m%d").date()
+    return index
+
+
+def parse_versions(makefile: str) -> List[str]:
+    """
+    Read versions from VERSIONS variable in Makefile of the repository.
+    :param makefile: Content of the Makefile
+    :return: list of versions
+    """
+    ver_row = [x for x in makefile.splitlines() if x.startswith("VERSIONS")][0]
+    # split() without argument drops empty entries of repeated or trailing spaces
+    return ver_row.split("=")[1].split()
+
+
+def check_files(files: Set[str], ver: str) -> List[str]:
+    """
+    Find .exclude-*, Dockerfile.* and .devel-repo-* files of OS_HOSTS
+    in version directory.
+    :param files: Paths of files in version directories, e.g. 3.12/Dockerfile.rhel9
+    :param ver: Version directory
+    :return: list of found file names
+    """
+    checked_files = []
+    for os_ver in OS_HOSTS:
+        for name in (f".exclude-{os_ver}", f"Dockerfile.{os_ver}"):
+            if f"{ver}/{name}" in files:
+                checked_files.append(name)
+        if f"{ver}/.devel-repo-{os_ver}" in files:
+            checked_files.append(f".devel-repo-{os_ver}")
+    return checked_files
+
+
+def scan_repository(repo_dir: Path) -> Optional[Dict[str, List[str]]]:
+    """
+    Collect checked files of all supported versions of the checked out repository.
+    :param repo_dir: Path to the cloned repository
+    :return: dictionary mapping version to list of found files
+             or None if the repository does not have Makefile
+    """
+    makefile = repo_dir / "Makefile"
+    if not makefile.exists():
+        return None
+    versions = parse_versions(makefile.read_text())
+    files = {
+        f"{ver}/{path.name}"
+        for ver in versions
+        if (repo_dir / ver).is_dir()
+        for path in (repo_dir / ver).iterdir()
+        if path.exists()
+    }
+    return {ver: check_files(files, ver) for ver in versions}
+
+
+def scan_mirror(mirror_dir: Path) -> Optional[Dict[str, List[str]]]:
+    """
+    Collect checked files of all supported versions from HEAD of bare repository.
+    Nothing is checked out, files are listed from the tree object.
+    :param mirror_dir: Path to the bare repository
+    :return: dictionary mapping version to list of found files
+             or None if the repository does not have Makefile
+    """
+    git = Repo(mirror_dir).git
+    try:
+        makefile = git.show("HEAD:Makefile")
+    except GitCommandError:
+        return None
+    versions = parse_versions(makefile)
+    files = set(
+        git.ls_tree(
+            "--name-only", "HEAD", "--", *[f"{ver}/" for ver in versions]
+        ).splitlines()
+    )
+    return {ver: check_files(files, ver) for ver in versions}
+
+
+def is_valid_enddate(enddate) -> bool:
+    """
+    Check the cached EOL date is None or date in format YYYYMMDD.
+    """
+    if enddate is None:
+        return True
+    try:
+        datetime.strptime(enddate, "%Y%m%d")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def is_valid_result_cache(cache: Dict) -> bool:
+    """
+    Check the result cache has the layout written by save_result_cache,
+    so a damaged cache is ignored instead of breaking the checks.
+    :param cache: Result cache with known version
+    """
+    enddates = cache.get("enddates")
+    repos = cache.get("repos")
+    if not isinstance(enddates, dict) or not isinstance(repos, dict):
+        return False
+    if not all(is_valid_enddate(x) for x in enddates.values()):
+        return False
+    for entry in repos.values():
+        if not isinstance(entry, dict) or not isinstance(entry.get("head"), str):
+            return False
+        versions = entry.get("versions")
+        verdicts = entry.get("verdicts")
+        if not isinstance(versions, dict) or not isinstance(verdicts, dict):
+            return False
+        if not all(isinstance(x, list) for x in versions.values()):
+            return False
+        for os_verdicts in verdicts.values():
+            if not isinstance(os_verdicts, dict):
+                return False
+            if not all(
+                isinstance(x, list) and len(x) == 2 and isinstance(x[1], str)
+                for x in os_verdicts.values()
+            ):
+                return False
+    return True
+
+
+def is_valid_mirror(mirror_dir: Path) -> bool:
+    """
+    Check the mirror is a repository with HEAD commit.
+    Interrupted clones leave empty or partial directories behind.
+    :param mirror_dir: Path to the bare repository
+    """
+    try:
+        return Repo(mirror_dir).head.is_valid()
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        return False
+
 
 class SclOrgSanityChecker(object):
     def __init__(self):
@@ -49,8 +231,6 @@ class SclOrgSanityChecker(object):
         self.repo = ""
         self.pkg_name = ""
         self.app_stream: Dict = {}
-        self.cwd = os.getcwd()
-        self.tmp_path_repo: Path
         self.report_text_filename: str = ""
         self.args = self.parse_args()
         self.data_dict: Dict = {}
@@ -60,10 +240,18 @@ class SclOrgSanityChecker(object):
         self.log_dir = os.getcwd()
         self.debug_log = Path(self.log_dir) / SANITY_LOG
         self.message = ""
+        self.log_lock = threading.Lock()
+        self.lifecycle_hash = ""
+        self.lifecycle_index: Dict[Tuple[str, str, str], date] = {}
+        self.result_cache: Dict = {}
+        self.repo_heads: Dict[str, str] = {}
+        self.verdicts: Dict[str, Dict] = {}
+        self.enddates: Dict[str, Optional[str]] = {}
 
     def log_to_file(self, msg):
         print(msg)
-        with open(self.debug_log, "a") as fw:
+        # Repositories are collected in parallel
+        with self.log_lock, open(self.debug_log, "a") as fw:
             if isinstance(msg, Dict):
                 for key, value in msg.items():
                     fw.write(f"{key}:{value}")
@@ -77,7 +265,7 @@ class SclOrgSanityChecker(object):
 
     def write_to_textfile(self, msg, report_file: Path):
         self.log_to_file(msg)
-        with open(report_file, "a") as fw:
+        with self.log_lock, open(report_file, "a") as fw:
             fw.write(msg)
             fw.write("\n")
 
@@ -86,10 +274,135 @@ class SclOrgSanityChecker(object):
         tmp_dir = TemporaryDirectory(suffix="sanity_tests")
         self.tmp_path_dir = Path(tmp_dir.name)
 
-    def download_and_load_lifecycle_file(self):
+    def download_lifecycle_file(self) -> bytes:
+        """
+        Download lifecycle file unless the cached copy is still up to date.
+        The cached copy is used also when the server is not reachable.
+        :return: content of the lifecycle file
+        """
+        cache_file = self.args.lifecycle_cache
+        headers_file = cache_file.with_name(f"{cache_file.name}.headers.json")
+        headers = {}
+        if cache_file.exists() and headers_file.exists():
+            headers = self.lifecycle_cache_headers(cache_file, headers_file)
         urllib3.disable_warnings()
-        response = requests.get(EOL_GA_URL, verify=False)
-        self.app_stream = yaml.safe_load(response.content)
+        try:
+            response = requests.get(
+                EOL_GA_URL, verify=False, headers=headers, timeout=LIFECYCLE_TIMEOUT
+            )
+            if response.status_code == 304:
+                self.log_to_file(msg="Lifecycle file did not change.")
+                return cache_file.read_bytes()
+            response.raise_for_status()
+        except requests.RequestException as ex:
+            if not cache_file.exists():
+                raise
+            self.log_to_file(msg=f"Downloading lifecycle file has failed {ex}.")
+            return cache_file.read_bytes()
+        # Checksum ties the stored headers to the content of the cached file
+        stored_headers = {
+            key: response.headers[key]
+            for key in ("ETag", "Last-Modified")
+            if key in response.headers
+        }
+        stored_headers["sha256"] = hashlib.sha256(response.content).hexdigest()
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        for path, content in (
+            (cache_file, response.content),
+            (headers_file, json.dumps(stored_headers).encode()),
+        ):
+            tmp_file = path.with_name(f"{path.name}.tmp")
+            tmp_file.write_bytes(content)
+            os.replace(tmp_file, path)
+        return response.content
+
+    def lifecycle_cache_headers(self, cache_file: Path, headers_file: Path) -> Dict:
+        """
+        Return conditional request headers for the cached lifecycle file.
+        Nothing is returned when the headers file is damaged or does not
+        belong to the cached file, so the lifecycle file is downloaded again.
+        :param cache_file: Cached lifecycle file
+        :param headers_file: Response headers stored with the cached file
+        :return: dictionary with If-None-Match and If-Modified-Since headers
+        """
+        try:
+            cached_headers = json.loads(headers_file.read_text())
+            digest = hashlib.sha256(cache_file.read_bytes()).hexdigest()
+        except (OSError, ValueError):
+            cached_headers = None
+        if not isinstance(cached_headers, dict) or (
+            cached_headers.get("sha256") != digest
+        ):
+            self.log_to_file(msg=f"Ignoring damaged lifecycle cache {headers_file}.")
+            return {}
+        headers = {}
+        for key, header in (
+            ("ETag", "If-None-Match"),
+            ("Last-Modified", "If-Modified-Since"),
+        ):
+            if isinstance(cached_headers.get(key), str):
+                headers[header] = cached_headers[key]
+        return headers
+
+    def download_and_load_lifecycle_file(self):
+        content = self.download_lifecycle_file()
+        self.app_stream = yaml.load(content, Loader=SafeLoader)
+        self.lifecycle_hash = hashlib.sha256(content).hexdigest()
+        self.lifecycle_index = build_lifecycle_index(self.app_stream)
+
+    def load_result_cache(self):
+        """
+        Load results of the previous run, cached EOL dates are used
+        only if the lifecycle file did not change.
+        """
+        cache_file = self.args.result_cache
+        try:
+            cache = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            self.log_to_file(msg=f"Result cache {cache_file} is not available.")
+            return
+        if not isinstance(cache, dict) or cache.get("version") != RESULT_CACHE_VERSION:
+            self.log_to_file(msg=f"Result cache {cache_file} has unknown version.")
+            return
+        if not is_valid_result_cache(cache):
+            self.log_to_file(msg=f"Result cache {cache_file} is damaged.")
+            return
+        self.result_cache = cache
+        if cache.get("lifecycle_hash") == self.lifecycle_hash:
+            self.enddates = cache.get("enddates", {})
+
+    def cached_repo(self, repo_name: str, head: str) -> Optional[Dict]:
+        """
+        Return cached results of the repository if its HEAD did not change.
+        """
+        entry = self.result_cache.get("repos", {}).get(repo_name)
+        if entry and entry.get("head") == head:
+            return entry
+        return None
+
+    def save_result_cache(self):
+        """
+        Atomically store collected files and verdicts of checks of this run.
+        """
+        cache = {
+            "version": RESULT_CACHE_VERSION,
+            "lifecycle_hash": self.lifecycle_hash,
+            "enddates": self.enddates,
+            "repos": {
+                repo: {
+                    "head": self.repo_heads[repo],
+                    "versions": self.data_dict[repo],
+                    "verdicts": self.verdicts.get(repo, {}),
+                }
+                for repo in self.data_dict
+                if repo in self.repo_heads
+            },
+        }
+        cache_file = self.args.result_cache
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.tmp")
+        tmp_file.write_text(json.dumps(cache, indent=2))
+        os.replace(tmp_file, cache_file)
 
     def parse_args(self):
         parser = argparse.ArgumentParser(
@@ -107,6 +420,40 @@ class SclOrgSanityChecker(object):
         parser.add_argument(
             "--log-dir", help="The logs are stored in user defined directory"
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=CLONE_WORKERS,
+            help="Number of repositories cloned and checked in parallel.",
+        )
+        parser.add_argument(
+            "--clone-mode",
+            choices=CLONE_MODES,
+            default="mirror",
+            help="Update persistent bare mirrors (mirror), clone only files "
+            "needed by the checks (sparse) or whole repositories (full).",
+        )
+        parser.add_argument(
+            "--lifecycle-cache",
+            type=Path,
+            default=LIFECYCLE_CACHE,
+            help="Downloaded lifecycle file, it is downloaded again only "
+            f"if it changed, {LIFECYCLE_CACHE} by default.",
+        )
+        parser.add_argument(
+            "--result-cache",
+            type=Path,
+            default=RESULT_CACHE,
+            help="JSON file with results of the previous run, unchanged "
+            f"repositories are not scanned again, {RESULT_CACHE} by default.",
+        )
+        parser.add_argument(
+            "--mirror-dir",
+            type=Path,
+            default=MIRROR_DIR,
+            help=f"Directory with bare mirrors of repositories, {MIRROR_DIR} "
+            "by default.",
+        )
 
         return parser.parse_args()
 
@@ -120,24 +467,10 @@ class SclOrgSanityChecker(object):
             self.log_dir = self.args.log_dir
         self.create_tmp_dir()
         self.download_and_load_lifecycle_file()
+        self.load_result_cache()
         self.collect_data()
         return True
 
-    def check_files(self, ver: str) -> List[str]:
-        checked_files = []
-        for os_ver in OS_HOSTS:
-            exclude_file = self.tmp_path_repo / ver / f".exclude-{os_ver}"
-            dockerfile = self.tmp_path_repo / ver / f"Dockerfile.{os_ver}"
-            devel_file = self.tmp_path_repo / ver / f".devel-repo-{os_ver}"
-            if exclude_file.exists():
-                checked_files.append(f".exclude-{os_ver}")
-            if dockerfile.exists():
-                checked_files.append(f"Dockerfile.{os_ver}")
-            if devel_file.exists():
-                checked_files.append(f".devel-repo-{os_ver}")
-
-        return checked_files
-
     def check_file_exists(self, ver: str, file: str):
         return [x for x in self.data_dict[self.repo][ver] if x.startswith(file)]
 
@@ -193,36 +526,48 @@ class SclOrgSanityChecker(object):
         return ret_val
 
     def is_eol_version(self, ver: str, os_ver: str) -> int:
-        from datetime import datetime
-
         today = datetime.today().date()
-        pkg_dict = [
-            x for x in self.app_stream["lifecycles"] if x["name"] == self.pkg_name
-        ]
         self.log_to_file(msg=f"OS is {os_ver} and version is {ver}")
-        for pkg in pkg_dict:
-            if pkg["stream"] != ver:
-                continue
-            if "enddate" not in pkg:
-                continue
+        # EOL dates are cached while the lifecycle file does not change,
+        # only the distance from today is evaluated in every run
+        key = f"{self.pkg_name}/{ver}/{os_ver}"
+        if key not in self.enddates:
             # Get RHEL version without 'rhel' prefix
             rhel_version = os_ver.lstrip("rhel")
-            if not pkg["initial_product_version"].startswith(rhel_version):
-                continue
-            self.log_to_file(msg=pkg)
-            enddate = datetime.strptime(pkg["enddate"], "%Y%m%d").date()
-            self.log_to_file(msg=f"{today} and {enddate}")
-            days_to_eol = (enddate - today).days
-            self.log_to_file(msg=f"Count of days till EOL {days_to_eol}")
-            # Already reached EOL.
-            if days_to_eol < 0:
-                return 1
-            # Less then 30 days to EOL.
-            if days_to_eol < int(30):
-                return 2
-            else:
-                return 0
-        return 0
+            enddate = self.lifecycle_index.get((self.pkg_name, ver, rhel_version))
+            self.enddates[key] = enddate.strftime("%Y%m%d") if enddate else None
+        if self.enddates[key] is None:
+            return 0
+        enddate = datetime.strptime(self.enddates[key], "%Y%m%d").date()
+        self.log_to_file(msg=f"{today} and {enddate}")
+        days_to_eol = (enddate - today).days
+        self.log_to_file(msg=f"Count of days till EOL {days_to_eol}")
+        # Already reached EOL.
+        if days_to_eol < 0:
+            return 1
+        # Less then 30 days to EOL.
+        if days_to_eol < int(30):
+            return 2
+        else:
+            return 0
+
+    def check_repo_files(self, ver: str, os_ver: str) -> bool:
+        """
+        Check .exclude and .devel-repo files against Dockerfile.
+        The verdict depends only on files in the repository, so it is taken
+        from the result cache if HEAD of the repository did not change.
+        """
+        verdicts = self.verdicts.setdefault(self.repo, {}).setdefault(ver, {})
+        if os_ver in verdicts:
+            ret_val, message = verdicts[os_ver]
+            self.message += message
+            return ret_val
+        message_start = len(self.message)
+        ret_val = self.check_exclude_file_not_dockerfile(ver, os_ver)
+        if not self.check_devel_repo_file(ver, os_ver):
+            ret_val = False
+        verdicts[os_ver] = [ret_val, self.message[message_start:]]
+        return ret_val
 
     def check_tested_version(self, ver: str, os_ver: str):
         ret_val = True
@@ -263,23 +608,21 @@ class SclOrgSanityChecker(object):
             )
         return ret_val
 
-    def get_all_supported_versions(self, repo_name: str):
-        versions: List = []
-        if not (self.tmp_path_repo / "Makefile").exists():
-            self.log_to_file(msg=f"Makefile for repository {repo_name} does not exist.")
-            return versions
-        with open(self.tmp_path_repo / "Makefile") as f:
-            ver_row = [x for x in f.readlines() if x.startswith("VERSIONS")][0]
-            ver_row = ver_row.split("=")[1].strip()
-            return ver_row.split(" ")
-
     def clone_repository(self, repo_name: str):
         try:
-            self.log_to_file(msg=f"Cloning repository {repo_name}")
-            Repo.clone_from(
-                f"https://github.com/sclorg/{repo_name}",
+            self.log_to_file(
+                msg=f"Cloning repository {repo_name} ({self.args.clone_mode})"
+            )
+            url = SCLORG_REPO_URL.format(repo_name=repo_name)
+            if self.args.clone_mode == "full":
+                Repo.clone_from(url, to_path=self.tmp_path_dir / repo_name)
+                return True
+            repo = Repo.clone_from(
+                url,
                 to_path=self.tmp_path_dir / repo_name,
+                multi_options=SPARSE_CLONE_OPTIONS,
             )
+            repo.git.sparse_checkout("set", "--no-cone", *SPARSE_PATTERNS)
             return True
         except GitCommandError as ex:
             self.write_to_textfile(
@@ -288,20 +631,121 @@ class SclOrgSanityChecker(object):
             )
             return False
 
+    def update_mirror(self, repo_name: str) -> Optional[Path]:
+        """
+        Create bare mirror of the repository or fetch new commits into it.
+        :param repo_name: Name of sclorg repository
+        :return: Path to the mirror or None if cloning or fetching has failed
+        """
+        mirror_dir = self.args.mirror_dir / f"{repo_name}.git"
+        url = SCLORG_REPO_URL.format(repo_name=repo_name)
+        try:
+            if mirror_dir.exists() and not is_valid_mirror(mirror_dir):
+                self.log_to_file(msg=f"Removing broken mirror of {repo_name}")
+                rmtree(mirror_dir)
+            if mirror_dir.exists():
+                self.log_to_file(msg=f"Fetching repository {repo_name}")
+                git = Repo(mirror_dir).git
+                git.remote("set-url", "origin", url)
+                git.fetch("--prune", "origin")
+                return mirror_dir
+            self.log_to_file(msg=f"Cloning repository {repo_name} (mirror)")
+            repo = Repo.clone_from(
+                url, to_path=mirror_dir, bare=True, multi_options=MIRROR_CLONE_OPTIONS
+            )
+            repo.git.config("remote.origin.fetch", MIRROR_REFSPEC)
+            return mirror_dir
+        except (GitCommandError, OSError) as ex:
+            self.write_to_textfile(
+                f"Updating mirror of repo has failed {ex}",
+                report_file=Path(self.log_dir) / "default.log",
+            )
+            return None
+
+    def remote_head(self, repo_name: str) -> Optional[str]:
+        """
+        Return SHA of HEAD of upstream repository without cloning it.
+        """
+        url = SCLORG_REPO_URL.format(repo_name=repo_name)
+        try:
+            output = Git().ls_remote(url, "HEAD")
+        except GitCommandError as ex:
+            self.write_to_textfile(
+                f"Reading HEAD of repo has failed {ex}",
+                report_file=Path(self.log_dir) / "default.log",
+            )
+            return None
+        return output.split()[0] if output else None
+
+    def collect_repo_data(
+        self, repo_name: str
+    ) -> Optional[Tuple[str, Dict[str, List[str]]]]:
+        """
+        Clone the repository and collect checked files of its versions.
+        Repositories with the same HEAD as in the previous run are not scanned,
+        their files are taken from the result cache.
+        It does not change any state of the checker, so repositories
+        can be collected in parallel.
+        :param repo_name: Name of sclorg repository
+        :return: tuple with HEAD SHA and dictionary mapping version to list
+                 of found files or None if cloning or scanning has failed
+        """
+        # One broken repository must not stop collecting of the others
+        try:
+            if self.args.clone_mode == "mirror":
+                mirror_dir = self.update_mirror(repo_name=repo_name)
+                if not mirror_dir:
+                    return None
+                head = Repo(mirror_dir).head.commit.hexsha
+            else:
+                head = self.remote_head(repo_name=repo_name)
+                if not head:
+                    return None
+            cached = self.cached_repo(repo_name, head)
+            if cached:
+                self.log_to_file(
+                    msg=f"Repository {repo_name} did not change, using cached "
+                    f"results for {head}."
+                )
+                return head, cached["versions"]
+            if self.args.clone_mode == "mirror":
+                versions = scan_mirror(mirror_dir)
+            else:
+                if not self.clone_repository(repo_name=repo_name):
+                    return None
+                repo_dir = self.tmp_path_dir / repo_name
+                try:
+                    head = Repo(repo_dir).head.commit.hexsha
+                    versions = scan_repository(repo_dir)
+                finally:
+                    rmtree(repo_dir)
+            if versions is None:
+                self.log_to_file(
+                    msg=f"Makefile for repository {repo_name} does not exist."
+                )
+                return None
+            return head, versions
+        except (GitCommandError, OSError) as ex:
+            self.write_to_textfile(
+                f"Collecting data of repo {repo_name} has failed {ex}",
+                report_file=Path(self.log_dir) / "default.log",
+            )
+            return None
+
     def collect_data(self):
-        for repo, pkg_name in SCLORG_REPOS.items():
-            if not self.clone_repository(repo_name=repo):
+        repos = list(SCLORG_REPOS)
+        with ThreadPoolExecutor(max_workers=self.args.workers) as executor:
+            results = executor.map(self.collect_repo_data, repos)
+        # Results are merged in order of SCLORG_REPOS, not in order of finishing
+        for repo, result in zip(repos, results):
+            if not result or not result[1]:
                 continue
-            self.tmp_path_repo = self.tmp_path_dir / repo
-            os.chdir(self.tmp_path_repo)
-            versions_to_check = self.get_all_supported_versions(repo_name=repo)
-
-            for ver in versions_to_check:
-                if repo not in self.data_dict:
-                    self.data_dict[repo] = {}
-                self.data_dict[repo][ver] = self.check_files(ver)
-            os.chdir(self.cwd)
-            rmtree(self.tmp_path_dir / repo)
+            head, versions = result
+            self.data_dict[repo] = versions
+            self.repo_heads[repo] = head
+            cached = self.cached_repo(repo, head)
+            if cached:
+                self.verdicts[repo] = cached.get("verdicts", {})
 
     def run_check(self):
         for repo in self.data_dict:
@@ -318,9 +762,7 @@ class SclOrgSanityChecker(object):
                 checker = True
                 for os_ver in OS_HOSTS:
                     self.log_to_file(msg=f"Checked OS is: {os_ver}")
-                    if not self.check_exclude_file_not_dockerfile(ver, os_ver):
-                        checker = False
-                    if not self.check_devel_repo_file(ver, os_ver):
+                    if not self.check_repo_files(ver, os_ver):
                         checker = False
                     if not self.check_tested_version(ver, os_ver):
                         checker = False
@@ -340,8 +782,10 @@ class SclOrgSanityChecker(object):
                     self.failed_repos.append(repo)
                 self.global_result_flag = False
             self.log_to_file(msg=f"Repo to check {repo} finished.")
+        self.save_result_cache()
         print(f"Report text files are located here {self.log_dir}")
-        rmtree(self.tmp_path_dir)
+        # Nothing is cloned into the temporary directory in mirror mode
+        rmtree(self.tmp_path_dir, ignore_errors=True)
 
     def send_email(self):
         if not self.args.send_email:
@@ -4,6 +4,15 @@ import sys
 
 from datetime import date
 from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+from daily_tests.report_state import (  # noqa: E402
+    LOG_SUFFIXES,
+    STATE_FILES,
+    load_state,
+)
 
 DAILY_REPORTS_DIR = Path("/var/ci-scripts/daily_reports_dir/")
 DAILY_SCL_TESTS_DIR = Path("/var/ci-scripts/daily_scl_tests/")
@@ -71,7 +80,36 @@ class PVCWatcherReport:
     def return_failed_tests(self, directory, item) -> list:
         dir_path = directory / "results"
         print(f"Looking for failed tests in directory: {dir_path}")
-        return list(dir_path.rglob("*.log"))
+        return [f for f in dir_path.rglob("*.log*") if f.name.endswith(LOG_SUFFIXES)]
+
+    def load_report_states(self) -> List[Dict]:
+        """
+        Load report states stored by daily_nightly_tests_report.py for the day.
+        """
+        states = []
+        for name in STATE_FILES:
+            state = load_state(self.reports_dir / name)
+            if state:
+                states.append(state)
+        return states
+
+    def print_report_states(self, states: List[Dict]):
+        """
+        Print summary of test cases from report states.
+        """
+        for state in states:
+            print(f"Summary of report state for {state['date']}:")
+            by_status: Dict[str, List[str]] = {}
+            failed_container_tests = []
+            for name, case in sorted(state["test_cases"].items()):
+                by_status.setdefault(case["status"], []).append(name)
+                failed_container_tests.extend(x["path"] for x in case["failed_logs"])
+            for status, test_cases in sorted(by_status.items()):
+                print(f"Test cases with status {status}:")
+                print("\n".join(test_cases))
+            if failed_container_tests:
+                print("Failed container tests are:")
+                print("\n".join(failed_container_tests))
 
     def show_all_available_tests(self):
         print("All previous available tests are:")
@@ -85,9 +123,10 @@ class PVCWatcherReport:
             print(
                 f"The directory {self.reports_dir} does not exist. Tests were not finished yet."
             )
-        else:
-            print(f"Summary of results reports directory {self.reports_dir}:")
-            self.iter_results_in_directory()
+            return
+        print(f"Summary of results reports directory {self.reports_dir}:")
+        self.iter_results_in_directory()
+        self.print_report_states(self.load_report_states())
 
 
 if __name__ == "__main__":
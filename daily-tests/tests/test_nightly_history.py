@@ -0,0 +1,146 @@
+# pylint: disable=import-error,redefined-outer-name
+"""Tests for nightly_history."""
+
+import json
+
+import pytest
+
+from daily_tests import nightly_history, report_state
+
+
+def make_state(day, test_cases):
+    """Build report state like daily_nightly_tests_report.py stores it."""
+    state = {"version": report_state.STATE_VERSION, "date": day, "test_cases": {}}
+    for test_case, (status, failed, success) in test_cases.items():
+        state["test_cases"][test_case] = {
+            "status": status,
+            "plan": "nightly-rhel9",
+            "markers": ["tmt_failed"] if status == "tmt_failed" else [],
+            "success_logs": [
+                {"path": f"/r/{test_case}/{x}.log", "size": 10} for x in success
+            ],
+            "failed_logs": [
+                {"path": f"/r/{test_case}/results/{x}.log.gz", "size": 20}
+                for x in failed
+            ],
+        }
+    return state
+
+
+@pytest.fixture
+def history(tmp_path):
+    db = nightly_history.NightlyHistory(tmp_path / "history.sqlite3")
+    days = [
+        ("2024-01-01", [], ["s2i-ruby-container", "httpd-container"]),
+        ("2024-01-02", ["s2i-ruby-container"], ["httpd-container"]),
+        ("2024-01-03", ["s2i-ruby-container"], ["httpd-container"]),
+        ("2024-01-04", ["s2i-ruby-container", "httpd-container"], []),
+    ]
+    for day, failed, success in days:
+        status = "failed" if failed else "success"
+        db.ingest_state(
+            make_state(
+                day,
+                {
+                    "rhel9-test-pytest": (status, failed, success + failed),
+                    "rhel8-test": ("success", [], ["s2i-ruby-container"]),
+                },
+            )
+        )
+    yield db
+    db.close()
+
+
+def test_state_rows_one_row_per_container():
+    state = make_state(
+        "2024-01-02",
+        {
+            "rhel9-test-pytest": (
+                "failed",
+                ["s2i-ruby-container"],
+                ["s2i-ruby-container", "httpd-container"],
+            ),
+            "c9s-test": ("tmt_failed", [], []),
+        },
+    )
+
+    rows = nightly_history.state_rows(state)
+
+    common = ("2024-01-02", "rhel9-test-pytest", "rhel9", "test-pytest")
+    assert rows == [
+        common + ("nightly-rhel9", "", "failed", None, ""),
+        common + ("nightly-rhel9", "httpd-container", "success", 10, ""),
+        common + ("nightly-rhel9", "s2i-ruby-container", "failed", 20, ""),
+        ("2024-01-02", "c9s-test", "c9s", "test", "nightly-rhel9")
+        + ("", "tmt_failed", None, "tmt_failed"),
+    ]
+
+
+def test_ingest_replaces_results_of_the_same_day(history):
+    history.ingest_state(
+        make_state("2024-01-04", {"rhel9-test-pytest": ("success", [], [])})
+    )
+
+    rows = history.connection.execute(
+        "SELECT container, status FROM results "
+        "WHERE date = '2024-01-04' AND test_case = 'rhel9-test-pytest'"
+    ).fetchall()
+
+    assert rows == [("", "success")]
+
+
+def test_failure_rates(history):
+    rates = history.failure_rates(os_name="rhel9", test_type="test-pytest")
+
+    assert rates == [
+        (
+            "s2i-ruby-container",
+            "rhel9",
+            "test-pytest",
+            4,
+            3,
+            "2024-01-01",
+            "2024-01-04",
+        ),
+        ("httpd-container", "rhel9", "test-pytest", 4, 1, "2024-01-01", "2024-01-04"),
+    ]
+    assert history.failure_rates(container="s2i-ruby-container", since="2024-01-03")[0][
+        3:5
+    ] == (2, 2)
+
+
+def test_streaks(history):
+    assert history.streaks() == [
+        ("s2i-ruby-container", "rhel9-test-pytest", 3, "2024-01-02"),
+        ("httpd-container", "rhel9-test-pytest", 1, "2024-01-04"),
+    ]
+
+
+def test_first_failures(history):
+    assert history.first_failures(os_name="rhel9") == [
+        ("s2i-ruby-container", "rhel9-test-pytest", "2024-01-02", "2024-01-04"),
+        ("httpd-container", "rhel9-test-pytest", "2024-01-04", "2024-01-04"),
+    ]
+
+
+def test_main_ingests_reports_dir_and_queries(tmp_path, capsys):
+    reports_dir = tmp_path / "reports"
+    for day, failed in (("2024-01-01", []), ("2024-01-02", ["s2i-ruby-container"])):
+        (reports_dir / day).mkdir(parents=True)
+        state = make_state(
+            day, {"rhel9-test": ("failed" if failed else "success", failed, [])}
+        )
+        (reports_dir / day / "report-state.json").write_text(json.dumps(state))
+    (reports_dir / "2024-01-03").mkdir()
+    (reports_dir / "2024-01-03" / "report-state.json").write_text('{"version": 0}')
+    database = str(tmp_path / "history.sqlite3")
+
+    nightly_history.main(
+        ["--database", database, "ingest", "--reports-dir", str(reports_dir)]
+    )
+    nightly_history.main(["--database", database, "streaks", "--os", "rhel9"])
+    output = capsys.readouterr().out
+
+    assert "Stored 3 results of 3 days" in output
+    assert "unknown version" in output
+    assert "s2i-ruby-container rhel9-test: failing 1 runs since 2024-01-02" in output
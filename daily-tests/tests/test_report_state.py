@@ -0,0 +1,38 @@
+# pylint: disable=import-error
+"""Tests for report_state."""
+
+import json
+
+import pytest
+
+from daily_tests import report_state
+
+
+def test_load_state(tmp_path):
+    state_file = tmp_path / "report-state.json"
+    state = {"version": report_state.STATE_VERSION, "test_cases": {}}
+    state_file.write_text(json.dumps(state))
+
+    assert report_state.load_state(state_file) == state
+
+
+def test_load_missing_state(tmp_path, capsys):
+    assert report_state.load_state(tmp_path / "report-state.json") is None
+    assert "does not exist" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "content,message",
+    [
+        ("{", "corrupted"),
+        ("[]", "unknown version"),
+        ('{"version": 0}', "unknown version"),
+    ],
+)
+def test_unusable_state_is_ignored(tmp_path, capsys, content, message):
+    state_file = tmp_path / "report-state.json"
+    state_file.write_text(content)
+
+    assert report_state.load_state(state_file) is None
+    assert message in capsys.readouterr().out
+
@@ -1,11 +1,20 @@
 # pylint: disable=import-error,redefined-outer-name,protected-access
 """Tests for daily_nightly_tests_report."""
 
+import email
+import gzip
+import json
+import socket
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
+from aiosmtpd.controller import Controller
 from flexmock import flexmock
+from pbincli.format import Paste
 
 from daily_tests import daily_nightly_tests_report as nightly_mod
 from daily_tests.daily_nightly_tests_report import NightlyTestsReport
@@ -15,9 +24,18 @@ sys.path.insert(0, str(TEST_DIR.parent))
 
 
 @pytest.fixture
-def nightly_report(monkeypatch):
-    """Build NightlyTestsReport with argv that avoids argparse errors."""
-    monkeypatch.setattr(sys, "argv", ["daily_nightly_tests_report.py"])
+def nightly_report(monkeypatch, tmp_path):
+    """Build NightlyTestsReport which keeps all its files under tmp_path."""
+    monkeypatch.setattr(nightly_mod, "RESULTS_DIR", tmp_path / "daily_reports_dir")
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "daily_nightly_tests_report.py",
+            "--pastebin-cache",
+            str(tmp_path / "pastebin_cache.json"),
+        ],
+    )
     return NightlyTestsReport()
 
 
@@ -40,10 +58,61 @@ def collect_report(nightly_report, monkeypatch, tmp_path):
         "available_test_case",
         {("fedora-test", "nightly-fedora", "Fedora test results:")},
     )
-    flexmock(nightly_report).should_receive("send_file_to_pastebin")
     return nightly_report
 
 
+class StubPrivateBinHandler(BaseHTTPRequestHandler):
+    """Accept pastes the same way as PrivateBin JSON API does."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.pastes.append(json.loads(body))
+            paste_id = f"paste{len(self.server.pastes)}"
+        if self.server.fail_first and len(self.server.pastes) == 1:
+            result = {"status": 1, "message": "Please wait 10 seconds"}
+        else:
+            result = {"status": 0, "id": paste_id, "deletetoken": "token"}
+        payload = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_privatebin(nightly_report):
+    """Local PrivateBin endpoint used by nightly_report uploader."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPrivateBinHandler)
+    server.lock = threading.Lock()
+    server.pastes = []
+    server.fail_first = False
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    nightly_report.pastebin = nightly_mod.PasteBinUploader(
+        server=f"http://127.0.0.1:{server.server_port}",
+        workers=4,
+        metrics=nightly_report.metrics,
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def decrypt_paste(paste: dict, url: str) -> str:
+    """Decrypt paste received by stub server using passphrase from URL."""
+    paste_obj = Paste()
+    paste_obj.loadJSON(paste)
+    paste_obj.setHash(url.split("#", 1)[1])
+    paste_obj.decrypt()
+    return paste_obj.getText().decode()
+
+
 class TestDailyNightlyTestsReport:
     """Tests for NightlyTestsReport."""
 
@@ -131,47 +200,6 @@ class TestLoadMailsFromEnvironment:
         assert nightly_report.smtp_port == 25
 
 
-class TestGetPastebinUrl:
-    """Tests for NightlyTestsReport.get_pastebin_url."""
-
-    def test_get_pastebin_url_returns_url_from_link_line(
-        self, nightly_report, tmp_path
-    ):
-        link_file = tmp_path / "paste.txt"
-        link_file.write_text(
-            "some noise\nLink:   https://paste.example.com/abc   \ntail\n",
-            encoding="utf-8",
-        )
-        assert (
-            nightly_report.get_pastebin_url(str(link_file))
-            == "https://paste.example.com/abc"
-        )
-
-    def test_get_pastebin_url_returns_first_link_line(self, nightly_report, tmp_path):
-        link_file = tmp_path / "paste.txt"
-        link_file.write_text(
-            "Link: https://first.example\nLink: https://second.example\n",
-            encoding="utf-8",
-        )
-        assert nightly_report.get_pastebin_url(str(link_file)) == (
-            "https://first.example"
-        )
-
-    def test_get_pastebin_url_returns_empty_when_no_link_line(
-        self, nightly_report, tmp_path
-    ):
-        link_file = tmp_path / "paste.txt"
-        link_file.write_text("no url here\nhttps://ignored\n", encoding="utf-8")
-        assert nightly_report.get_pastebin_url(str(link_file)) == ""
-
-    def test_get_pastebin_url_returns_empty_for_empty_file(
-        self, nightly_report, tmp_path
-    ):
-        link_file = tmp_path / "paste.txt"
-        link_file.write_text("", encoding="utf-8")
-        assert nightly_report.get_pastebin_url(str(link_file)) == ""
-
-
 class TestCollectData:
     """Tests for NightlyTestsReport.collect_data."""
 
@@ -242,3 +270,964 @@ class TestCollectData:
         assert collect_report.full_success is False
         assert collect_report.data_dict["tmt"]["tmt_failed"] == ["fedora-test"]
         assert "fedora-test" not in collect_report.data_dict["SUCCESS"]
+
+
+class TestScanReportsDir:
+    """Tests for single pass index of the daily reports directory."""
+
+    def test_scan_reports_dir_sorts_files_of_test_cases(self, tmp_path):
+        case_dir = tmp_path / "fedora-test"
+        failed = case_dir / "plans" / "results" / "nested" / "httpd-container.log"
+        results = case_dir / "results" / "ns"
+        results.mkdir(parents=True)
+        failed.parent.mkdir(parents=True)
+        failed.write_text("")
+        (results / "nginx-container.log.gz").write_bytes(b"")
+        (results / "tmt_failed").write_text("")
+        (case_dir / "tmt_success").write_text("")
+        (case_dir / "tmt-verbose-log.gz").write_bytes(b"")
+        (case_dir / "unknown").write_text("")
+        (tmp_path / "c9s-test").mkdir()
+        (tmp_path / "not-a-test-case.txt").write_text("")
+
+        index = nightly_mod.scan_reports_dir(tmp_path)
+
+        assert list(index) == ["c9s-test", "fedora-test"]
+        case = index["fedora-test"]
+        assert case.path == case_dir
+        assert case.markers == {"tmt_success"}
+        assert case.tmt_log == case_dir / "tmt-verbose-log.gz"
+        assert case.success_logs == [failed]
+        assert case.failed_logs == [results / "nginx-container.log.gz"]
+        empty = index["c9s-test"]
+        assert (empty.markers, empty.tmt_log, empty.logs) == (set(), None, [])
+
+    def test_scan_reports_dir_missing(self, tmp_path):
+        assert nightly_mod.scan_reports_dir(tmp_path / "missing") == {}
+
+    def test_collect_data_links_indexed_tmt_log(self, collect_report):
+        case_dir = collect_report.reports_dir / "fedora-test"
+        case_dir.mkdir()
+        (case_dir / "tmt_running").write_text("")
+        (case_dir / "tmt-verbose-log.zst").write_bytes(b"")
+
+        collect_report.collect_data()
+
+        assert collect_report.data_dict["tmt"]["logs"] == [
+            ("fedora-test", case_dir / "tmt-verbose-log.zst")
+        ]
+
+    def test_collect_data_links_tmt_logs_of_all_plans(self, collect_report):
+        case_dir = collect_report.reports_dir / "fedora-test"
+        case_dir.mkdir()
+        (case_dir / "tmt_failed").write_text("")
+        (case_dir / "tmt-log-nightly-c9s").write_bytes(b"")
+        for plan in ("nightly-c9s", "nightly-c10s"):
+            (case_dir / f"tmt-verbose-log-{plan}.gz").write_bytes(b"")
+        collect_report.pastebin_urls = {
+            case_dir / "tmt-verbose-log-nightly-c9s.gz": "https://paste/?c9s",
+            case_dir / "tmt-verbose-log-nightly-c10s.gz": "https://paste/?c10s",
+        }
+
+        collect_report.collect_data()
+        collect_report.generate_tmt_logs_containers()
+
+        assert collect_report.data_dict["tmt"]["logs"] == [
+            ("fedora-test", case_dir / "tmt-verbose-log-nightly-c10s.gz"),
+            ("fedora-test", case_dir / "tmt-verbose-log-nightly-c9s.gz"),
+        ]
+        assert "<a href='https://paste/?c9s'>See logs (nightly-c9s)</a>" in (
+            collect_report.body
+        )
+
+    def test_collect_data_upstream_success_logs(self, collect_report):
+        collect_report.args.upstream_tests = True
+        case_dir = collect_report.reports_dir / "fedora-test"
+        case_dir.mkdir()
+        (case_dir / "b.log").write_text("")
+        (case_dir / "a.log").write_text("")
+
+        collect_report.collect_data()
+
+        assert collect_report.data_dict["SUCCESS_DATA"] == [
+            ("fedora-test", str(case_dir / "a.log"), "a.log"),
+            ("fedora-test", str(case_dir / "b.log"), "b.log"),
+        ]
+
+
+class TestCompressedLogs:
+    """Tests for reading logs stored by 'download_logs.py --compress'."""
+
+    @pytest.mark.parametrize(
+        "log_name,expected",
+        [
+            ("httpd-container.log", "httpd-container"),
+            ("httpd-container.log.gz", "httpd-container"),
+            ("httpd-container.log.zst", "httpd-container"),
+            ("tmt-verbose-log", "tmt-verbose-log"),
+        ],
+    )
+    def test_container_name(self, log_name, expected):
+        assert nightly_mod.container_name(log_name) == expected
+
+    def test_scan_test_case_plain_and_compressed(self, tmp_path):
+        (tmp_path / "a.log").write_text("a")
+        (tmp_path / "b.log.gz").write_bytes(gzip.compress(b"b"))
+        (tmp_path / "c.log.zst").write_bytes(b"")
+        (tmp_path / "d.log.part").write_text("partial")
+        (tmp_path / "e.txt").write_text("e")
+
+        case = nightly_mod.scan_test_case("fedora-test", tmp_path)
+        names = [f.name for f in case.logs]
+
+        assert names == ["a.log", "b.log.gz", "c.log.zst"]
+
+    def test_scan_test_case_ignores_partial_tmt_logs(self, tmp_path):
+        (tmp_path / "tmt-verbose-log").write_text("done")
+        for name in ("tmt-verbose-log-nightly-c9s", "tmt-verbose-log"):
+            (tmp_path / f"{name}.part").write_text("partial")
+            (tmp_path / f"{name}.part.validator").write_text('"v1"')
+
+        case = nightly_mod.scan_test_case("fedora-test", tmp_path)
+
+        assert case.tmt_logs == [tmp_path / "tmt-verbose-log"]
+        assert case.logs == []
+
+    def test_open_log_gzip(self, tmp_path):
+        log = tmp_path / "a.log.gz"
+        log.write_bytes(gzip.compress(b"compressed content"))
+        with nightly_mod.open_log(log) as f:
+            assert f.read() == b"compressed content"
+
+    def test_stored_log_path_prefers_existing_file(self, tmp_path):
+        (tmp_path / "tmt-verbose-log.gz").write_bytes(gzip.compress(b"x"))
+        assert nightly_mod.stored_log_path(tmp_path / "tmt-verbose-log") == (
+            tmp_path / "tmt-verbose-log.gz"
+        )
+        assert nightly_mod.stored_log_path(tmp_path / "missing") == (
+            tmp_path / "missing"
+        )
+
+    def test_collect_data_records_compressed_failed_logs(self, collect_report):
+        log_file = collect_report.reports_dir / "fedora-test" / "results" / "a.log.gz"
+        log_file.parent.mkdir(parents=True)
+        log_file.write_bytes(gzip.compress(b"err"))
+
+        collect_report.collect_data()
+
+        assert collect_report.data_dict["fedora-test"] == [(str(log_file), "a.log.gz")]
+
+    def test_upload_decompresses_log(self, nightly_report, stub_privatebin, tmp_path):
+        log_file = tmp_path / "a.log.gz"
+        log_file.write_bytes(gzip.compress(b"plain text"))
+
+        url = nightly_report.pastebin.upload(log_file)
+
+        assert decrypt_paste(stub_privatebin.pastes[0], url) == "plain text"
+
+    def test_generate_emails_matches_compressed_logs(
+        self, nightly_report, reset_sclorg_mails
+    ):
+        nightly_mod.SCLORG_MAILS["s2i-ruby-container"] = ["ruby@example.com"]
+        nightly_report.available_test_case = {
+            ("fedora-test", "nightly-fedora", "Fedora test results:")
+        }
+        nightly_report.data_dict = {
+            "fedora-test": [
+                ("/x/s2i-ruby-container.log.gz", "s2i-ruby-container.log.gz")
+            ]
+        }
+
+        nightly_report.generate_emails()
+
+        assert nightly_report.default_mails == ["ruby@example.com"]
+
+
+class TestPasteBinUploader:
+    """Tests for uploading logs to a stub PrivateBin."""
+
+    def test_encrypted_paste_decrypts_by_pbincli(self, nightly_report):
+        body, passphrase = nightly_report.pastebin.encrypt("container failed\n")
+
+        paste = Paste()
+        paste.loadJSON(json.loads(body))
+        paste.setHash(passphrase)
+        paste.decrypt()
+
+        assert paste.getText().decode() == "container failed\n"
+
+    def test_upload_returns_url_of_paste(
+        self, nightly_report, stub_privatebin, tmp_path
+    ):
+        log_file = tmp_path / "httpd-container.log"
+        log_file.write_text("container failed\n")
+
+        url = nightly_report.pastebin.upload(log_file)
+
+        server = f"http://127.0.0.1:{stub_privatebin.server_port}/"
+        assert url.startswith(f"{server}?paste1#")
+        paste = stub_privatebin.pastes[0]
+        assert paste["meta"] == {"expire": "1month"}
+        assert paste["adata"][1] == "plaintext"
+        assert decrypt_paste(paste, url) == "container failed\n"
+
+    def test_upload_retries_refused_paste(
+        self, nightly_report, stub_privatebin, tmp_path
+    ):
+        stub_privatebin.fail_first = True
+        log_file = tmp_path / "httpd-container.log"
+        log_file.write_text("log")
+
+        url = nightly_report.pastebin.upload(log_file)
+
+        assert "?paste2#" in url
+        assert len(stub_privatebin.pastes) == 2
+
+    def test_upload_returns_empty_when_server_unreachable(self, tmp_path):
+        log_file = tmp_path / "httpd-container.log"
+        log_file.write_text("log")
+        uploader = nightly_mod.PasteBinUploader(server="http://127.0.0.1:1")
+
+        assert uploader.upload(log_file) == ""
+
+    def test_upload_logs_skips_missing_log(
+        self, nightly_report, stub_privatebin, tmp_path
+    ):
+        nightly_report.upload_logs([tmp_path / "missing.log"])
+
+        assert nightly_report.pastebin_urls == {}
+        assert stub_privatebin.pastes == []
+
+    def test_generate_email_body_links_uploaded_logs(
+        self, nightly_report, stub_privatebin, tmp_path
+    ):
+        nightly_report.reports_dir = tmp_path
+        nightly_report.available_test_case = {
+            ("fedora-test", "nightly-fedora", "Fedora test results:"),
+            ("c9s-test", "nightly-c9s", "CentOS Stream 9 test results:"),
+        }
+        results = tmp_path / "fedora-test" / "results"
+        results.mkdir(parents=True)
+        for name in ("httpd-container.log", "nginx-container.log", "php.log"):
+            (results / name).write_text(name)
+        c9s_dir = tmp_path / "c9s-test"
+        c9s_dir.mkdir()
+        (c9s_dir / "tmt_failed").write_text("")
+        (c9s_dir / "tmt-verbose-log").write_text("tmt failed")
+        nightly_report.collect_data()
+
+        nightly_report.generate_email_body()
+
+        assert len(stub_privatebin.pastes) == 4
+        urls = nightly_report.pastebin_urls
+        assert set(urls) == {
+            results / "httpd-container.log",
+            results / "nginx-container.log",
+            results / "php.log",
+            c9s_dir / "tmt-verbose-log",
+        }
+        for log_path, url in urls.items():
+            assert f"<a href='{url}'>" in nightly_report.body
+        assert (
+            decrypt_paste(
+                stub_privatebin.pastes[
+                    int(
+                        urls[c9s_dir / "tmt-verbose-log"]
+                        .split("?paste")[1]
+                        .split("#")[0]
+                    )
+                    - 1
+                ],
+                urls[c9s_dir / "tmt-verbose-log"],
+            )
+            == "tmt failed"
+        )
+
+
+class TestPasteBinCache:
+    """Tests for reusing pastes of unchanged logs across report runs."""
+
+    def test_unchanged_log_is_not_uploaded_again(self, stub_privatebin, tmp_path):
+        server = f"http://127.0.0.1:{stub_privatebin.server_port}"
+        cache_file = tmp_path / "cache" / "pastebin_cache.json"
+        first = tmp_path / "first.log"
+        first.write_text("same content")
+        second = tmp_path / "second.log.gz"
+        second.write_bytes(gzip.compress(b"same content"))
+
+        uploader = nightly_mod.PasteBinUploader(
+            server=server, cache=nightly_mod.PasteBinCache(cache_file)
+        )
+        url = uploader.upload_many([first])[first]
+        saved = cache_file.stat().st_mtime_ns
+        # New report run loads the cache from disk
+        uploader = nightly_mod.PasteBinUploader(
+            server=server, cache=nightly_mod.PasteBinCache(cache_file)
+        )
+
+        assert uploader.upload_many([first, second]) == {first: url, second: url}
+        assert len(stub_privatebin.pastes) == 1
+        assert cache_file.stat().st_mtime_ns == saved
+
+    def test_cache_is_not_written_without_new_paste(self, tmp_path):
+        cache_file = tmp_path / "pastebin_cache.json"
+        uploader = nightly_mod.PasteBinUploader(
+            server="http://127.0.0.1:1", cache=nightly_mod.PasteBinCache(cache_file)
+        )
+
+        assert uploader.upload_many([]) == {}
+        assert not cache_file.exists()
+
+    def test_changed_log_is_uploaded(self, stub_privatebin, tmp_path):
+        cache = nightly_mod.PasteBinCache(tmp_path / "pastebin_cache.json")
+        uploader = nightly_mod.PasteBinUploader(
+            server=f"http://127.0.0.1:{stub_privatebin.server_port}", cache=cache
+        )
+        log_file = tmp_path / "a.log"
+        log_file.write_text("first run")
+        first_url = uploader.upload(log_file)
+        log_file.write_text("second run")
+
+        assert uploader.upload(log_file) != first_url
+        assert len(stub_privatebin.pastes) == 2
+        assert len(cache.entries) == 2
+
+    def test_paste_expiring_soon_is_not_reused(self, tmp_path):
+        cache = nightly_mod.PasteBinCache(tmp_path / "pastebin_cache.json")
+        cache.update("fresh", "https://paste/?fresh", 30 * 24 * 60 * 60)
+        cache.update("old", "https://paste/?old", 60 * 60)
+        cache.update("never", "https://paste/?never", None)
+
+        assert cache.get("fresh") == "https://paste/?fresh"
+        assert cache.get("old") == ""
+        assert cache.get("never") == "https://paste/?never"
+        assert cache.get("missing") == ""
+
+    def test_save_drops_expired_pastes(self, tmp_path):
+        cache_file = tmp_path / "pastebin_cache.json"
+        cache_file.write_text(
+            json.dumps(
+                {
+                    "expired": {"url": "https://paste/?expired", "expires": 1},
+                    "valid": {"url": "https://paste/?valid", "expires": None},
+                }
+            )
+        )
+        cache = nightly_mod.PasteBinCache(cache_file)
+
+        cache.save()
+
+        assert list(json.loads(cache_file.read_text())) == ["valid"]
+
+    def test_corrupted_cache_is_ignored(self, tmp_path):
+        cache_file = tmp_path / "pastebin_cache.json"
+        cache_file.write_text("{not json")
+
+        assert nightly_mod.PasteBinCache(cache_file).entries == {}
+
+
+class TestReportState:
+    """Tests for storing collected data as report state of the day."""
+
+    @pytest.fixture
+    def state_report(self, nightly_report, tmp_path):
+        nightly_report.reports_dir = tmp_path
+        nightly_report.available_test_case = {
+            ("fedora-test", "nightly-fedora", "Fedora test results:"),
+            ("c9s-test", "nightly-c9s", "CentOS Stream 9 test results:"),
+        }
+        results = tmp_path / "fedora-test" / "results"
+        results.mkdir(parents=True)
+        (results / "httpd-container.log").write_text("httpd failed")
+        c9s_dir = tmp_path / "c9s-test"
+        c9s_dir.mkdir()
+        (c9s_dir / "tmt_failed").write_text("")
+        (c9s_dir / "tmt-verbose-log").write_text("tmt failed")
+        flexmock(nightly_report.pastebin).should_receive("upload_many").replace_with(
+            lambda paths, contents=None: {p: f"https://paste/?{p.name}" for p in paths}
+        )
+        return nightly_report
+
+    def test_save_state_stores_status_sizes_and_urls(self, state_report, tmp_path):
+        state_report.collect_data()
+        state_report.generate_email_body()
+
+        state_report.save_state()
+
+        state = json.loads((tmp_path / "report-state.json").read_text())
+        assert state["version"] == nightly_mod.STATE_VERSION
+        assert state["full_success"] is False
+        fedora = state["test_cases"]["fedora-test"]
+        assert fedora["status"] == "failed"
+        assert fedora["failed_logs"] == [
+            {
+                "path": str(tmp_path / "fedora-test/results/httpd-container.log"),
+                "size": len("httpd failed"),
+                "url": "https://paste/?httpd-container.log",
+                "excerpt": "",
+            }
+        ]
+        c9s = state["test_cases"]["c9s-test"]
+        assert c9s["status"] == "tmt_failed"
+        assert c9s["tmt_log"]["url"] == "https://paste/?tmt-verbose-log"
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_save_state_stores_plan_of_pytest_test_case(self, state_report, tmp_path):
+        state_report.available_test_case = nightly_mod.TEST_CASES
+        pytest_dir = tmp_path / "rhel9-test-pytest"
+        pytest_dir.mkdir()
+        (pytest_dir / "tmt_success").write_text("")
+        state_report.collect_data()
+
+        state_report.save_state()
+
+        state = json.loads((tmp_path / "report-state.json").read_text())
+        assert state["test_cases"]["rhel9-test-pytest"]["plan"] == "nightly-rhel9"
+        assert state["test_cases"]["c9s-test"]["plan"] == "nightly-c9s"
+
+    def test_from_state_renders_same_body_without_scanning(
+        self, state_report, monkeypatch
+    ):
+        state_report.collect_data()
+        state_report.generate_email_body()
+        state_report.save_state()
+        body = state_report.body
+        state_report.body = ""
+        state_report.data_dict = {}
+        state_report.pastebin_urls = {}
+        monkeypatch.setattr(nightly_mod, "scan_reports_dir", None)
+        flexmock(state_report.pastebin).should_receive("upload_many").never()
+
+        state_report.collect_data_from_state()
+        state_report.generate_email_body()
+
+        assert state_report.body == body
+
+    def test_from_state_does_not_upload_logs_without_url(
+        self, state_report, tmp_path, monkeypatch
+    ):
+        state_report.collect_data()
+        state_report.generate_email_body()
+        state_report.save_state()
+        state = json.loads((tmp_path / "report-state.json").read_text())
+        for log in state["test_cases"]["fedora-test"]["failed_logs"]:
+            log["url"] = ""
+        (tmp_path / "report-state.json").write_text(json.dumps(state))
+        state_report.pastebin_urls = {}
+        state_report.excerpts = {}
+        flexmock(state_report.pastebin).should_receive("upload_many").never()
+        flexmock(nightly_mod).should_receive("extract_failure_excerpt").never()
+
+        state_report.collect_data_from_state()
+        state_report.generate_email_body()
+
+        tmt_log = tmp_path / "c9s-test" / "tmt-verbose-log"
+        assert state_report.pastebin_urls == {tmt_log: "https://paste/?tmt-verbose-log"}
+
+    def test_restore_keeps_empty_excerpts_of_read_logs(self, state_report, tmp_path):
+        state_report.collect_data()
+        state_report.generate_email_body()
+        state_report.save_state()
+        state_report.excerpts = {}
+        flexmock(nightly_mod).should_receive("extract_failure_excerpt").never()
+
+        state_report.restore_pastebin_urls(state_report.load_state(), check_size=True)
+        state_report.extract_excerpts()
+
+        failed_log = tmp_path / "fedora-test/results/httpd-container.log"
+        assert state_report.excerpts == {failed_log: ""}
+
+    def test_from_state_scans_when_state_has_other_version(
+        self, state_report, tmp_path
+    ):
+        (tmp_path / "report-state.json").write_text(json.dumps({"version": 0}))
+
+        state_report.collect_data_from_state()
+
+        assert state_report.data_dict["tmt"]["tmt_failed"] == ["c9s-test"]
+
+    def test_refresh_reuses_urls_of_unchanged_logs(self, state_report, tmp_path):
+        state_report.collect_data()
+        state_report.generate_email_body()
+        state_report.save_state()
+        state_report.pastebin_urls = {}
+        (tmp_path / "c9s-test" / "tmt-verbose-log").write_text("tmt failed again")
+
+        state_report.collect_data()
+        state_report.restore_pastebin_urls(state_report.load_state(), check_size=True)
+
+        assert state_report.pastebin_urls == {
+            tmp_path
+            / "fedora-test/results/httpd-container.log": (
+                "https://paste/?httpd-container.log"
+            )
+        }
+
+
+class TestFailureExcerpt:
+    """Tests for extracting failures from failed container logs."""
+
+    def test_extract_keeps_context_around_failures(self, tmp_path):
+        lines = [f"line {i}" for i in range(100)]
+        lines[20] = "Traceback (most recent call last):"
+        lines[22] = "E       AssertionError: assert 1 == 2"
+        lines[70] = "[FAILED] test_s2i_usage"
+        log_file = tmp_path / "a.log.gz"
+        log_file.write_bytes(gzip.compress("\n".join(lines).encode()))
+
+        excerpt = nightly_mod.extract_failure_excerpt(
+            log_file, lines_before=2, lines_after=3
+        )
+
+        assert excerpt == "\n".join(
+            ["line 18", "line 19", lines[20], "line 21", lines[22]]
+            + ["line 23", "line 24", "line 25", "..."]
+            + ["line 68", "line 69", lines[70], "line 71", "line 72", "line 73"]
+        )
+
+    def test_extract_limits_number_of_blocks(self, tmp_path):
+        log_file = tmp_path / "a.log"
+        log_file.write_text("".join(f"ok\nok\n[FAILED] test {i}\n" for i in range(10)))
+
+        excerpt = nightly_mod.extract_failure_excerpt(
+            log_file, lines_before=0, lines_after=0, max_blocks=3
+        )
+
+        assert excerpt == "[FAILED] test 0\n...\n[FAILED] test 1\n...\n[FAILED] test 2"
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "FAILED test/test_container_basics.py::test_run - AssertionError",
+            "E   assert False",
+            "========== FAILURES ==========",
+            "Command timed out after 300 seconds",
+            "Timeout waiting for the container",
+        ],
+    )
+    def test_signatures(self, line):
+        assert nightly_mod.FAILURE_SIGNATURES.search(line.encode())
+
+    def test_extract_truncates_long_lines(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(nightly_mod, "EXCERPT_MAX_LINE_LENGTH", 10)
+        log_file = tmp_path / "a.log"
+        log_file.write_text(
+            "x" * 25 + "E   assert\n" + "[FAILED] " + "y" * 30 + "\nline 2\nline 3\n"
+        )
+
+        excerpt = nightly_mod.extract_failure_excerpt(
+            log_file, lines_before=1, lines_after=1
+        )
+
+        assert excerpt == "xxxxxxxxxx\n[FAILED] y\nline 2"
+
+    def test_extract_without_failures(self, tmp_path):
+        log_file = tmp_path / "a.log"
+        log_file.write_text("all good\nPASSED\n")
+
+        assert nightly_mod.extract_failure_excerpt(log_file) == ""
+
+    def test_failed_containers_embed_escaped_excerpt(self, collect_report):
+        log_file = collect_report.reports_dir / "fedora-test" / "results" / "a.log"
+        log_file.parent.mkdir(parents=True)
+        log_file.write_text("E   assert '<b>' == 'b'\n")
+        collect_report.collect_data()
+        collect_report.pastebin_urls[log_file] = "https://paste/?a"
+
+        collect_report.extract_excerpts()
+        collect_report.generate_failed_containers()
+
+        assert (
+            "<a href='https://paste/?a'>a.log</a><br>"
+            "<pre>E   assert &#x27;&lt;b&gt;&#x27; == &#x27;b&#x27;</pre>"
+        ) in collect_report.body
+
+    def test_upload_only_excerpt(self, nightly_report, stub_privatebin, tmp_path):
+        nightly_report.args.upload_excerpts = True
+        log_file = tmp_path / "a.log"
+        log_file.write_text("noise\n" * 100 + "[FAILED] test\n")
+        nightly_report.excerpts[log_file] = "[FAILED] test"
+
+        nightly_report.upload_logs([log_file])
+
+        url = nightly_report.pastebin_urls[log_file]
+        assert decrypt_paste(stub_privatebin.pastes[0], url) == "[FAILED] test"
+
+
+class TestMailRoutes:
+    """Tests for routing failed containers to their owners."""
+
+    def test_resolve_merges_generic_and_specific_routes(self):
+        routes = nightly_mod.MailRoutes()
+        routes.add("s2i-ruby-container", ["ruby@example.com", ""])
+        routes.add("s2i-ruby-container", ["rhel9@example.com"], os_name="rhel9")
+        routes.add(
+            "s2i-ruby-container", ["pytest@example.com"], test_type="test-pytest"
+        )
+        routes.add("s2i-ruby-container", ["exact@example.com"], "rhel9", "test-pytest")
+
+        assert routes.resolve("s2i-ruby-container", "rhel9", "test-pytest") == {
+            "ruby@example.com",
+            "rhel9@example.com",
+            "pytest@example.com",
+            "exact@example.com",
+        }
+        assert routes.resolve("s2i-ruby-container", "rhel8", "test") == {
+            "ruby@example.com"
+        }
+        assert routes.resolve("httpd-container", "rhel9", "test-pytest") == set()
+
+    def test_load_file(self, tmp_path):
+        routes_file = tmp_path / "routes.yaml"
+        routes_file.write_text(
+            "- container: httpd-container\n"
+            "  mails: [httpd@example.com]\n"
+            "- container: httpd-container\n"
+            "  os: rhel10\n"
+            "  mails: rhel10@example.com,other@example.com\n"
+        )
+        routes = nightly_mod.MailRoutes()
+
+        routes.load_file(routes_file)
+
+        assert routes.resolve("httpd-container", "rhel10", "test") == {
+            "httpd@example.com",
+            "rhel10@example.com",
+            "other@example.com",
+        }
+
+    @pytest.mark.parametrize(
+        "content", ["container: httpd-container", "- container: httpd-container"]
+    )
+    def test_load_file_invalid(self, tmp_path, content):
+        routes_file = tmp_path / "routes.yaml"
+        routes_file.write_text(content)
+
+        with pytest.raises(ValueError):
+            nightly_mod.MailRoutes().load_file(routes_file)
+
+    def test_generate_emails_uses_routes_per_os_and_test_type(
+        self, nightly_report, reset_sclorg_mails, monkeypatch, tmp_path
+    ):
+        for key, val in _env_for_load_mails(DEFAULT_MAILS="def@example.com").items():
+            monkeypatch.setenv(key, val)
+        routes_file = tmp_path / "routes.yaml"
+        routes_file.write_text(
+            "- container: nginx-container\n"
+            "  os: rhel9\n"
+            "  test_type: test-openshift-pytest\n"
+            "  mails: [nginx@example.com, def@example.com]\n"
+        )
+        nightly_report.args.mail_routes = routes_file
+        nightly_report.load_mails_from_environment()
+        nightly_report.available_test_case = {
+            ("rhel9-test", "nightly-rhel9", "RHEL-9 test results:"),
+            ("rhel9-test-openshift-pytest", "nightly-rhel9", "RHEL-9 OpenShift:"),
+        }
+        nightly_report.data_dict = {
+            "rhel9-test": [
+                ("/x/nginx-container.log", "nginx-container.log"),
+                ("/x/s2i-ruby-container.log", "s2i-ruby-container.log"),
+                ("/x/mysql-container.log.gz", "mysql-container.log.gz"),
+            ],
+            "rhel9-test-openshift-pytest": [
+                ("/y/nginx-container.log", "nginx-container.log"),
+            ],
+        }
+
+        nightly_report.generate_emails()
+
+        assert nightly_report.default_mails == [
+            "def@example.com",
+            "db1@example.com",
+            "db2@example.com",
+            "nginx@example.com",
+            "ruby@example.com",
+        ]
+
+
+class SmtpSink:
+    """aiosmtpd handler which keeps received messages and counts connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        message = email.message_from_bytes(envelope.content)
+        self.messages.append((sorted(envelope.rcpt_tos), message))
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def smtp_sink(nightly_report):
+    """Local SMTP server used by nightly_report."""
+    handler = SmtpSink()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    nightly_report.smtp_server = "127.0.0.1"
+    nightly_report.smtp_port = port
+    nightly_report.send_email = True
+    yield handler
+    controller.stop()
+
+
+class TestOwnerDigests:
+    """Tests for sending digests of failed containers to their owners."""
+
+    @pytest.fixture
+    def digest_report(self, nightly_report, reset_sclorg_mails):
+        nightly_mod.SCLORG_MAILS.update(
+            {
+                "s2i-ruby-container": ["ruby@example.com", "core@example.com"],
+                "mysql-container": ["db@example.com"],
+                "mariadb-container": ["db@example.com"],
+                "httpd-container": ["refused@example.com"],
+            }
+        )
+        nightly_report.args.owner_digests = True
+        nightly_report.core_mails = ["core@example.com"]
+        nightly_report.default_mails = ["core@example.com"]
+        nightly_report.available_test_case = {
+            ("rhel9-test", "nightly-rhel9", "RHEL-9 test results:"),
+        }
+        nightly_report.data_dict = {
+            "rhel9-test": [
+                ("/x/s2i-ruby-container.log", "s2i-ruby-container.log"),
+                ("/x/mysql-container.log", "mysql-container.log"),
+                ("/x/mariadb-container.log", "mariadb-container.log"),
+                ("/x/httpd-container.log", "httpd-container.log"),
+            ],
+        }
+        nightly_report.body = "full report"
+        return nightly_report
+
+    def test_generate_owner_digests_groups_owners(self, digest_report):
+        digests = digest_report.generate_owner_digests()
+
+        assert [owners for owners, _ in digests] == [
+            ["db@example.com"],
+            ["refused@example.com"],
+            ["ruby@example.com"],
+        ]
+        db_body = digests[0][1]
+        assert "mysql-container.log" in db_body
+        assert "mariadb-container.log" in db_body
+        assert "s2i-ruby-container.log" not in db_body
+
+    def test_send_emails_over_one_connection(self, digest_report, smtp_sink):
+        digest_report.generate_emails()
+
+        digest_report.send_emails()
+
+        assert smtp_sink.connections == 1
+        recipients = [rcpt for rcpt, _ in smtp_sink.messages]
+        assert recipients == [
+            ["core@example.com"],
+            ["db@example.com"],
+            ["ruby@example.com"],
+        ]
+        full, db_digest, ruby_digest = [msg for _, msg in smtp_sink.messages]
+        assert full.get_payload()[0].get_payload() == "full report"
+        assert db_digest["Subject"].endswith("in your containers")
+        db_body = db_digest.get_payload()[0].get_payload()
+        assert "mysql-container.log" in db_body
+        assert "s2i-ruby-container.log" not in db_body
+
+    def test_send_emails_without_digests(self, digest_report, smtp_sink):
+        digest_report.args.owner_digests = False
+        digest_report.default_mails = ["core@example.com", "db@example.com"]
+
+        digest_report.send_emails()
+
+        assert smtp_sink.connections == 1
+        assert [rcpt for rcpt, _ in smtp_sink.messages] == [
+            ["core@example.com", "db@example.com"]
+        ]
+
+
+class TestWatch:
+    """Tests for reporting test cases as soon as they finish."""
+
+    @pytest.fixture(params=["inotify", "polling"])
+    def watch_report(self, request, nightly_report, monkeypatch, tmp_path):
+        if request.param == "polling":
+            monkeypatch.setattr(nightly_mod, "INotify", None)
+        elif nightly_mod.INotify is None:
+            pytest.skip("inotify_simple is not installed")
+        nightly_report.reports_dir = tmp_path / "2024-01-02"
+        nightly_report.args.watch_interval = 0.05
+        nightly_report.available_test_case = {
+            ("fedora-test", "nightly-fedora", "Fedora test results:"),
+            ("c9s-test", "nightly-c9s", "CentOS Stream 9 test results:"),
+        }
+        uploaded = []
+
+        def upload_many(paths, contents=None):
+            uploaded.extend(paths)
+            return {p: f"https://paste/?{p.name}" for p in paths}
+
+        flexmock(nightly_report.pastebin).should_receive("upload_many").replace_with(
+            upload_many
+        )
+        nightly_report.uploaded = uploaded
+        return nightly_report
+
+    @staticmethod
+    def finish_test_case(case_dir, marker, failed_logs=()):
+        results = case_dir / "results" / "ns"
+        results.mkdir(parents=True, exist_ok=True)
+        for name in failed_logs:
+            (results / name).write_text("[FAILED] test")
+        (case_dir / marker).write_text("")
+        (case_dir / "logs_downloaded").write_text("")
+
+    def test_watch_reports_each_finished_test_case(self, watch_report, capsys):
+        reports_dir = watch_report.reports_dir
+        reports_dir.mkdir()
+        self.finish_test_case(reports_dir / "fedora-test", "tmt_success")
+
+        def finish_later():
+            time.sleep(0.2)
+            # Marker without downloaded logs does not resolve the test case
+            (reports_dir / "c9s-test").mkdir()
+            (reports_dir / "c9s-test" / "tmt_failed").write_text("")
+            time.sleep(0.2)
+            self.finish_test_case(
+                reports_dir / "c9s-test", "tmt_failed", ["httpd-container.log"]
+            )
+
+        thread = threading.Thread(target=finish_later)
+        thread.start()
+        watch_report.watch(timeout=10)
+        thread.join()
+        output = capsys.readouterr().out
+
+        assert "Test case fedora-test finished with status success" in output
+        assert "Test case c9s-test finished with status tmt_failed" in output
+        failed_log = reports_dir / "c9s-test" / "results" / "ns" / "httpd-container.log"
+        # tmt-verbose-log was not downloaded, so only failed log is sent
+        assert watch_report.uploaded == [failed_log]
+        assert watch_report.excerpts[failed_log] == "[FAILED] test"
+        assert watch_report.data_dict["SUCCESS"] == ["fedora-test"]
+        assert watch_report.data_dict["tmt"]["tmt_failed"] == ["c9s-test"]
+        state = json.loads((reports_dir / "report-state.json").read_text())
+        assert set(state["test_cases"]) == {"fedora-test", "c9s-test"}
+
+    def test_running_test_case_is_not_resolved(self, tmp_path):
+        for marker in ("tmt_running", "tmt_success", "logs_downloaded"):
+            (tmp_path / marker).write_text("")
+
+        case = nightly_mod.scan_test_case("rhel9-helm-charts", tmp_path)
+
+        assert not nightly_mod.is_resolved(case)
+
+    def test_watch_waits_until_test_case_is_not_running(self, watch_report, capsys):
+        watch_report.available_test_case = {
+            ("rhel9-helm-charts", "nightly-rhel9", "RHEL-9 Helm Charts test results:")
+        }
+        case_dir = watch_report.reports_dir / "rhel9-helm-charts"
+        case_dir.mkdir(parents=True)
+        for marker in ("tmt_running", "tmt_success", "logs_downloaded"):
+            (case_dir / marker).write_text("")
+
+        def stop_running():
+            time.sleep(0.2)
+            (case_dir / "tmt_running").unlink()
+
+        thread = threading.Thread(target=stop_running)
+        thread.start()
+        watch_report.watch(timeout=10)
+        thread.join()
+        output = capsys.readouterr().out
+
+        assert "Test case rhel9-helm-charts finished with status success" in output
+        assert "did not finish in time" not in output
+        assert watch_report.data_dict["SUCCESS"] == ["rhel9-helm-charts"]
+
+    def test_watch_stops_after_timeout(self, watch_report, capsys):
+        case_dir = watch_report.reports_dir / "fedora-test"
+        self.finish_test_case(case_dir, "tmt_success")
+
+        watch_report.watch(timeout=0.2)
+        output = capsys.readouterr().out
+
+        assert "Test cases ['c9s-test'] did not finish in time." in output
+        assert watch_report.data_dict["SUCCESS"] == ["fedora-test"]
+
+
+class TestReportMetrics:
+    """Tests for timing spans and counters of the report run."""
+
+    def test_summary_aggregates_spans(self):
+        metrics = nightly_mod.ReportMetrics()
+        for _ in range(2):
+            with metrics.span("phase", log="a.log"):
+                pass
+        with pytest.raises(ValueError):
+            with metrics.span("failing"):
+                raise ValueError("boom")
+        summary = metrics.summary()
+        assert summary["phase"]["calls"] == 2
+        assert summary["failing"]["calls"] == 1
+        assert metrics.spans[0]["log"] == "a.log"
+        assert all(span["duration"] >= 0 for span in metrics.spans)
+
+    def test_counters_and_report_file(self, tmp_path):
+        metrics = nightly_mod.ReportMetrics()
+        metrics.count("logs_uploaded")
+        metrics.count("bytes_uploaded", 10)
+        metrics.count("bytes_uploaded", 5)
+        report_file = tmp_path / "timing" / "report-timing.json"
+        metrics.write(report_file)
+        report = json.loads(report_file.read_text())
+        assert report["counters"] == {"bytes_uploaded": 15, "logs_uploaded": 1}
+        assert set(report) == {"started", "duration", "summary", "counters", "spans"}
+        assert not list(report_file.parent.glob("*.tmp"))
+
+    def test_upload_records_span_and_bytes(self, nightly_report, stub_privatebin):
+        content = b"some log content"
+        nightly_report.pastebin.upload_content(content, "a.log")
+        metrics = nightly_report.metrics
+        assert metrics.counters["logs_uploaded"] == 1
+        assert metrics.counters["bytes_uploaded"] == len(content)
+        assert metrics.summary()["pastebin_upload"]["calls"] == 1
+
+    def test_failed_upload_is_counted(self, nightly_report):
+        nightly_report.pastebin = nightly_mod.PasteBinUploader(
+            server="http://127.0.0.1:1", attempts=1, metrics=nightly_report.metrics
+        )
+        assert nightly_report.pastebin.upload_content(b"log", "a.log") == ""
+        assert nightly_report.metrics.counters["pastebin_failures"] == 1
+
+    def test_phases_are_timed(self, collect_report, tmp_path):
+        collect_report.collect_data()
+        collect_report.generate_email_body()
+        summary = collect_report.metrics.summary()
+        assert summary["collect_data"]["calls"] == 1
+        assert summary["generate_email_body"]["calls"] == 1
+        collect_report.write_timing_report()
+        assert len(list(tmp_path.glob("report-timing-*.json"))) == 1
+
+    def test_environment_is_not_printed(
+        self, nightly_report, reset_sclorg_mails, monkeypatch, capsys
+    ):
+        for key, val in _env_for_load_mails().items():
+            monkeypatch.setenv(key, val, prepend=False)
+        monkeypatch.setenv("SECRET_TOKEN", "do-not-print")
+        nightly_report.load_mails_from_environment()
+        assert "do-not-print" not in capsys.readouterr().out
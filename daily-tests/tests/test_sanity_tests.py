@@ -0,0 +1,529 @@
+# pylint: disable=import-error,redefined-outer-name
+"""Tests for sclorg_sanity_tests."""
+
+import json
+import os
+import sys
+
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flexmock import flexmock
+from git import Repo
+from git.exc import GitCommandError
+
+from daily_tests import sclorg_sanity_tests as sanity_mod
+from daily_tests.sclorg_sanity_tests import SclOrgSanityChecker
+
+REPO_FILES = {
+    "Makefile": "VERSIONS = 1.0 2.0\n",
+    "README.md": "readme\n",
+    "1.0/Dockerfile.rhel9": "FROM ubi9\n",
+    "1.0/.exclude-rhel8": "",
+    "1.0/test/run": "#!/bin/bash\n",
+    "1.0/s2i/bin/assemble": "#!/bin/bash\n",
+    "2.0/Dockerfile.fedora": "FROM fedora\n",
+    "2.0/.devel-repo-rhel9": "",
+}
+
+
+def commit_files(repo: Repo, files: dict, message: str):
+    """Write files into the work tree of the repo and commit them."""
+    for name, content in files.items():
+        path = Path(repo.working_tree_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    repo.index.add(list(files))
+    repo.index.commit(message)
+
+
+def make_upstream_repo(upstream_dir: Path, repo_name: str, files: dict) -> Repo:
+    """Create repository with two commits, the second one adds files."""
+    repo = Repo.init(upstream_dir / repo_name)
+    with repo.config_writer() as config:
+        config.set_value("uploadpack", "allowFilter", "true")
+    commit_files(repo, {"Makefile": "VERSIONS = 1.0\n"}, "Initial commit")
+    commit_files(repo, files, "Add versions")
+    return repo
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Local upstream repository used instead of GitHub."""
+    upstream_dir = tmp_path / "upstream"
+    repo = make_upstream_repo(upstream_dir, "s2i-perl-container", REPO_FILES)
+    monkeypatch.setattr(
+        sanity_mod, "SCLORG_REPO_URL", f"file://{upstream_dir}/{{repo_name}}"
+    )
+    monkeypatch.setattr(sanity_mod, "SCLORG_REPOS", {"s2i-perl-container": "perl"})
+    return repo
+
+
+@pytest.fixture
+def sanity_checker(tmp_path, monkeypatch):
+    """Build SclOrgSanityChecker with logs and clones in tmp_path."""
+    monkeypatch.setattr(sys, "argv", ["sclorg_sanity_tests.py"])
+    checker = SclOrgSanityChecker()
+    checker.log_dir = tmp_path
+    checker.debug_log = tmp_path / sanity_mod.SANITY_LOG
+    checker.tmp_path_dir = tmp_path / "clones"
+    checker.args.mirror_dir = tmp_path / "mirrors"
+    checker.args.result_cache = tmp_path / "result_cache.json"
+    checker.args.lifecycle_cache = tmp_path / "application-streams.yaml"
+    checker.app_stream = {"lifecycles": []}
+    checker.lifecycle_hash = "lifecycle"
+    return checker
+
+
+def checked_out_files(path):
+    return sorted(
+        str(x.relative_to(path))
+        for x in path.rglob("*")
+        if x.is_file() and ".git" not in x.relative_to(path).parts
+    )
+
+
+class TestCloneRepository:
+    """Tests for cloning sclorg repositories."""
+
+    def test_sparse_clone(self, sanity_checker, upstream):
+        sanity_checker.args.clone_mode = "sparse"
+        assert sanity_checker.clone_repository("s2i-perl-container")
+        clone_dir = sanity_checker.tmp_path_dir / "s2i-perl-container"
+        assert checked_out_files(clone_dir) == [
+            "1.0/.exclude-rhel8",
+            "1.0/Dockerfile.rhel9",
+            "2.0/.devel-repo-rhel9",
+            "2.0/Dockerfile.fedora",
+            "Makefile",
+        ]
+        clone = Repo(clone_dir)
+        assert clone.git.rev_list("--count", "HEAD") == "1"
+
+    def test_full_clone(self, sanity_checker, upstream):
+        sanity_checker.args.clone_mode = "full"
+        assert sanity_checker.clone_repository("s2i-perl-container")
+        clone_dir = sanity_checker.tmp_path_dir / "s2i-perl-container"
+        assert checked_out_files(clone_dir) == sorted(REPO_FILES)
+        assert Repo(clone_dir).git.rev_list("--count", "HEAD") == "2"
+
+    def test_clone_failure(self, sanity_checker, upstream):
+        assert not sanity_checker.clone_repository("missing-container")
+        assert (
+            "Cloning repo has failed"
+            in (sanity_checker.log_dir / "default.log").read_text()
+        )
+
+    @pytest.mark.parametrize("clone_mode", sanity_mod.CLONE_MODES)
+    def test_collect_data(self, sanity_checker, upstream, clone_mode):
+        sanity_checker.args.clone_mode = clone_mode
+        sanity_checker.collect_data()
+        assert sanity_checker.data_dict == {
+            "s2i-perl-container": {
+                "1.0": [".exclude-rhel8", "Dockerfile.rhel9"],
+                "2.0": ["Dockerfile.fedora", ".devel-repo-rhel9"],
+            }
+        }
+        assert not (sanity_checker.tmp_path_dir / "s2i-perl-container").exists()
+
+
+class TestCollectData:
+    """Tests for collecting data of repositories in parallel."""
+
+    def test_scan_repository(self, tmp_path):
+        for name, content in REPO_FILES.items():
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        assert sanity_mod.scan_repository(tmp_path) == {
+            "1.0": [".exclude-rhel8", "Dockerfile.rhel9"],
+            "2.0": ["Dockerfile.fedora", ".devel-repo-rhel9"],
+        }
+
+    def test_scan_repository_without_makefile(self, tmp_path):
+        assert sanity_mod.scan_repository(tmp_path) is None
+
+    @pytest.mark.parametrize("clone_mode", sanity_mod.CLONE_MODES)
+    def test_versions_with_extra_spaces(self, sanity_checker, upstream, clone_mode):
+        commit_files(upstream, {"Makefile": "VERSIONS = 1.0  2.0 \n"}, "Spaces")
+        sanity_checker.args.clone_mode = clone_mode
+        head, versions = sanity_checker.collect_repo_data("s2i-perl-container")
+        assert head == upstream.head.commit.hexsha
+        assert versions == {
+            "1.0": [".exclude-rhel8", "Dockerfile.rhel9"],
+            "2.0": ["Dockerfile.fedora", ".devel-repo-rhel9"],
+        }
+
+    @pytest.mark.parametrize("clone_mode", sanity_mod.CLONE_MODES)
+    def test_collect_data_in_order(
+        self, sanity_checker, upstream, monkeypatch, clone_mode
+    ):
+        upstream_dir = Path(upstream.working_tree_dir).parent
+        repos = {
+            "s2i-ruby-container": "ruby",
+            "missing-container": "missing",
+            "s2i-perl-container": "perl",
+            "nginx-container": "nginx",
+        }
+        for repo_name in ("s2i-ruby-container", "nginx-container"):
+            make_upstream_repo(
+                upstream_dir,
+                repo_name,
+                {"Makefile": "VERSIONS = 3.0\n", "3.0/Dockerfile.c9s": ""},
+            )
+        monkeypatch.setattr(sanity_mod, "SCLORG_REPOS", repos)
+        sanity_checker.args.workers = 3
+        sanity_checker.args.clone_mode = clone_mode
+        cwd = os.getcwd()
+        sanity_checker.collect_data()
+        assert os.getcwd() == cwd
+        assert list(sanity_checker.data_dict) == [
+            "s2i-ruby-container",
+            "s2i-perl-container",
+            "nginx-container",
+        ]
+        assert sanity_checker.data_dict["nginx-container"] == {
+            "3.0": ["Dockerfile.c9s"]
+        }
+        clones_dir = sanity_checker.tmp_path_dir
+        assert not clones_dir.exists() or not list(clones_dir.iterdir())
+
+    @pytest.mark.parametrize("clone_mode", sanity_mod.CLONE_MODES)
+    def test_failing_repo_does_not_stop_collecting(
+        self, sanity_checker, upstream, monkeypatch, clone_mode
+    ):
+        make_upstream_repo(
+            Path(upstream.working_tree_dir).parent,
+            "nginx-container",
+            {"Makefile": "VERSIONS = 3.0\n", "3.0/Dockerfile.c9s": ""},
+        )
+        monkeypatch.setattr(
+            sanity_mod,
+            "SCLORG_REPOS",
+            {"s2i-perl-container": "perl", "nginx-container": "nginx"},
+        )
+        scan_name = "scan_mirror" if clone_mode == "mirror" else "scan_repository"
+        scan = getattr(sanity_mod, scan_name)
+
+        def failing_scan(path):
+            if "s2i-perl-container" in str(path):
+                raise GitCommandError("ls-tree", 128)
+            return scan(path)
+
+        monkeypatch.setattr(sanity_mod, scan_name, failing_scan)
+        sanity_checker.args.workers = 2
+        sanity_checker.args.clone_mode = clone_mode
+        sanity_checker.collect_data()
+        assert sanity_checker.data_dict == {
+            "nginx-container": {"3.0": ["Dockerfile.c9s"]}
+        }
+        assert (
+            "Collecting data of repo s2i-perl-container has failed"
+            in (sanity_checker.log_dir / "default.log").read_text()
+        )
+
+
+class TestMirror:
+    """Tests for persistent bare mirrors of repositories."""
+
+    def test_mirror_is_created(self, sanity_checker, upstream):
+        mirror_dir = sanity_checker.update_mirror("s2i-perl-container")
+        assert mirror_dir == sanity_checker.args.mirror_dir / "s2i-perl-container.git"
+        mirror = Repo(mirror_dir)
+        assert mirror.bare
+        assert mirror.head.commit.hexsha == upstream.head.commit.hexsha
+        assert sanity_mod.scan_mirror(mirror_dir) == {
+            "1.0": [".exclude-rhel8", "Dockerfile.rhel9"],
+            "2.0": ["Dockerfile.fedora", ".devel-repo-rhel9"],
+        }
+
+    def test_mirror_is_updated(self, sanity_checker, upstream):
+        mirror_dir = sanity_checker.update_mirror("s2i-perl-container")
+        commit_files(
+            upstream,
+            {"Makefile": "VERSIONS = 1.0 2.0 3.0\n", "3.0/Dockerfile.rhel8": ""},
+            "Add 3.0",
+        )
+        assert sanity_checker.update_mirror("s2i-perl-container") == mirror_dir
+        mirror = Repo(mirror_dir)
+        assert mirror.head.commit.hexsha == upstream.head.commit.hexsha
+        assert mirror.git.rev_list("--count", "HEAD") == "3"
+        assert sanity_mod.scan_mirror(mirror_dir)["3.0"] == ["Dockerfile.rhel8"]
+
+    @pytest.mark.parametrize("leftover", ["empty", "garbage", "no_commits"])
+    def test_broken_mirror_is_cloned_again(self, sanity_checker, upstream, leftover):
+        mirror_dir = sanity_checker.args.mirror_dir / "s2i-perl-container.git"
+        mirror_dir.mkdir(parents=True)
+        if leftover == "garbage":
+            (mirror_dir / "HEAD").write_text("garbage")
+        elif leftover == "no_commits":
+            Repo.init(mirror_dir, bare=True)
+
+        assert sanity_checker.update_mirror("s2i-perl-container") == mirror_dir
+        assert Repo(mirror_dir).head.commit.hexsha == upstream.head.commit.hexsha
+        head, versions = sanity_checker.collect_repo_data("s2i-perl-container")
+        assert head == upstream.head.commit.hexsha
+        assert set(versions) == {"1.0", "2.0"}
+
+    def test_mirror_failure(self, sanity_checker, upstream):
+        assert sanity_checker.update_mirror("missing-container") is None
+        assert (
+            "Updating mirror of repo has failed"
+            in (sanity_checker.log_dir / "default.log").read_text()
+        )
+        assert sanity_checker.collect_repo_data("missing-container") is None
+
+    def test_mirror_without_makefile(self, sanity_checker, upstream):
+        redis = make_upstream_repo(
+            Path(upstream.working_tree_dir).parent,
+            "redis-container",
+            {"README.md": "readme\n"},
+        )
+        redis.index.remove(["Makefile"], working_tree=True)
+        redis.index.commit("Remove Makefile")
+        assert sanity_checker.collect_repo_data("redis-container") is None
+
+
+class TestResultCache:
+    """Tests for skipping repositories which did not change."""
+
+    @pytest.fixture
+    def next_checker(self, sanity_checker, monkeypatch):
+        """Run the checker once and return fresh checker for the next run."""
+        sanity_checker.collect_data()
+        sanity_checker.run_check()
+        checker = SclOrgSanityChecker()
+        for attr in ("log_dir", "debug_log", "tmp_path_dir", "app_stream"):
+            setattr(checker, attr, getattr(sanity_checker, attr))
+        checker.args = sanity_checker.args
+        checker.lifecycle_hash = sanity_checker.lifecycle_hash
+        return checker
+
+    @pytest.mark.parametrize("clone_mode", sanity_mod.CLONE_MODES)
+    def test_unchanged_repo_is_not_scanned(
+        self, sanity_checker, upstream, clone_mode, next_checker
+    ):
+        assert sanity_checker.failed_repos == ["s2i-perl-container"]
+        cache = json.loads(sanity_checker.args.result_cache.read_text())
+        entry = cache["repos"]["s2i-perl-container"]
+        assert entry["head"] == upstream.head.commit.hexsha
+        assert entry["verdicts"]["1.0"]["rhel8"][0] is False
+        flexmock(sanity_mod).should_receive("scan_mirror").never()
+        flexmock(sanity_mod).should_receive("scan_repository").never()
+        flexmock(next_checker).should_receive("clone_repository").never()
+        flexmock(next_checker).should_receive(
+            "check_exclude_file_not_dockerfile"
+        ).never()
+        next_checker.load_result_cache()
+        next_checker.collect_data()
+        assert next_checker.data_dict == sanity_checker.data_dict
+        next_checker.run_check()
+        assert next_checker.failed_repos == ["s2i-perl-container"]
+        report = next_checker.log_dir / "s2i-perl-container.log"
+        assert ".exclude-rhel8 is present but Dockerfile.rhel8 not" in (
+            report.read_text()
+        )
+
+    def test_changed_repo_is_scanned(self, sanity_checker, upstream, next_checker):
+        commit_files(upstream, {"1.0/Dockerfile.rhel8": ""}, "Add rhel8")
+        next_checker.load_result_cache()
+        next_checker.collect_data()
+        assert next_checker.data_dict["s2i-perl-container"]["1.0"] == [
+            ".exclude-rhel8",
+            "Dockerfile.rhel8",
+            "Dockerfile.rhel9",
+        ]
+        next_checker.run_check()
+        assert next_checker.success_repos == ["s2i-perl-container"]
+        cache = json.loads(next_checker.args.result_cache.read_text())
+        entry = cache["repos"]["s2i-perl-container"]
+        assert entry["head"] == upstream.head.commit.hexsha
+
+    def test_invalid_cache_is_ignored(self, sanity_checker):
+        sanity_checker.args.result_cache.write_text("{")
+        sanity_checker.load_result_cache()
+        assert sanity_checker.result_cache == {}
+        sanity_checker.args.result_cache.write_text(json.dumps({"version": 0}))
+        sanity_checker.load_result_cache()
+        assert sanity_checker.result_cache == {}
+        sanity_checker.args.result_cache.write_text("[]")
+        sanity_checker.load_result_cache()
+        assert sanity_checker.result_cache == {}
+
+    @pytest.mark.parametrize(
+        "damage",
+        [
+            {"repos": []},
+            {"enddates": {"perl/5.40/rhel9": "tomorrow"}},
+            {"repos": {"s2i-perl-container": "head"}},
+            {"repos": {"s2i-perl-container": {"head": "abc", "versions": {}}}},
+            {
+                "repos": {
+                    "s2i-perl-container": {
+                        "head": "abc",
+                        "versions": {"1.0": []},
+                        "verdicts": {"1.0": {"rhel8": True}},
+                    }
+                }
+            },
+        ],
+    )
+    def test_damaged_cache_is_ignored(self, sanity_checker, damage):
+        cache = {
+            "version": sanity_mod.RESULT_CACHE_VERSION,
+            "lifecycle_hash": "lifecycle",
+            "enddates": {},
+            "repos": {},
+        }
+        cache.update(damage)
+        sanity_checker.args.result_cache.write_text(json.dumps(cache))
+        sanity_checker.load_result_cache()
+        assert sanity_checker.result_cache == {}
+        assert sanity_checker.enddates == {}
+        assert sanity_checker.cached_repo("s2i-perl-container", "abc") is None
+
+    @pytest.mark.parametrize(
+        "lifecycle_hash,days_to_eol,expected",
+        [("lifecycle", 10, 2), ("lifecycle", -1, 1), ("changed", 10, 0)],
+    )
+    def test_eol_from_cached_enddate(
+        self, sanity_checker, lifecycle_hash, days_to_eol, expected
+    ):
+        enddate = (date.today() + timedelta(days=days_to_eol)).strftime("%Y%m%d")
+        sanity_checker.args.result_cache.write_text(
+            json.dumps(
+                {
+                    "version": sanity_mod.RESULT_CACHE_VERSION,
+                    "lifecycle_hash": lifecycle_hash,
+                    "enddates": {"perl/5.40/rhel9": enddate},
+                    "repos": {},
+                }
+            )
+        )
+        sanity_checker.pkg_name = "perl"
+        sanity_checker.load_result_cache()
+        assert sanity_checker.is_eol_version(ver="5.40", os_ver="rhel9") == expected
+
+
+LIFECYCLE = b"""
+lifecycles:
+  - name: perl
+    stream: "5.40"
+    initial_product_version: "10.0"
+    enddate: "20300101"
+  - name: perl
+    stream: "5.32"
+    initial_product_version: "9.0"
+    enddate: "20320531"
+  - name: perl
+    stream: "5.32"
+    initial_product_version: "9.4"
+    enddate: "20290531"
+  - name: nodejs
+    stream: "22"
+    initial_product_version: "9.5"
+"""
+
+
+def lifecycle_response(status_code=200, content=LIFECYCLE, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+class TestLifecycle:
+    """Tests for downloading and indexing the lifecycle file."""
+
+    def test_build_lifecycle_index(self):
+        index = sanity_mod.build_lifecycle_index(
+            sanity_mod.yaml.load(LIFECYCLE, Loader=sanity_mod.SafeLoader)
+        )
+        assert index == {
+            ("perl", "5.40", "10"): date(2030, 1, 1),
+            ("perl", "5.32", "9"): date(2032, 5, 31),
+        }
+
+    def test_is_eol_version_uses_index(self, sanity_checker):
+        sanity_checker.lifecycle_index = {("perl", "5.32", "9"): date(2000, 1, 1)}
+        sanity_checker.pkg_name = "perl"
+        assert sanity_checker.is_eol_version(ver="5.32", os_ver="rhel9") == 1
+        assert sanity_checker.is_eol_version(ver="5.32", os_ver="rhel8") == 0
+        assert sanity_checker.enddates == {
+            "perl/5.32/rhel9": "20000101",
+            "perl/5.32/rhel8": None,
+        }
+
+    def test_download_stores_cache(self, sanity_checker):
+        response = lifecycle_response(headers={"ETag": '"abc"'})
+        with patch.object(
+            sanity_mod.requests, "get", return_value=response
+        ) as mock_get:
+            sanity_checker.download_and_load_lifecycle_file()
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert mock_get.call_args.kwargs["timeout"] == sanity_mod.LIFECYCLE_TIMEOUT
+        assert sanity_checker.args.lifecycle_cache.read_bytes() == LIFECYCLE
+        assert ("perl", "5.40", "10") in sanity_checker.lifecycle_index
+
+    def test_not_modified_uses_cache(self, sanity_checker):
+        with patch.object(
+            sanity_mod.requests,
+            "get",
+            return_value=lifecycle_response(
+                headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024"}
+            ),
+        ):
+            sanity_checker.download_and_load_lifecycle_file()
+        lifecycle_hash = sanity_checker.lifecycle_hash
+        with patch.object(
+            sanity_mod.requests,
+            "get",
+            return_value=lifecycle_response(status_code=304, content=b""),
+        ) as mock_get:
+            sanity_checker.download_and_load_lifecycle_file()
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 01 Jan 2024",
+        }
+        assert sanity_checker.lifecycle_hash == lifecycle_hash
+        assert ("perl", "5.32", "9") in sanity_checker.lifecycle_index
+
+    @pytest.mark.parametrize(
+        "headers_content", ["{", "[]", '{"ETag": "\\"abc\\"", "sha256": "other"}']
+    )
+    def test_damaged_headers_are_not_sent(self, sanity_checker, headers_content):
+        cache_file = sanity_checker.args.lifecycle_cache
+        cache_file.write_bytes(LIFECYCLE)
+        headers_file = cache_file.with_name(f"{cache_file.name}.headers.json")
+        headers_file.write_text(headers_content)
+        with patch.object(
+            sanity_mod.requests,
+            "get",
+            return_value=lifecycle_response(headers={"ETag": '"def"'}),
+        ) as mock_get:
+            sanity_checker.download_and_load_lifecycle_file()
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert json.loads(headers_file.read_text())["ETag"] == '"def"'
+        assert ("perl", "5.40", "10") in sanity_checker.lifecycle_index
+
+    def test_unreachable_server_uses_cache(self, sanity_checker):
+        sanity_checker.args.lifecycle_cache.write_bytes(LIFECYCLE)
+        with patch.object(
+            sanity_mod.requests,
+            "get",
+            side_effect=sanity_mod.requests.ConnectionError("unreachable"),
+        ):
+            sanity_checker.download_and_load_lifecycle_file()
+        assert ("perl", "5.40", "10") in sanity_checker.lifecycle_index
+
+    def test_unreachable_server_without_cache(self, sanity_checker):
+        with patch.object(
+            sanity_mod.requests,
+            "get",
+            side_effect=sanity_mod.requests.ConnectionError("unreachable"),
+        ):
+            with pytest.raises(sanity_mod.requests.ConnectionError):
+                sanity_checker.download_and_load_lifecycle_file()
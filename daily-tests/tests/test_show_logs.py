@@ -1,4 +1,5 @@
 # pylint: disable=import-error
+import json
 import sys
 
 from datetime import date as real_date
@@ -7,7 +8,7 @@ from pathlib import Path
 import pytest
 
 
-from daily_tests import show_logs
+from daily_tests import report_state, show_logs
 
 TEST_DIR = Path(__file__).parent.absolute()
 sys.path.append(str(TEST_DIR))
@@ -107,3 +108,79 @@ def test_iter_results_in_directory_summarizes(report_env, capsys):
     assert "c9s-test" in output
     assert "Failed TMT plans" in output
     assert "rhel9-test" in output
+
+
+def test_return_failed_tests_finds_compressed_logs(tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    (results_dir / "a.log").write_text("a")
+    (results_dir / "b.log.gz").write_bytes(b"")
+    (results_dir / "c.log.part").write_text("partial")
+
+    report = show_logs.PVCWatcherReport()
+    results = report.return_failed_tests(tmp_path, Path("c9s-test"))
+
+    assert sorted(f.name for f in results) == ["a.log", "b.log.gz"]
+
+
+def test_print_report_reads_report_state(report_env, capsys):
+    report, _, _ = report_env
+    report.reports_dir.mkdir(parents=True)
+    (report.reports_dir / "report-state.json").write_text(
+        json.dumps(
+            {
+                "version": report_state.STATE_VERSION,
+                "date": "2024-01-02",
+                "test_cases": {
+                    "c9s-test": {"status": "success", "failed_logs": []},
+                    "rhel9-test": {
+                        "status": "failed",
+                        "failed_logs": [{"path": "/results/httpd-container.log"}],
+                    },
+                },
+            }
+        )
+    )
+
+    report.print_report()
+    output = capsys.readouterr().out
+
+    assert "Test cases with status success:\nc9s-test" in output
+    assert "Test cases with status failed:\nrhel9-test" in output
+    assert "/results/httpd-container.log" in output
+
+
+def test_print_report_shows_scan_next_to_report_state(report_env, capsys):
+    report, _, _ = report_env
+    (report.reports_dir / "c9s-test").mkdir(parents=True)
+    (report.reports_dir / "c9s-test" / "tmt_success").touch()
+    (report.reports_dir / "report-state.json").write_text(
+        json.dumps(
+            {
+                "version": report_state.STATE_VERSION,
+                "date": "2024-01-02",
+                "test_cases": {
+                    "c9s-test": {"status": "running", "failed_logs": []},
+                },
+            }
+        )
+    )
+
+    report.print_report()
+    output = capsys.readouterr().out
+
+    scan = output.index(f"Success TMT plans in {report.reports_dir} are:\nc9s-test")
+    state = output.index("Test cases with status running:\nc9s-test")
+    assert scan < state
+
+
+def test_print_report_ignores_state_with_other_version(report_env, capsys):
+    report, _, _ = report_env
+    report.reports_dir.mkdir(parents=True)
+    (report.reports_dir / "report-state.json").write_text('{"version": 0}')
+
+    report.print_report()
+    output = capsys.readouterr().out
+
+    assert "unknown version" in output
+    assert "Summary of results reports directory" in output
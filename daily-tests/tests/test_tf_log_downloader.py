@@ -1,13 +1,17 @@
 # pylint: disable=import-error,redefined-outer-name
+import gzip
+import json
 import sys
+import threading
+import time
 import pytest
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from daily_tests import download_logs
 
-
 TEST_DIR = Path(__file__).parent.absolute()
 sys.path.insert(0, str(TEST_DIR.parent))
 
@@ -32,6 +36,20 @@ def log_file_with_request_id(tmp_path):
     return str(log_file)
 
 
+@pytest.fixture
+def log_file_with_retried_requests(tmp_path):
+    """Create a log file of a Testing Farm request which was retried."""
+    log_file = tmp_path / "retried.log"
+    log_file.write_text(
+        "🔎 api https://api.dev.testing-farm.io/v0.1/requests/first-id\n"
+        "⛔ pipeline error\n"
+        "🔎 api https://api.dev.testing-farm.io/v0.1/requests/second-id\n"
+        "🚢 artifacts https://artifacts.dev.testing-farm.io/second-id\n"
+        "🔎 api https://api.dev.testing-farm.io/v0.1/requests/second-id\n"
+    )
+    return str(log_file)
+
+
 @pytest.fixture
 def log_file_without_request_id(tmp_path):
     """Create a log file without a request ID."""
@@ -59,11 +77,28 @@ class TestTestingFarmLogDownloaderInit:
         assert downloader.target == "c9s"
         assert downloader.test == "test"
         assert downloader.request_id is None
-        assert downloader.xml_dict is None
-        assert downloader.data_dir_url_link is None
+        assert downloader.results_summary is None
+        assert downloader.data_dir_url_links == []
+        assert downloader.workers == download_logs.DEFAULT_WORKERS
         assert "daily_reports_dir" in str(downloader.log_dir)
         assert "c9s-test" in str(downloader.log_dir)
 
+    def test_init_session_pool_sized_by_workers(
+        self, tmp_log_dir, log_file_with_request_id
+    ):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_request_id, "c9s", "test", workers=3
+        )
+        adapter = downloader.session.get_adapter("https://example.com")
+        assert downloader.session.verify is False
+        assert adapter._pool_maxsize == 3
+
+    def test_init_workers_at_least_one(self, tmp_log_dir, log_file_with_request_id):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_request_id, "c9s", "test", workers=0
+        )
+        assert downloader.workers == 1
+
 
 class TestGetRequestId:
     """Tests for TestingFarmLogDownloader.get_request_id."""
@@ -85,6 +120,58 @@ class TestGetRequestId:
         assert downloader.request_id is None
         assert "Request ID not found" in capsys.readouterr().out
 
+    def test_get_request_id_uses_latest_request(
+        self, tmp_log_dir, log_file_with_retried_requests, capsys
+    ):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_retried_requests, "fedora", "test"
+        )
+        assert downloader.get_request_id() is True
+        assert downloader.request_ids == ["first-id", "second-id"]
+        assert downloader.request_id == "second-id"
+        assert "Request IDs found in the log" in capsys.readouterr().out
+
+    def test_get_request_id_with_index(
+        self, tmp_log_dir, log_file_with_retried_requests
+    ):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_retried_requests, "fedora", "test"
+        )
+        assert downloader.get_request_id(index=0) is True
+        assert downloader.request_id == "first-id"
+
+    def test_get_request_id_index_out_of_range(
+        self, tmp_log_dir, log_file_with_retried_requests, capsys
+    ):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_retried_requests, "fedora", "test"
+        )
+        assert downloader.get_request_id(index=5) is False
+        assert downloader.request_id is None
+        assert "index 5 not found" in capsys.readouterr().out
+
+
+class TestFindRequestIds:
+    """Tests for find_request_ids."""
+
+    def test_find_request_ids_in_cli_log(self):
+        assert download_logs.find_request_ids(TEST_DIR / "tmt_log_output") == [
+            "062cb820-8519-4e7b-adf1-30e9f42d3c8f"
+        ]
+
+    def test_find_request_ids_keeps_order_without_duplicates(
+        self, log_file_with_retried_requests
+    ):
+        assert download_logs.find_request_ids(Path(log_file_with_retried_requests)) == [
+            "first-id",
+            "second-id",
+        ]
+
+    def test_find_request_ids_empty_file(self, tmp_path):
+        empty = tmp_path / "empty.log"
+        empty.write_bytes(b"")
+        assert download_logs.find_request_ids(empty) == []
+
 
 class TestDownloadLog:
     """Tests for TestingFarmLogDownloader.download_log."""
@@ -93,11 +180,10 @@ class TestDownloadLog:
         downloader.log_dir = tmp_path
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"log content"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"log content"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             result = downloader.download_log("http://example.com/log.txt", "log.txt")
 
         assert result is True
@@ -108,11 +194,10 @@ class TestDownloadLog:
         downloader.log_dir = tmp_path
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"failed log"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"failed log"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             result = downloader.download_log(
                 "http://example.com/fail.log", "fail.log", is_failed=True
             )
@@ -125,9 +210,7 @@ class TestDownloadLog:
         mock_response = MagicMock()
         mock_response.status_code = 404
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             with patch("daily_tests.download_logs.time.sleep"):
                 result = downloader.download_log(
                     "http://example.com/missing.log", "missing.log"
@@ -135,13 +218,152 @@ class TestDownloadLog:
 
         assert result is False
         assert "Failed to download log" in capsys.readouterr().out
+        assert not (tmp_path / "missing.log").exists()
+
+    def test_download_log_streams_chunks_to_part_file(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"first ", b"second"]
+
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
+        ) as mock_get:
+            result = downloader.download_log("http://example.com/big.log", "big.log")
+
+        assert result is True
+        assert (tmp_path / "big.log").read_bytes() == b"first second"
+        assert not (tmp_path / "big.log.part").exists()
+        assert mock_get.call_args.kwargs["stream"] is True
+        assert mock_get.call_args.kwargs["headers"] == {}
+        mock_response.close.assert_called_once()
+
+    def test_download_log_resumes_interrupted_download(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        interrupted = MagicMock()
+        interrupted.status_code = 200
+        interrupted.headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024"}
+
+        def broken_stream(chunk_size):
+            yield b"first "
+            raise download_logs.requests.exceptions.ChunkedEncodingError("reset")
+
+        interrupted.iter_content.side_effect = broken_stream
+        resumed = MagicMock()
+        resumed.status_code = 206
+        resumed.headers = {"Content-Range": "bytes 6-11/12"}
+        resumed.iter_content.return_value = [b"second"]
+
+        with patch.object(
+            downloader.session, "get", side_effect=[interrupted, resumed]
+        ) as mock_get:
+            with patch("daily_tests.download_logs.time.sleep"):
+                result = downloader.download_log(
+                    "http://example.com/big.log", "big.log"
+                )
+
+        assert result is True
+        assert (tmp_path / "big.log").read_bytes() == b"first second"
+        assert mock_get.call_args.kwargs["headers"] == {
+            "Range": "bytes=6-",
+            "If-Range": '"v1"',
+        }
+        assert not list(tmp_path.glob("big.log.part*"))
+
+    def test_resume_validator_skips_weak_etag(self):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"ETag": 'W/"v1"', "Last-Modified": "Mon, 01 Jan 2024"}
+
+        assert download_logs.resume_validator(response) == "Mon, 01 Jan 2024"
+
+    def test_download_log_without_validator_starts_from_scratch(
+        self, downloader, tmp_path
+    ):
+        downloader.log_dir = tmp_path
+        (tmp_path / "big.log.part").write_bytes(b"unknown ")
+        full = MagicMock()
+        full.status_code = 200
+        full.headers = {}
+        full.iter_content.return_value = [b"full content"]
+
+        with patch.object(downloader.session, "get", return_value=full) as mock_get:
+            result = downloader.download_log("http://example.com/big.log", "big.log")
+
+        assert result is True
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert (tmp_path / "big.log").read_bytes() == b"full content"
+
+    def test_download_log_restarts_on_unexpected_content_range(
+        self, downloader, tmp_path
+    ):
+        downloader.log_dir = tmp_path
+        (tmp_path / "big.log.part").write_bytes(b"first ")
+        (tmp_path / "big.log.part.validator").write_text('"v1"')
+        wrong_range = MagicMock()
+        wrong_range.status_code = 206
+        wrong_range.headers = {"Content-Range": "bytes 0-11/12"}
+        wrong_range.iter_content.return_value = [b"new content!"]
+        full = MagicMock()
+        full.status_code = 200
+        full.headers = {"ETag": '"v2"'}
+        full.iter_content.return_value = [b"new content!"]
+
+        with patch.object(
+            downloader.session, "get", side_effect=[wrong_range, full]
+        ) as mock_get:
+            with patch("daily_tests.download_logs.time.sleep"):
+                result = downloader.download_log(
+                    "http://example.com/big.log", "big.log"
+                )
+
+        assert result is True
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert (tmp_path / "big.log").read_bytes() == b"new content!"
+        assert not list(tmp_path.glob("big.log.part*"))
+
+    def test_download_log_restarts_when_range_ignored(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        (tmp_path / "big.log.part").write_bytes(b"stale")
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"full content"]
+
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            result = downloader.download_log("http://example.com/big.log", "big.log")
+
+        assert result is True
+        assert (tmp_path / "big.log").read_bytes() == b"full content"
+
+    def test_download_log_drops_part_file_on_416(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        (tmp_path / "big.log.part").write_bytes(b"too long")
+        not_satisfiable = MagicMock()
+        not_satisfiable.status_code = 416
+        full = MagicMock()
+        full.status_code = 200
+        full.headers = {}
+        full.iter_content.return_value = [b"ok"]
+
+        with patch.object(
+            downloader.session, "get", side_effect=[not_satisfiable, full]
+        ):
+            with patch("daily_tests.download_logs.time.sleep"):
+                result = downloader.download_log(
+                    "http://example.com/big.log", "big.log"
+                )
+
+        assert result is True
+        assert (tmp_path / "big.log").read_bytes() == b"ok"
 
 
 class TestDownloadTmtLogs:
     """Tests for TestingFarmLogDownloader.download_tmt_logs."""
 
-    def test_download_tmt_logs_no_xml_dict(self, downloader, capsys):
-        downloader.xml_dict = None
+    def test_download_tmt_logs_no_results_summary(self, downloader, capsys):
+        downloader.results_summary = None
         result = downloader.download_tmt_logs()
         assert result is False
         assert "XML report not found" in capsys.readouterr().out
@@ -150,51 +372,97 @@ class TestDownloadTmtLogs:
         self, downloader, tmp_path
     ):
         downloader.log_dir = tmp_path
-        downloader.xml_dict = {
-            "testsuites": {
-                "testsuite": {
-                    "logs": {
-                        "log": [
-                            {"@name": "tmt-log", "@href": "http://example.com/tmt.log"},
-                            {
-                                "@name": "tmt-verbose-log",
-                                "@href": "http://example.com/tmt-verbose.log",
-                            },
-                            {"@name": "data", "@href": "http://example.com/data"},
-                        ]
-                    }
+        downloader.results_summary = {
+            "testsuites": [
+                {
+                    "name": "/plans/nightly/nightly-fedora",
+                    "result": "passed",
+                    "logs": [
+                        {"name": "tmt-log", "href": "http://example.com/tmt.log"},
+                        {
+                            "name": "tmt-verbose-log",
+                            "href": "http://example.com/tmt-verbose.log",
+                        },
+                        {"name": "data", "href": "http://example.com/data"},
+                    ],
+                    "testcases": [],
                 }
-            }
+            ]
         }
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"log content"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"log content"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             downloader.download_tmt_logs()
 
-        assert downloader.data_dir_url_link == "http://example.com/data"
+        assert downloader.data_dir_url_links == ["http://example.com/data"]
         assert (tmp_path / "tmt-log").read_bytes() == b"log content"
         assert (tmp_path / "tmt-verbose-log").read_bytes() == b"log content"
 
+    def test_download_tmt_logs_multiple_testsuites(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.results_summary = {
+            "testsuites": [
+                {
+                    "name": f"/plans/nightly/nightly-{os_name}",
+                    "result": "passed",
+                    "logs": [
+                        {"name": "tmt-log", "href": f"http://example.com/{os_name}"},
+                        {"name": "data", "href": f"http://example.com/{os_name}/data"},
+                    ],
+                    "testcases": [],
+                }
+                for os_name in ("c9s", "c10s")
+            ]
+        }
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"log content"]
+
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            downloader.download_tmt_logs()
+
+        assert downloader.data_dir_url_links == [
+            "http://example.com/c9s/data",
+            "http://example.com/c10s/data",
+        ]
+        assert (tmp_path / "tmt-log-nightly-c9s").exists()
+        assert (tmp_path / "tmt-log-nightly-c10s").exists()
+
 
 class TestGetListOfContainersLogs:
     """Tests for TestingFarmLogDownloader.get_list_of_containers_logs."""
 
     def test_get_list_of_containers_logs_finds_links(self, downloader):
-        html = '<a href="httpd-container">\n<a href="nginx-container">\n'
+        html = (
+            '<pre><a href="../">../</a>\n'
+            '<a href="results/">results/</a>\n'
+            '<a href="httpd-container.log">httpd-container.log</a>\n'
+            '<a href="nginx-container.log">nginx-container.log</a>\n'
+            '<a href="new%2Dcontainer.log">new-container.log</a>\n'
+            '<a href="tmt-run.yaml">tmt-run.yaml</a>\n'
+        )
         result = downloader.get_list_of_containers_logs(html)
-        assert result == ['<a href="httpd-container">', '<a href="nginx-container">']
+        assert result == [
+            "httpd-container.log",
+            "nginx-container.log",
+            "new-container.log",
+        ]
+
+    def test_get_list_of_containers_logs_no_logs_in_results(self, downloader):
+        html = (TEST_DIR / "no_logs_in_results.txt").read_text()
+        assert downloader.get_list_of_containers_logs(html) == []
 
     def test_get_list_of_containers_logs_empty(self, downloader):
         result = downloader.get_list_of_containers_logs("no links here")
         assert result == []
 
     def test_get_list_of_containers_logs_exception(self, downloader, capsys):
-        with patch.object(download_logs, "re") as mock_re:
-            mock_re.search.side_effect = Exception("regex error")
+        with patch.object(download_logs, "LOG_HREF_RE") as mock_re:
+            mock_re.findall.side_effect = Exception("regex error")
             result = downloader.get_list_of_containers_logs("html")
         assert result is False
         assert "Failed to get list of failed containers" in capsys.readouterr().out
@@ -204,50 +472,110 @@ class TestDownloadContainerLogs:
     """Tests for TestingFarmLogDownloader.download_container_logs."""
 
     def test_download_container_logs_no_data_link(self, downloader, capsys):
-        downloader.data_dir_url_link = None
+        downloader.data_dir_url_links = []
         result = downloader.download_container_logs()
         assert result is False
         assert "Data directory URL link not found" in capsys.readouterr().out
 
     def test_download_container_logs_success(self, downloader, tmp_path):
         downloader.log_dir = tmp_path
-        downloader.data_dir_url_link = "http://example.com/data"
+        downloader.data_dir_url_links = ["http://example.com/data"]
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.text = "<html>data dir</html>"
-        mock_response.content = b"log"
+        mock_response.headers = {}
+        mock_response.text = '<a href="httpd-container.log">httpd-container.log</a>'
+        mock_response.iter_content.return_value = [b"log"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             result = downloader.download_container_logs()
 
         assert result is True
+        assert (tmp_path / "httpd-container.log").read_bytes() == b"log"
+
+    def test_download_container_logs_empty_index(self, downloader, capsys):
+        downloader.data_dir_url_links = ["http://example.com/data"]
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.text = '<a href="../">../</a>'
+
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
+        ) as mock_get:
+            result = downloader.download_container_logs(is_failed=True)
+
+        assert result is True
+        assert mock_get.call_count == 1
+        assert "No container logs found" in capsys.readouterr().out
 
     def test_download_container_logs_failed_directory(self, downloader, tmp_path):
         (tmp_path / "results").mkdir()
         downloader.log_dir = tmp_path
-        downloader.data_dir_url_link = "http://example.com/data"
+        downloader.data_dir_url_links = ["http://example.com/data"]
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.text = "<html>results</html>"
-        mock_response.content = b"log"
+        mock_response.headers = {}
+        mock_response.text = '<a href="mysql-container.log">mysql-container.log</a>'
+        mock_response.iter_content.return_value = [b"log"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             result = downloader.download_container_logs(is_failed=True)
 
         assert result is True
+        assert (tmp_path / "results" / "mysql-container.log").read_bytes() == b"log"
+
+    def test_download_container_logs_downloads_all_in_parallel(
+        self, downloader, tmp_path
+    ):
+        downloader.log_dir = tmp_path
+        downloader.data_dir_url_links = ["http://example.com/data"]
+        containers = ["httpd-container", "nginx-container", "s2i-foo-container"]
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.text = "\n".join(
+            f'<a href="{cont}.log">{cont}.log</a>' for cont in containers
+        )
+
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            with patch.object(
+                downloader, "download_log", return_value=True
+            ) as mock_download:
+                result = downloader.download_container_logs()
+
+        assert result is True
+        downloaded = sorted(call.args[0] for call in mock_download.call_args_list)
+        assert downloaded == [f"http://example.com/data/{c}.log" for c in containers]
+
+    def test_download_container_logs_of_all_plans(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.data_dir_url_links = [
+            "http://example.com/c9s/data",
+            "http://example.com/c10s/data",
+        ]
+
+        def get(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200
+            response.headers = {}
+            name = url.split("/")[3]
+            response.text = f'<a href="{name}-container.log">{name}-container.log</a>'
+            response.iter_content.return_value = [name.encode()]
+            return response
+
+        with patch.object(downloader.session, "get", side_effect=get):
+            result = downloader.download_container_logs()
+
+        assert result is True
+        assert (tmp_path / "c9s-container.log").read_bytes() == b"c9s"
+        assert (tmp_path / "c10s-container.log").read_bytes() == b"c10s"
 
     def test_download_container_logs_http_error(self, downloader, capsys):
-        downloader.data_dir_url_link = "http://example.com/data"
+        downloader.data_dir_url_links = ["http://example.com/data"]
         mock_response = MagicMock()
         mock_response.status_code = 404
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             result = downloader.download_container_logs()
 
         assert result is False
@@ -261,21 +589,50 @@ class TestGetXmlReport:
         downloader.request_id = "req-123"
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"<testsuites></testsuites>"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"<testsuites></testsuites>"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
-            with patch(
-                "daily_tests.download_logs.xmltodict.parse",
-                return_value={"testsuites": {}},
-            ):
-                result = downloader.get_xml_report()
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            result = downloader.get_xml_report()
 
         assert result is True
-        assert downloader.xml_dict == {"testsuites": {}}
+        assert downloader.results_summary == {"testsuites": []}
         assert "artifacts.dev.testing-farm.io" in capsys.readouterr().out
 
+    def test_get_xml_report_writes_results_summary(self, downloader, tmp_path):
+        downloader.request_id = "req-123"
+        downloader.log_dir = tmp_path
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [
+            (TEST_DIR / "results.xml").read_bytes()
+        ]
+
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            result = downloader.get_xml_report()
+
+        assert result is True
+        summary = json.loads((tmp_path / download_logs.RESULTS_SUMMARY).read_text())
+        assert summary == downloader.results_summary
+        assert summary["testsuites"][0]["testcases"] == [
+            {"name": "/Run nightly tests", "result": "passed", "duration": 5706.0}
+        ]
+
+    def test_get_xml_report_invalid_xml(self, downloader, tmp_path, capsys):
+        downloader.request_id = "req-123"
+        downloader.log_dir = tmp_path
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"<testsuites>"]
+
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            result = downloader.get_xml_report()
+
+        assert result is False
+        assert "Failed to parse XML report" in capsys.readouterr().out
+
     def test_get_xml_report_public_url_for_c9s(
         self, tmp_log_dir, log_file_with_request_id
     ):
@@ -286,16 +643,11 @@ class TestGetXmlReport:
         downloader.request_id = "req-456"
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"<testsuites></testsuites>"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"<testsuites></testsuites>"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
-            with patch(
-                "daily_tests.download_logs.xmltodict.parse",
-                return_value={"testsuites": {}},
-            ):
-                result = downloader.get_xml_report()
+        with patch.object(downloader.session, "get", return_value=mock_response):
+            result = downloader.get_xml_report()
 
         assert result is True
 
@@ -309,16 +661,13 @@ class TestGetXmlReport:
         downloader.request_id = "req-789"
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"<testsuites></testsuites>"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"<testsuites></testsuites>"]
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
         ) as mock_get:
-            with patch(
-                "daily_tests.download_logs.xmltodict.parse",
-                return_value={"testsuites": {}},
-            ):
-                result = downloader.get_xml_report()
+            result = downloader.get_xml_report()
 
         assert result is True
         assert "artifacts.osci.redhat.com" in str(mock_get.call_args[0][0])
@@ -328,12 +677,659 @@ class TestGetXmlReport:
         mock_response = MagicMock()
         mock_response.status_code = 500
 
-        with patch(
-            "daily_tests.download_logs.requests.get", return_value=mock_response
-        ):
+        with patch.object(downloader.session, "get", return_value=mock_response):
             with patch("daily_tests.download_logs.time.sleep"):
                 result = downloader.get_xml_report()
 
         assert result is False
-        assert downloader.xml_dict is None
+        assert downloader.results_summary is None
         assert "Failed to download XML report" in capsys.readouterr().out
+
+
+class TestArtifactCache:
+    """Tests for conditional re-downloads backed by ArtifactCache."""
+
+    @staticmethod
+    def _response(status_code, chunks=(), headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.iter_content.return_value = list(chunks)
+        return response
+
+    def test_cache_created_per_request_id(self, downloader, tmp_log_dir):
+        downloader.get_request_id()
+        assert downloader.cache.cache_file == (
+            tmp_log_dir / download_logs.ARTIFACT_CACHE_DIR / "abc-123-def.json"
+        )
+
+    def test_unchanged_artifact_is_not_downloaded_again(self, downloader, tmp_path):
+        downloader.get_request_id()
+        downloader.log_dir = tmp_path / "logs"
+        first = self._response(
+            200,
+            [b"log content"],
+            {"ETag": '"v1"', "Last-Modified": "Mon, 16 Feb 2026 10:00:00 GMT"},
+        )
+        with patch.object(downloader.session, "get", return_value=first):
+            assert downloader.download_log("http://example.com/tmt.log", "tmt.log")
+
+        entry = downloader.cache.entries["http://example.com/tmt.log"]
+        assert entry["etag"] == '"v1"'
+        assert entry["size"] == len(b"log content")
+        assert entry["sha256"] == download_logs.file_sha256(
+            downloader.log_dir / "tmt.log"
+        )
+
+        # A fresh downloader for the same request ID reads the cache from disk
+        rerun = download_logs.TestingFarmLogDownloader(
+            str(downloader.log_file), "fedora", "test-pytest"
+        )
+        rerun.get_request_id()
+        rerun.log_dir = downloader.log_dir
+        not_modified = self._response(304)
+        with patch.object(rerun.session, "get", return_value=not_modified) as mock_get:
+            assert rerun.download_log("http://example.com/tmt.log", "tmt.log")
+
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 16 Feb 2026 10:00:00 GMT",
+        }
+        assert (rerun.log_dir / "tmt.log").read_bytes() == b"log content"
+
+    def test_force_bypasses_cache(self, downloader, tmp_path):
+        downloader.get_request_id()
+        downloader.log_dir = tmp_path
+        with patch.object(
+            downloader.session,
+            "get",
+            return_value=self._response(200, [b"v1"], {"ETag": '"v1"'}),
+        ):
+            downloader.download_log("http://example.com/tmt.log", "tmt.log")
+
+        downloader.force = True
+        with patch.object(
+            downloader.session, "get", return_value=self._response(200, [b"v2"])
+        ) as mock_get:
+            downloader.download_log("http://example.com/tmt.log", "tmt.log")
+
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert (tmp_path / "tmt.log").read_bytes() == b"v2"
+
+    def test_locally_modified_artifact_is_downloaded_again(self, downloader, tmp_path):
+        downloader.get_request_id()
+        downloader.log_dir = tmp_path
+        with patch.object(
+            downloader.session,
+            "get",
+            return_value=self._response(200, [b"v1"], {"ETag": '"v1"'}),
+        ):
+            downloader.download_log("http://example.com/tmt.log", "tmt.log")
+        (tmp_path / "tmt.log").write_bytes(b"v0")
+
+        headers = downloader.cache.conditional_headers(
+            "http://example.com/tmt.log", tmp_path / "tmt.log"
+        )
+
+        assert headers == {}
+
+    def test_corrupted_cache_file_is_ignored(self, tmp_path, capsys):
+        cache_file = tmp_path / "req.json"
+        cache_file.write_text("{not json")
+
+        cache = download_logs.ArtifactCache(cache_file)
+
+        assert cache.entries == {}
+        assert "Ignoring corrupted artifact cache" in capsys.readouterr().out
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy and its use by the downloader."""
+
+    def test_timeout_without_deadline(self):
+        policy = download_logs.RetryPolicy(
+            connect_timeout=5, read_timeout=30, deadline=None
+        )
+        assert policy.remaining() is None
+        assert policy.expired() is False
+        assert policy.timeout() == (5, 30)
+
+    def test_timeout_capped_by_deadline(self):
+        policy = download_logs.RetryPolicy(
+            connect_timeout=5, read_timeout=30, deadline=3
+        )
+        connect, read = policy.timeout()
+        assert connect <= 3
+        assert read <= 3
+
+    def test_client_errors_are_not_retryable(self):
+        policy = download_logs.RetryPolicy()
+        assert policy.is_retryable(404) is False
+        assert policy.is_retryable(403) is False
+        assert policy.is_retryable(500) is True
+        assert policy.is_retryable(503) is True
+
+    def test_sleep_uses_exponential_backoff_with_jitter(self):
+        policy = download_logs.RetryPolicy(
+            max_attempts=5, backoff=2, max_backoff=5, deadline=None
+        )
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert policy.sleep(0) is True
+            assert policy.sleep(1) is True
+            assert policy.sleep(3) is True
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert 1 <= delays[0] <= 2
+        assert 2 <= delays[1] <= 4
+        assert 2.5 <= delays[2] <= 5
+
+    def test_sleep_stops_after_last_attempt(self):
+        policy = download_logs.RetryPolicy(max_attempts=2, deadline=None)
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert policy.sleep(1) is False
+        mock_sleep.assert_not_called()
+
+    def test_sleep_stops_when_backoff_exceeds_deadline(self):
+        policy = download_logs.RetryPolicy(backoff=100, deadline=10)
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert policy.sleep(0) is False
+        mock_sleep.assert_not_called()
+
+    def test_download_log_not_retried_on_404(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        mock_response = MagicMock()
+        mock_response.status_code = 404
+
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
+        ) as mock_get:
+            with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+                result = downloader.download_log("http://example.com/x.log", "x.log")
+
+        assert result is False
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+        assert downloader.failed_downloads == ["http://example.com/x.log"]
+
+    def test_download_log_retried_on_server_error(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.retry = download_logs.RetryPolicy(max_attempts=3, deadline=None)
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
+        ) as mock_get:
+            with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+                result = downloader.download_log("http://example.com/x.log", "x.log")
+
+        assert result is False
+        assert mock_get.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    def test_requests_use_policy_timeouts(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.retry = download_logs.RetryPolicy(
+            connect_timeout=3, read_timeout=7, deadline=None
+        )
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"ok"]
+
+        with patch.object(
+            downloader.session, "get", return_value=mock_response
+        ) as mock_get:
+            downloader.download_log("http://example.com/x.log", "x.log")
+
+        assert mock_get.call_args.kwargs["timeout"] == (3, 7)
+
+    def test_nothing_requested_after_deadline(self, downloader, tmp_path, capsys):
+        downloader.log_dir = tmp_path
+        downloader.retry = download_logs.RetryPolicy(deadline=1)
+        downloader.retry.deadline_at = 0
+
+        with patch.object(downloader.session, "get") as mock_get:
+            result = downloader.download_log("http://example.com/x.log", "x.log")
+
+        assert result is False
+        mock_get.assert_not_called()
+        assert downloader.failed_downloads == ["http://example.com/x.log"]
+        assert "Deadline reached" in capsys.readouterr().out
+
+    def test_deadline_stops_slow_download(self, downloader, tmp_path, capsys):
+        downloader.log_dir = tmp_path
+        downloader.retry = download_logs.RetryPolicy(deadline=1)
+        downloader.retry.start()
+        slow = MagicMock()
+        slow.status_code = 200
+        slow.headers = {"ETag": '"v1"'}
+
+        def trickle(chunk_size):
+            yield b"first "
+            downloader.retry.deadline_at = 0
+            yield b"second "
+            yield b"third"
+
+        slow.iter_content.side_effect = trickle
+
+        with patch.object(downloader.session, "get", return_value=slow) as mock_get:
+            result = downloader.download_log("http://example.com/x.log", "x.log")
+
+        assert result is False
+        assert mock_get.call_count == 1
+        assert (tmp_path / "x.log.part").read_bytes() == b"first second "
+        assert (tmp_path / "x.log.part.validator").read_text() == '"v1"'
+        assert not (tmp_path / "x.log").exists()
+        assert "Deadline reached while downloading" in capsys.readouterr().out
+
+    def test_directory_index_retried_on_connection_error(self, downloader):
+        downloader.data_dir_url_links = ["http://example.com/data"]
+        downloader.retry = download_logs.RetryPolicy(max_attempts=2, deadline=None)
+        index = MagicMock()
+        index.status_code = 200
+        index.headers = {}
+        index.text = ""
+
+        with patch.object(
+            downloader.session,
+            "get",
+            side_effect=[download_logs.requests.exceptions.ConnectTimeout(), index],
+        ):
+            with patch("daily_tests.download_logs.time.sleep"):
+                result = downloader.download_container_logs()
+
+        assert result is True
+        assert downloader.failed_downloads == []
+
+
+class TestParseResultsXml:
+    """Tests for parse_results_xml."""
+
+    def test_parse_results_xml_single_testsuite(self):
+        summary = download_logs.parse_results_xml(TEST_DIR / "results.xml")
+
+        assert len(summary["testsuites"]) == 1
+        testsuite = summary["testsuites"][0]
+        assert testsuite["name"] == "/plans/nightly/nightly-c10s"
+        assert testsuite["result"] == "passed"
+        log_names = [log["name"] for log in testsuite["logs"]]
+        assert "tmt-log" in log_names
+        assert "tmt-verbose-log" in log_names
+        # Logs of testcases are not mixed into testsuite logs
+        assert "testout.log" not in log_names
+        assert testsuite["testcases"] == [
+            {"name": "/Run nightly tests", "result": "passed", "duration": 5706.0}
+        ]
+
+    def test_parse_results_xml_multiple_testsuites(self, tmp_path):
+        xml_file = tmp_path / "results.xml"
+        xml_file.write_text(
+            '<testsuites overall-result="failed">'
+            '<testsuite name="/plans/a" result="passed">'
+            '<logs><log href="http://a/data" name="data"/></logs>'
+            '<testcase name="/t1" result="passed" time="10"/>'
+            "</testsuite>"
+            '<testsuite name="/plans/b" result="failed">'
+            '<logs><log href="http://b/tmt.log" name="tmt-log"/></logs>'
+            '<testcase name="/t2" result="failed" time="2.5"/>'
+            '<testcase name="/t3" result="error"/>'
+            "</testsuite>"
+            "</testsuites>"
+        )
+
+        summary = download_logs.parse_results_xml(xml_file)
+
+        assert summary == {
+            "testsuites": [
+                {
+                    "name": "/plans/a",
+                    "result": "passed",
+                    "logs": [{"name": "data", "href": "http://a/data"}],
+                    "testcases": [
+                        {"name": "/t1", "result": "passed", "duration": 10.0}
+                    ],
+                },
+                {
+                    "name": "/plans/b",
+                    "result": "failed",
+                    "logs": [{"name": "tmt-log", "href": "http://b/tmt.log"}],
+                    "testcases": [
+                        {"name": "/t2", "result": "failed", "duration": 2.5},
+                        {"name": "/t3", "result": "error", "duration": None},
+                    ],
+                },
+            ]
+        }
+
+
+REQUEST_ID = "062cb820-8519-4e7b-adf1-30e9f42d3c8f"
+
+
+class TestBatchLogDownloader:
+    """Tests for BatchLogDownloader and create_batch_downloader."""
+
+    def test_create_batch_downloader_from_log_file_and_request_id(
+        self, tmp_log_dir, log_file_with_request_id
+    ):
+        batch = download_logs.create_batch_downloader(
+            [
+                f"fedora:test:{log_file_with_request_id}",
+                f"rhel9:test-pytest:{REQUEST_ID}",
+            ],
+            workers=2,
+            report_date="2026-02-17",
+        )
+
+        first, second = batch.downloaders
+        assert first.request_id == "abc-123-def"
+        assert second.request_id == REQUEST_ID
+        assert first.session is second.session
+        assert first.retry is second.retry
+        assert second.log_dir == (
+            tmp_log_dir / "daily_reports_dir" / "2026-02-17" / "rhel9-test-pytest"
+        )
+        assert batch.per_host == 2
+
+    @pytest.mark.parametrize(
+        "entry", ["fedora-test", "fedora:test:not-a-request-id", "fedora:test:"]
+    )
+    def test_create_batch_downloader_invalid_entry(self, tmp_log_dir, entry):
+        with pytest.raises(ValueError):
+            download_logs.create_batch_downloader([entry])
+
+    def test_download_all_writes_daily_reports_layout(self, tmp_log_dir):
+        batch = download_logs.create_batch_downloader(
+            [f"c9s:test:{REQUEST_ID}"], report_date="2026-02-17"
+        )
+        data_url = "https://artifacts.example.com/data"
+        results_xml = (
+            "<testsuites><testsuite name='/plans/nightly/nightly-c9s'><logs>"
+            "<log href='https://artifacts.example.com/tmt.log' name='tmt-log'/>"
+            f"<log href='{data_url}' name='data'/>"
+            "</logs></testsuite></testsuites>"
+        ).encode()
+        pages = {
+            f"{download_logs.REPORTS_PUBLIC_URL}/{REQUEST_ID}/results.xml": results_xml,
+            "https://artifacts.example.com/tmt.log": b"tmt log",
+            data_url: b'<a href="httpd-container.log">httpd-container.log</a>',
+            f"{data_url}/results": b'<a href="nginx-container.log">x</a>',
+            f"{data_url}/httpd-container.log": b"httpd",
+            f"{data_url}/results/nginx-container.log": b"nginx",
+        }
+
+        def fake_get(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200 if url in pages else 404
+            response.headers = {}
+            response.text = pages.get(url, b"").decode()
+            response.iter_content.return_value = [pages.get(url, b"")]
+            return response
+
+        with patch.object(batch.downloaders[0].session, "get", side_effect=fake_get):
+            assert batch.download_all() is True
+
+        log_dir = tmp_log_dir / "daily_reports_dir" / "2026-02-17" / "c9s-test"
+        assert (log_dir / "results.xml").exists()
+        assert (log_dir / "tmt-log").read_bytes() == b"tmt log"
+        assert (log_dir / "httpd-container.log").read_bytes() == b"httpd"
+        assert (log_dir / "results" / "nginx-container.log").read_bytes() == b"nginx"
+        assert batch.failed_downloads == []
+
+    def test_download_all_reports_missing_xml(self, tmp_log_dir):
+        batch = download_logs.create_batch_downloader([f"c9s:test:{REQUEST_ID}"])
+        not_found = MagicMock()
+        not_found.status_code = 404
+
+        with patch.object(batch.downloaders[0].session, "get", return_value=not_found):
+            assert batch.download_all() is False
+
+        assert batch.failed_downloads == [
+            f"{download_logs.REPORTS_PUBLIC_URL}/{REQUEST_ID}/results.xml"
+        ]
+
+    def test_pool_holds_connections_of_all_workers(
+        self, tmp_log_dir, log_file_with_request_id
+    ):
+        batch = download_logs.create_batch_downloader(
+            [f"fedora:test:{log_file_with_request_id}"], workers=5
+        )
+        session = batch.downloaders[0].session
+        adapter = session.get_adapter("https://artifacts.example.com")
+        assert adapter._pool_maxsize == batch.per_host == 5
+        assert batch.executor._max_workers == 5 * download_logs.ARTIFACT_HOSTS
+        batch.executor.shutdown()
+
+    def test_pool_resized_for_per_host(self, tmp_log_dir, log_file_with_request_id):
+        downloader = download_logs.TestingFarmLogDownloader(
+            log_file_with_request_id, "fedora", "test", workers=2
+        )
+        batch = download_logs.BatchLogDownloader([downloader], per_host=6)
+        adapter = downloader.session.get_adapter("https://artifacts.example.com")
+        assert adapter._pool_maxsize == 6
+        batch.executor.shutdown()
+
+    def test_fetch_limits_concurrency_per_host(self, tmp_log_dir):
+        batch = download_logs.BatchLogDownloader([], per_host=2)
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+
+        def slow_download():
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.02)
+            with lock:
+                running["now"] -= 1
+
+        async def download_many():
+            await download_logs.asyncio.gather(
+                *[
+                    batch.fetch("https://one.example.com/log", slow_download)
+                    for _ in range(6)
+                ]
+            )
+
+        download_logs.asyncio.run(download_many())
+        batch.executor.shutdown()
+
+        assert running["max"] == 2
+
+
+class TestCompressedLogs:
+    """Tests for logs stored compressed with --compress."""
+
+    @staticmethod
+    def _ok_response(content):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"ETag": '"v1"'}
+        response.iter_content.return_value = [content]
+        return response
+
+    def test_invalid_compression(self, tmp_log_dir, log_file_with_request_id):
+        with pytest.raises(ValueError):
+            download_logs.TestingFarmLogDownloader(
+                log_file_with_request_id, "fedora", "test", compress="bzip2"
+            )
+
+    def test_download_log_stores_gzip(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.compress = "gzip"
+
+        with patch.object(
+            downloader.session, "get", return_value=self._ok_response(b"log " * 100)
+        ):
+            assert downloader.download_log("http://example.com/a.log", "a.log")
+
+        assert not (tmp_path / "a.log").exists()
+        assert gzip.decompress((tmp_path / "a.log.gz").read_bytes()) == b"log " * 100
+
+    def test_download_log_stores_zstd(self, downloader, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        downloader.log_dir = tmp_path
+        downloader.compress = "zstd"
+
+        with patch.object(
+            downloader.session, "get", return_value=self._ok_response(b"zstd log")
+        ):
+            assert downloader.download_log("http://example.com/a.log", "a.log")
+
+        with zstandard.open(tmp_path / "a.log.zst", "rb") as f:
+            assert f.read() == b"zstd log"
+
+    def test_results_xml_is_not_compressed(self, downloader, tmp_path):
+        downloader.log_dir = tmp_path
+        downloader.compress = "gzip"
+        downloader.request_id = "req-123"
+
+        with patch.object(
+            downloader.session,
+            "get",
+            return_value=self._ok_response(b"<testsuites></testsuites>"),
+        ):
+            assert downloader.get_xml_report() is True
+
+        assert (tmp_path / "results.xml").exists()
+
+    def test_compressed_log_is_cached(self, downloader, tmp_path):
+        downloader.get_request_id()
+        downloader.log_dir = tmp_path
+        downloader.compress = "gzip"
+        with patch.object(
+            downloader.session, "get", return_value=self._ok_response(b"log")
+        ):
+            downloader.download_log("http://example.com/a.log", "a.log")
+
+        headers = downloader.cache.conditional_headers(
+            "http://example.com/a.log", tmp_path / "a.log.gz"
+        )
+
+        assert headers == {"If-None-Match": '"v1"'}
+
+
+class StubTestingFarmHandler(BaseHTTPRequestHandler):
+    """Serve request states and results.xml like the Testing Farm does."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if self.path == f"/requests/{REQUEST_ID}":
+            server.state_index = min(server.state_index + 1, len(server.states) - 1)
+            state = server.states[server.state_index]
+            self._send(200, json.dumps({"id": REQUEST_ID, "state": state}).encode())
+        elif self.path == f"/{REQUEST_ID}/results.xml" and server.xml_ready():
+            self._send(200, (TEST_DIR / "results.xml").read_bytes(), "text/xml")
+        else:
+            self._send(404)
+
+    do_HEAD = do_GET
+
+
+@pytest.fixture
+def stub_testing_farm():
+    """Local HTTP server replacing the Testing Farm API and artifacts."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTestingFarmHandler)
+    server.states = ["new"]
+    server.state_index = -1
+    server.xml_ready = lambda: False
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    with patch.object(download_logs, "API_URL", url):
+        with patch.object(download_logs, "REPORTS_PUBLIC_URL", url):
+            yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestWaitForResults:
+    """Tests for polling the Testing Farm request state."""
+
+    @pytest.fixture
+    def polling_downloader(self, downloader, tmp_path):
+        downloader.set_request_id(REQUEST_ID)
+        downloader.log_dir = tmp_path
+        return downloader
+
+    def test_wait_for_results_adaptive_interval(
+        self, polling_downloader, stub_testing_farm
+    ):
+        stub_testing_farm.states = ["queued", "queued", "running", "running"]
+        stub_testing_farm.xml_ready = lambda: stub_testing_farm.state_index == 3
+
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert polling_downloader.wait_for_results(interval=10) is True
+
+        # Interval doubles while queued and starts again once running
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [10, 20, 10]
+        assert polling_downloader.get_xml_report() is True
+        assert polling_downloader.results_summary["testsuites"][0]["name"] == (
+            "/plans/nightly/nightly-c10s"
+        )
+
+    def test_wait_for_results_interval_capped(
+        self, polling_downloader, stub_testing_farm
+    ):
+        stub_testing_farm.states = ["queued"] * 5 + ["complete"]
+        stub_testing_farm.xml_ready = lambda: stub_testing_farm.state_index == 5
+
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert polling_downloader.wait_for_results(interval=10, max_interval=30)
+
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [
+            10,
+            20,
+            30,
+            30,
+            30,
+        ]
+
+    def test_wait_for_results_request_error(
+        self, polling_downloader, stub_testing_farm, capsys
+    ):
+        stub_testing_farm.states = ["running", "error"]
+
+        with patch("daily_tests.download_logs.time.sleep"):
+            assert polling_downloader.wait_for_results() is False
+
+        assert "finished in state 'error'" in capsys.readouterr().out
+
+    def test_wait_for_results_timeout(
+        self, polling_downloader, stub_testing_farm, capsys
+    ):
+        stub_testing_farm.states = ["queued"]
+
+        with patch("daily_tests.download_logs.time.sleep") as mock_sleep:
+            assert polling_downloader.wait_for_results(timeout=0) is False
+
+        mock_sleep.assert_not_called()
+        assert "not available after 0 seconds" in capsys.readouterr().out
+
+    def test_get_request_state_unavailable(self, polling_downloader, capsys):
+        with patch.object(
+            polling_downloader.session,
+            "get",
+            side_effect=download_logs.requests.exceptions.ConnectionError("down"),
+        ):
+            assert polling_downloader.get_request_state() is None
+
+        assert "Failed to get request state" in capsys.readouterr().out
+
+    def test_retry_policy_start_restarts_deadline(self):
+        policy = download_logs.RetryPolicy(deadline=60)
+        policy.deadline_at = 0
+        assert policy.expired() is True
+        policy.start()
+        assert policy.expired() is False
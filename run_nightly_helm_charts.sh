@@ -57,5 +57,7 @@ fi
 cp "${DIR}/log.txt" "${RESULTS_DIR}/${TARGET}-${TESTS}/"
 set +o pipefail
 rm -f "${RESULTS_DIR}/${TARGET}-${TESTS}/tmt_running"
+# Tells 'daily_nightly_tests_report.py --watch' that the test case is complete
+touch "${RESULTS_DIR}/${TARGET}-${TESTS}/logs_downloaded"
 cd "$CWD" || exit 1
 rm -rf "$WORK_DIR"
@@ -98,8 +98,6 @@ function run_tests() {
   $TESTING_FARM_CMD | tee -a "${LOG_FILE}"
   ret_code=$?
   rm -f "${DAILY_SCLORG_TESTS_DIR}/tmt_running"
-  # Let's sleep 5 minutes to let the testing farm to start the tests and generate some logs
-  sleep 300
   if [[ $ret_code -ne 0 ]]; then
     echo "Testing Farm command $TESTING_FARM_CMD has failed."
     touch "${DAILY_REPORTS_TESTS_DIR}/tmt_failed"
@@ -111,7 +109,10 @@ function run_tests() {
     touch "${DAILY_REPORTS_TESTS_DIR}/tmt_failed"
   fi
   cp "${LOG_FILE}" "${DAILY_REPORTS_TESTS_DIR}/testing_farm_${TARGET}_${TESTS}.txt"
-  python3 /root/ci-scripts/daily-tests/daily_tests/download_logs.py "${LOG_FILE}" "${TARGET}" "${TESTS}"
+  # Wait until Testing Farm publishes results.xml instead of sleeping fixed time
+  python3 /root/ci-scripts/daily-tests/daily_tests/download_logs.py "${LOG_FILE}" "${TARGET}" "${TESTS}" --wait-for-results --wait-timeout 1800
+  # Tells 'daily_nightly_tests_report.py --watch' that the test case is complete
+  touch "${DAILY_REPORTS_TESTS_DIR}/logs_downloaded"
 }
 
 if [[ "$TESTS" != "test" ]] && [[ "$TESTS" != "test-pytest" ]] && [[ "$TESTS" != "test-upstream" ]] && [[ "$TESTS" != "test-openshift-pytest" ]] && [[ "$TESTS" != "test-openshift-4" ]]; then
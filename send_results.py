@@ -1,6 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 #
+import gzip
 import smtplib
 import sys
 
@@ -9,7 +10,30 @@ from typing import List
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 COMMASPACE = ", "
+# Logs can be stored compressed by 'download_logs.py --compress'
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def read_log(filename: Path) -> str:
+    """
+    Read plain, gzip or zstd compressed log.
+    """
+    if filename.suffix == ".gz":
+        with gzip.open(filename, "rt", errors="replace") as fp:
+            return fp.read()
+    if filename.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"Reading {filename} requires the zstandard module")
+        with zstandard.open(filename, "rt", errors="replace") as fp:
+            return fp.read()
+    with filename.open() as fp:
+        return fp.read()
 
 
 class SendResults:
@@ -72,14 +96,16 @@ class SendResults:
                 continue
             # Open log file and attach it into message
             print(f"Failed container {str(filename)}.")
-            with filename.open() as fp:
-                file_attachment = MIMEText(fp.read(), "plain")
+            file_attachment = MIMEText(read_log(filename), "plain")
+            log_name = filename.name
+            if filename.suffix in COMPRESSED_SUFFIXES:
+                log_name = filename.stem
             file_attachment.add_header(
-                "Content-Disposition", "attachment", filename=filename.name
+                "Content-Disposition", "attachment", filename=log_name
             )
             self.msg.attach(file_attachment)
             # Delete log file and append into failed_containers array
-            failed_containers.append(filename.stem)
+            failed_containers.append(Path(log_name).stem)
             filename.unlink()
         return failed_containers
 